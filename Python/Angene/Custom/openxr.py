@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
 import Angene.Custom.openxr_ctypes
 from Angene.Renderers import d3d11_vr
+from Angene.Main import trace
 
 
 class VRSession:
@@ -197,8 +198,16 @@ class VRSession:
             XR_TYPE_COMPOSITION_LAYER_PROJECTION_VIEW,
         )
         
+        # Shared trace recorder (engine.enable_tracing() / trace.recorder.enable())
+        tracer = trace.recorder
+        perf_counter = time.perf_counter
+        
         try:
             while self.running:
+                tracing = tracer.enabled
+                if tracing:
+                    frame_start = perf_counter()
+                
                 current_time = time.time()
                 dt = current_time - last_time
                 last_time = current_time
@@ -206,10 +215,16 @@ class VRSession:
                 if hasattr(scene, 'update'):
                     scene.update(dt)
                 
+                if tracing:
+                    mark = perf_counter()
+                    tracer.add("vr.update", frame_start, mark, "vr")
+                
                 # === CRITICAL: PROPER FRAME SUBMISSION ===
                 
                 # Wait for next frame
                 res, frame_state = self.loader.wait_frame(self.session)
+                if tracing:
+                    tracer.add("vr.wait_frame", mark, perf_counter(), "vr")
                 if res != 0 or not frame_state:
                     continue
                 
@@ -260,6 +275,8 @@ class VRSession:
                             
                             # RENDER!
                             if hasattr(scene, 'render_eye'):
+                                if tracing:
+                                    eye_start = perf_counter()
                                 scene.render_eye(
                                     eye_index,
                                     texture,
@@ -268,6 +285,8 @@ class VRSession:
                                     view_matrix,
                                     proj_matrix
                                 )
+                                if tracing:
+                                    tracer.add(f"vr.render_eye[{eye_index}]", eye_start, perf_counter(), "vr")
                             
                             # Release image
                             self.loader.release_swapchain_image(swapchain)
@@ -307,11 +326,18 @@ class VRSession:
                             layers = (ctypes.c_void_p * 1)(ctypes.cast(layer_ptr, ctypes.c_void_p))
                 
                 # End frame - SUBMIT TO COMPOSITOR
+                if tracing:
+                    mark = perf_counter()
                 res = self.loader.end_frame(
                     self.session,
                     frame_state.predictedDisplayTime,
                     layers
                 )
+                if tracing:
+                    frame_end = perf_counter()
+                    tracer.add("vr.end_frame", mark, frame_end, "vr")
+                    tracer.add("vr.frame", frame_start, frame_end, "vr",
+                               {"frame": self.frame_count, "shouldRender": bool(frame_state.shouldRender)})
                 
                 if res != 0:
                     print(f"[VRSession] Warning: end_frame failed with result {res}")
@@ -0,0 +1,178 @@
+# Angene\aio.py
+"""
+asyncio support for scenes.
+
+engine.run_asyncio() drives the same frame loop as engine.run() as a
+coroutine, so scenes can await sockets, files and subprocesses without
+freezing the frame:
+
+    class Lobby:
+        async def Start(self):
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+            engine.start_coroutine(self.listen())
+
+        async def listen(self):
+            while True:
+                self.last_line = await self.reader.readline()
+
+        def Update(self, dt):
+            ...   # runs once Start has finished, self.reader is set
+
+    asyncio.run(engine.run_asyncio(target_fps=60))
+
+Any lifecycle method except OnDraw may be an async def. It is started as a
+task on the engine's event loop; while that task is still running later
+calls are skipped, so a slow await never piles up work. Input is the
+exception: async OnEvents / OnMessage calls queue up behind the running one
+and OnEvents gets its own copy of the frame's batch, so no event is lost.
+Coroutines run in the time the frame pacer would otherwise sleep, plus at
+least one event loop pass per frame.
+
+Until an async Start has finished, the window's other phases do not run
+(its input is held and delivered afterwards), so the rest of the scene can
+rely on what Start set up. An async OnApplicationQuit is awaited when the
+loop stops (up to FINISH_TIMEOUT seconds); every other task is cancelled.
+"""
+
+import time
+import traceback
+from collections import deque
+
+# asyncio itself is imported on first use, it roughly doubles the cost of
+# importing the engine and most games never need it
+
+# Seconds before the frame deadline that pace() hands back to the pacer
+LOOP_MARGIN = 0.002
+
+# Seconds run_asyncio() waits for async OnApplicationQuit tasks on exit
+FINISH_TIMEOUT = 5.0
+
+# Scene tasks of the running loop, cancelled when it stops
+tasks = set()
+
+# Tasks the loop awaits before cancelling the rest, see finish()
+finishing = set()
+
+
+def _task_done(task):
+    tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        print(f"Angene coroutine {task.get_name()} failed:")
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+
+def start_coroutine(coro, name=None):
+    """Run coro as a task on the engine's event loop (run_asyncio only)"""
+    import asyncio
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        coro.close()
+        raise RuntimeError("Angene Logic Error | Coroutines need the asyncio loop, "
+                           "start the engine with engine.run_asyncio().") from None
+    task = loop.create_task(coro, name=name)
+    tasks.add(task)
+    task.add_done_callback(_task_done)
+    return task
+
+
+async def finish(timeout=FINISH_TIMEOUT):
+    """Await the tasks that have to run to the end (async OnApplicationQuit)"""
+    import asyncio
+    if finishing:
+        await asyncio.wait(list(finishing), timeout=timeout)
+
+
+def cancel_all():
+    """Cancel every scene task that is still running"""
+    for task in list(tasks):
+        task.cancel()
+
+
+class AsyncCallback:
+    """An async def scene method, started as a task when called"""
+    __slots__ = ("fn", "name", "task", "skipped", "queued", "finish", "__weakref__")
+
+    def __init__(self, fn, queue=False, finish=False):
+        """
+        Args:
+            queue: Run calls made while the previous task still runs one
+                   after another instead of dropping them
+            finish: The loop awaits the task before it stops instead of
+                    cancelling it, see finish()
+        """
+        self.fn = fn
+        self.name = getattr(fn, "__qualname__", "coroutine")
+        self.task = None
+        self.skipped = 0  # calls dropped while the previous one still ran
+        self.queued = deque() if queue else None
+        self.finish = finish
+
+    def running(self):
+        """True while the last call's task has not finished"""
+        return self.task is not None and not self.task.done()
+
+    def __call__(self, *args):
+        task = self.task
+        queued = self.queued
+        if task is not None and not task.done():
+            if queued is not None:
+                queued.append(args)
+            else:
+                self.skipped += 1
+            return
+        if queued:
+            # The last task is done but its _next() has not run yet
+            queued.append(args)
+            return
+        self._start(args)
+
+    def _start(self, args):
+        self.task = start_coroutine(self.fn(*args), self.name)
+        if self.finish:
+            finishing.add(self.task)
+            self.task.add_done_callback(finishing.discard)
+        if self.queued is not None:
+            self.task.add_done_callback(self._next)
+
+    def _next(self, task):
+        queued = self.queued
+        if task.cancelled():
+            queued.clear()  # the loop is shutting down
+        elif queued and task is self.task:
+            self._start(queued.popleft())
+
+
+async def pace(pacer):
+    """Await the frame deadline, giving the event loop the spare time"""
+    import asyncio
+    if pacer.frame_time > 0:
+        if pacer.deadline is None:
+            pacer.reset()
+        # Event loop timers are only ~1ms accurate (15ms on some Windows
+        # setups), leave at least LOOP_MARGIN for the pacer to finish
+        margin = max(pacer.sleep_margin, LOOP_MARGIN)
+        remaining = pacer.deadline - margin - time.perf_counter()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        else:
+            await asyncio.sleep(0)
+    else:
+        await asyncio.sleep(0)
+    # Spin the last stretch (no-op if the sleep overshot)
+    pacer.wait()
+
+
+async def idle(timeout, poll=0.01):
+    """
+    Idle wait while every scene is static. The Win32 message queue belongs
+    to the loop's thread, so instead of blocking in wait_messages() this
+    sleeps in short slices and lets the frame loop check for input.
+    """
+    import asyncio
+    if timeout is None or timeout > poll:
+        timeout = poll
+    await asyncio.sleep(timeout)
@@ -0,0 +1,350 @@
+# Angene\atlas.py
+"""
+Texture atlases and sprite batching.
+
+build() packs many images (or sprite sheet frames) into a few pages with a
+skyline packer and returns an Atlas, a name -> Sprite lookup table. save()
+writes the pages as PNGs next to a JSON table that load() reads back, so
+packing can run once offline:
+
+    python -m Angene.Main.atlas sprites.json sprites/*.png
+
+A SpriteBatch collects draws per page and hands each page to the renderer
+in one draw_sprites() call: one surface lookup, lock and blit choice for
+the whole page on Win32, one vectorized pass on the software backend:
+
+    sprites = atlas.load("sprites.json")
+    batch = atlas.SpriteBatch()
+
+    def OnDraw(self, r):
+        for enemy in self.enemies:
+            batch.draw(sprites[enemy.kind], enemy.x, enemy.y)
+        batch.flush(r)
+
+Pages are drawn in the order they were first used, sprites of one page in
+the order they were added: sprites on different pages do not keep their
+relative order, use two batches (or flush in between) where that matters.
+"""
+
+import json
+import os
+
+from Angene.Main.images import Image, Sprite, load as load_image
+
+# Size of a new page; pages are trimmed to what they use
+PAGE_SIZE = 1024
+
+# Empty pixels right of and below every entry, keeps scaled sprites from
+# picking up their neighbors
+PADDING = 1
+
+
+class Skyline:
+    """Bottom-left skyline packer for one page"""
+    __slots__ = ("width", "height", "nodes")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.nodes = [[0, 0, width]]  # x, y, width of each skyline segment
+
+    def _fit(self, i, w):
+        """Lowest y a w wide rectangle can sit at starting at node i"""
+        nodes = self.nodes
+        end = nodes[i][0] + w
+        y = 0
+        # The segments always cover the whole page width
+        while i < len(nodes) and nodes[i][0] < end:
+            if nodes[i][1] > y:
+                y = nodes[i][1]
+            i += 1
+        return y
+
+    def insert(self, w, h):
+        """x, y of a free w x h rectangle (now taken), None if it does not fit"""
+        nodes = self.nodes
+        best = None
+        for i, (x, _, _) in enumerate(nodes):
+            if x + w > self.width:
+                break
+            y = self._fit(i, w)
+            if y + h > self.height:
+                continue
+            if best is None or (y + h, x) < best[0]:
+                best = ((y + h, x), i, x, y)
+        if best is None:
+            return None
+        _, i, x, y = best
+
+        nodes.insert(i, [x, y + h, w])
+        # Segments now under the new one shrink or disappear
+        j = i + 1
+        while j < len(nodes):
+            node = nodes[j]
+            overlap = x + w - node[0]
+            if overlap <= 0:
+                break
+            node[0] += overlap
+            node[2] -= overlap
+            if node[2] > 0:
+                break
+            del nodes[j]
+        # Neighbors at the same height become one segment
+        j = 0
+        while j < len(nodes) - 1:
+            if nodes[j][1] == nodes[j + 1][1]:
+                nodes[j][2] += nodes[j + 1][2]
+                del nodes[j + 1]
+            else:
+                j += 1
+        return x, y
+
+
+def pack(sizes, page_width=PAGE_SIZE, page_height=PAGE_SIZE, padding=PADDING):
+    """
+    Place w, h rectangles on as few pages as possible.
+
+    Returns:
+        (placements, pages): page, x, y per size in input order, and the
+        used width, height of every page
+    """
+    sizes = [(int(w), int(h)) for w, h in sizes]
+    for w, h in sizes:
+        if w > page_width or h > page_height:
+            raise RuntimeError(f"Angene Logic Error | A {w}x{h} image does not fit "
+                               f"on a {page_width}x{page_height} atlas page.")
+
+    # Tallest first keeps the skyline flat
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    skylines = []
+    pages = []
+    placements = [None] * len(sizes)
+    for i in order:
+        w, h = sizes[i]
+        pw = min(w + padding, page_width)
+        ph = min(h + padding, page_height)
+        for page, skyline in enumerate(skylines):
+            spot = skyline.insert(pw, ph)
+            if spot is not None:
+                break
+        else:
+            page = len(skylines)
+            skylines.append(Skyline(page_width, page_height))
+            pages.append([0, 0])
+            spot = skylines[page].insert(pw, ph)
+        x, y = spot
+        placements[i] = (page, x, y)
+        used = pages[page]
+        used[0] = max(used[0], x + w)
+        used[1] = max(used[1], y + h)
+    return placements, [tuple(used) for used in pages]
+
+
+class Atlas:
+    """Packed page Images and the Sprite of every entry by name"""
+
+    def __init__(self, pages, entries):
+        """
+        Args:
+            pages: images.Image per page
+            entries: {name: (page, x, y, w, h)}
+        """
+        self.pages = pages
+        self.entries = entries
+        self.sprites = {name: Sprite(pages[page], (x, y, w, h))
+                        for name, (page, x, y, w, h) in entries.items()}
+
+    def __getitem__(self, name):
+        return self.sprites[name]
+
+    def __contains__(self, name):
+        return name in self.sprites
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def names(self):
+        return list(self.sprites)
+
+    def save(self, path):
+        """Write the lookup table to path (JSON) and page i to <path stem>_<i>.png"""
+        from Angene.Main.raster import write_png
+
+        stem = os.path.splitext(path)[0]
+        files = []
+        for i, page in enumerate(self.pages):
+            file = f"{stem}_{i}.png"
+            write_png(file, page.width, page.height, page.rgba)
+            files.append(os.path.basename(file))
+        table = {
+            "pages": [{"file": file, "width": page.width, "height": page.height, "key": page.key}
+                      for file, page in zip(files, self.pages)],
+            "sprites": {name: list(entry) for name, entry in self.entries.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(table, f, indent=1)
+
+    def __repr__(self):
+        return f"<Atlas {len(self.sprites)} sprites on {len(self.pages)} pages>"
+
+
+def build(sources, page_size=PAGE_SIZE, padding=PADDING, key=None):
+    """
+    Pack images into an Atlas.
+
+    Args:
+        sources: {name: images.Image or images.Sprite}
+        page_size: Width and height of a new page
+        padding: Empty pixels right of and below every entry
+        key: COLORREF of the pages for images without alpha (default: the
+             sources' own key when they all share one); empty space is
+             filled with it. Sources keyed with another color get their key
+             pixels turned transparent instead, and the pages no key
+    """
+    names = list(sources)
+    parts = [Sprite(s) if isinstance(s, Image) else s for s in sources.values()]
+    if key is None:
+        keys = {part.image.key for part in parts}
+        if len(keys) == 1:
+            key = keys.pop()
+    # One page key cannot stand for several, alpha can
+    cleared = {}
+    if any(part.image.key not in (None, key) for part in parts):
+        key = None
+        for part in parts:
+            image = part.image
+            if image.key is not None and image not in cleared:
+                cleared[image] = _clear_key(image.rgba, image.key)
+    placements, used = pack([(p.width, p.height) for p in parts], page_size, page_size, padding)
+
+    # Empty space: the key color, transparent when any entry has alpha, else
+    # opaque black so opaque pages keep the cheaper blits
+    if key is not None:
+        empty = bytes((key & 0xFF, (key >> 8) & 0xFF, (key >> 16) & 0xFF, 255))
+    elif cleared or any(part.image.has_alpha for part in parts):
+        empty = bytes(4)
+    else:
+        empty = b"\x00\x00\x00\xff"
+    buffers = [bytearray(empty * (w * h)) for w, h in used]
+
+    entries = {}
+    for name, part, (page, x, y) in zip(names, parts, placements):
+        rgba = cleared.get(part.image, part.image.rgba)
+        stride = part.image.width * 4
+        sx, sy, w, h = part.src
+        buffer = buffers[page]
+        page_stride = used[page][0] * 4
+        for row in range(h):
+            src = (sy + row) * stride + sx * 4
+            dst = (y + row) * page_stride + x * 4
+            buffer[dst:dst + w * 4] = rgba[src:src + w * 4]
+        entries[name] = (page, x, y, w, h)
+
+    pages = [Image(w, h, buffer, key, f"atlas page {i}")
+             for i, ((w, h), buffer) in enumerate(zip(used, buffers))]
+    return Atlas(pages, entries)
+
+
+def _clear_key(rgba, key):
+    """rgba with the opaque pixels of COLORREF key made transparent"""
+    color = bytes((key & 0xFF, (key >> 8) & 0xFF, (key >> 16) & 0xFF, 255))
+    out = bytearray(rgba)
+    i = out.find(color)
+    while i >= 0:
+        if i % 4:
+            # Straddles two pixels, look again from the next pixel
+            i = out.find(color, i - i % 4 + 4)
+            continue
+        out[i:i + 4] = bytes(4)
+        i = out.find(color, i + 4)
+    return bytes(out)
+
+
+def load(path):
+    """Atlas from a lookup table written by Atlas.save(), pages through images.load()"""
+    with open(path) as f:
+        table = json.load(f)
+    base = os.path.dirname(path)
+    pages = [load_image(os.path.join(base, page["file"]), page.get("key"))
+             for page in table["pages"]]
+    entries = {name: tuple(entry) for name, entry in table["sprites"].items()}
+    return Atlas(pages, entries)
+
+
+class SpriteBatch:
+    """Sprite draws grouped by image, drawn one renderer call per image"""
+    __slots__ = ("groups", "opacity", "mode")
+
+    def __init__(self, opacity=1.0, mode="normal"):
+        """
+        Args:
+            opacity, mode: Compositing of every sprite in the batch, see
+                           painter.Renderer.draw_image()
+        """
+        # images.Image -> flat list of x, y, w, h, sx, sy, sw, sh; a list
+        # extends about twice as fast as an array('i') and draw() runs per sprite
+        self.groups = {}
+        self.opacity = opacity
+        self.mode = mode
+
+    def draw(self, sprite, x, y, w=None, h=None):
+        """Queue a Sprite (or a whole Image) at x, y, scaled to w x h when given"""
+        try:
+            image = sprite.image
+            sx, sy, sw, sh = sprite.src
+        except AttributeError:
+            image = sprite
+            sx, sy, sw, sh = 0, 0, image.width, image.height
+        items = self.groups.get(image)
+        if items is None:
+            items = self.groups[image] = []
+        if w is None and h is None:
+            items += (int(x), int(y), sw, sh, sx, sy, sw, sh)
+        else:
+            items += (int(x), int(y), sw if w is None else int(w), sh if h is None else int(h),
+                      sx, sy, sw, sh)
+
+    def flush(self, r, keep=False):
+        """
+        Draw everything queued with renderer r, one draw_sprites() per page.
+
+        Args:
+            keep: Keep the queue to draw it again next frame (static scenery)
+        """
+        for image, items in self.groups.items():
+            r.draw_sprites(image, items, self.opacity, self.mode)
+        if not keep:
+            self.groups.clear()
+
+    def clear(self):
+        self.groups.clear()
+
+    def __len__(self):
+        return sum(len(items) for items in self.groups.values()) // 8
+
+
+def main(argv=None):
+    import argparse
+    from Angene.Main.images import decode_file
+
+    parser = argparse.ArgumentParser(description="Pack images into an Angene texture atlas.")
+    parser.add_argument("output", help="Lookup table to write (JSON), pages go next to it")
+    parser.add_argument("images", nargs="+", help="PNG, BMP or PPM files, named by file name")
+    parser.add_argument("--size", type=int, default=PAGE_SIZE, help="Page width and height")
+    parser.add_argument("--padding", type=int, default=PADDING)
+    args = parser.parse_args(argv)
+
+    sources = {}
+    for path in args.images:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in sources:
+            raise RuntimeError(f"Angene Logic Error | Two images are named {name}.")
+        sources[name] = decode_file(path)
+    result = build(sources, args.size, args.padding)
+    result.save(args.output)
+    print(f"Packed {len(result)} images into {len(result.pages)} pages: "
+          + ", ".join(f"{page.width}x{page.height}" for page in result.pages))
+
+
+if __name__ == "__main__":
+    main()
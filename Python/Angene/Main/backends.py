@@ -0,0 +1,271 @@
+# Angene\backends.py
+"""
+Platform backends for the Angene main loop.
+
+A backend owns everything the engine needs from the OS: creating windows,
+the per-window offscreen surface, pumping messages and presenting a frame.
+engine.run() only talks to the backend, so the same loop runs on a Windows
+desktop (Win32Backend) or headless on any OS (NullBackend, or
+raster.SoftwareBackend when the frames themselves are needed).
+
+Select one with engine.set_backend("win32" / "null" / "software") or the
+ANGENE_BACKEND environment variable. Windows defaults to "win32", everything
+else to "null".
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from Angene.Main.definitions import (
+    WM_CLOSE, WM_DESTROY, WM_ACTIVATE, WM_SIZE,
+    WA_INACTIVE, SIZE_RESTORED, SIZE_MINIMIZED, SIZE_MAXIMIZED,
+)
+
+
+class Backend:
+    """Interface every platform backend implements"""
+    name = "base"
+
+    def __init__(self, window_map):
+        # Shared with the engine, keyed by window handle
+        self.window_map = window_map
+
+    def create_window(self, title, width, height, style=0):
+        """Create a native window and return its handle"""
+        raise NotImplementedError
+
+    def create_surface(self, window):
+        """Allocate the offscreen 2D surface for a window"""
+        raise NotImplementedError
+
+    def destroy_surface(self, window):
+        """Release the offscreen 2D surface of a window"""
+        raise NotImplementedError
+
+    def pump_messages(self, on_message):
+        """
+        Drain pending messages, calling on_message(hwnd, msg, wParam, lParam,
+        time) for each one. Returns False once a quit was requested.
+        """
+        raise NotImplementedError
+
+    def wait_messages(self, timeout=None):
+        """
+        Block until a message arrives, wake() is called or timeout seconds
+        pass (None = no timeout). Used when every scene is idle.
+        """
+        raise NotImplementedError
+
+    def wake(self, hwnd=None):
+        """Interrupt wait_messages() from any thread"""
+        raise NotImplementedError
+
+    def track_window_state(self, window, msg, wParam):
+        """Keep window.active / window.minimized in sync with the OS"""
+        window.needs_redraw = True
+        if window.damage is not None:
+            window.damage.add_all()
+        if msg == WM_ACTIVATE:
+            window.active = (wParam & 0xFFFF) != WA_INACTIVE
+        elif msg == WM_SIZE:
+            if wParam == SIZE_MINIMIZED:
+                window.minimized = True
+            elif wParam in (SIZE_RESTORED, SIZE_MAXIMIZED):
+                window.minimized = False
+
+    def begin_draw(self, window):
+        """Return the renderer a 2D scene draws into this frame (or None)"""
+        raise NotImplementedError
+
+    def end_draw(self, window):
+        """
+        Finish drawing into the offscreen surface. Called on the thread that
+        drew, which may be a render worker rather than the main thread.
+        """
+        pass
+
+    def present(self, window, rects=None):
+        """
+        Show the finished 2D frame of a window (main thread only)
+
+        Args:
+            rects: x0, y0, x1, y1 rectangles that changed, None = everything
+        """
+        raise NotImplementedError
+
+    def post_quit(self):
+        """Ask the message pump to stop the main loop"""
+        raise NotImplementedError
+
+    def set_resolution(self, hwnd, width, height):
+        """Resize a window"""
+        pass
+
+    def refresh_rate(self):
+        """Display refresh rate in Hz, 0 if unknown"""
+        return 0
+
+    def gdi_object_count(self):
+        """Number of live GDI objects, 0 where that does not apply"""
+        return 0
+
+    def shutdown(self):
+        """Release process wide resources when the main loop exits"""
+        pass
+
+
+class NullRenderer:
+    """Renderer with the painter.Renderer surface that draws nothing"""
+
+    def clear(self, color):
+        pass
+
+    def draw_rect(self, x, y, w, h, color):
+        pass
+
+    def draw_text(self, x, y, text, color):
+        pass
+
+    def draw_rects(self, x, y, w, h, color):
+        pass
+
+    def draw_texts(self, x, y, texts, color):
+        pass
+
+    def draw_list(self, display_list):
+        pass
+
+    def create_offscreen(self, width, height):
+        return NullRenderer()
+
+    def blit(self, source, x=0, y=0, key=None):
+        pass
+
+    def draw_layer(self, layer, x=0, y=0):
+        # Still run the layer's draw callback, like every scene callback
+        layer.render(self)
+
+    def destroy(self):
+        pass
+
+    def draw_image(self, image, x, y, w=None, h=None, src=None, opacity=1.0, mode="normal"):
+        pass
+
+    def draw_sprites(self, image, items, opacity=1.0, mode="normal"):
+        pass
+
+    def blend_rect(self, x, y, w, h, color, opacity=1.0, mode="normal"):
+        pass
+
+
+class NullBackend(Backend):
+    """
+    Headless backend: no windows, no display.
+
+    Windows are plain integer handles and every scene callback still runs,
+    which makes it suitable for CI and for benchmarking scenes. Messages can
+    be injected with post_message() and the loop stops on post_quit() or when
+    the last window is closed.
+    """
+    name = "null"
+
+    def __init__(self, window_map):
+        super().__init__(window_map)
+        self._next_hwnd = 1
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._quit = False
+        self.renderer = NullRenderer()
+        self.frames_presented = 0
+
+    def create_window(self, title, width, height, style=0):
+        hwnd = self._next_hwnd
+        self._next_hwnd += 1
+        return hwnd
+
+    def create_surface(self, window):
+        pass
+
+    def destroy_surface(self, window):
+        pass
+
+    def post_message(self, hwnd, msg, wParam=0, lParam=0, time_ms=None):
+        """Queue a window message for the next pump"""
+        if time_ms is None:
+            # Same units as MSG.time: milliseconds, wrapping at 32 bits
+            time_ms = int(time.perf_counter() * 1000) & 0xFFFFFFFF
+        self._queue.append((hwnd, msg, wParam, lParam, time_ms))
+        self._wakeup.set()
+
+    def pump_messages(self, on_message):
+        queue = self._queue
+        self._wakeup.clear()
+        while queue:
+            hwnd, msg, wParam, lParam, time_ms = queue.popleft()
+            if msg == WM_ACTIVATE or msg == WM_SIZE:
+                window = self.window_map.get(hwnd)
+                if window is not None:
+                    self.track_window_state(window, msg, wParam)
+            on_message(hwnd, msg, wParam, lParam, time_ms)
+            if msg == WM_CLOSE:
+                self._close(hwnd)
+        if self._quit:
+            self._quit = False
+            return False
+        return True
+
+    def _close(self, hwnd):
+        window = self.window_map.pop(hwnd, None)
+        if window is None:
+            return
+        on_quit = window.callbacks.OnApplicationQuit
+        if window.scene_started and on_quit:
+            on_quit()
+        window.cleanup()
+        self.post_message(hwnd, WM_DESTROY)
+        if not self.window_map:
+            self.post_quit()
+
+    def wait_messages(self, timeout=None):
+        if self._queue or self._quit:
+            return
+        self._wakeup.wait(timeout)
+
+    def wake(self, hwnd=None):
+        self._wakeup.set()
+
+    def begin_draw(self, window):
+        return self.renderer
+
+    def present(self, window, rects=None):
+        self.frames_presented += 1
+
+    def post_quit(self):
+        self._quit = True
+        self._wakeup.set()
+
+
+def default_backend_name():
+    """Backend used when none was chosen explicitly"""
+    name = os.environ.get('ANGENE_BACKEND')
+    if name:
+        return name.lower()
+    return "win32" if sys.platform == "win32" else "null"
+
+
+def create_backend(name, window_map):
+    """Instantiate a backend by name"""
+    if name == "null":
+        return NullBackend(window_map)
+    if name == "win32":
+        # Imported lazily: binds user32/gdi32 and registers AngeneClass
+        from Angene.Main.win32_backend import Win32Backend
+        return Win32Backend(window_map)
+    if name == "software":
+        # Imported lazily: needs NumPy
+        from Angene.Main.raster import SoftwareBackend
+        return SoftwareBackend(window_map)
+    raise ValueError(f"Angene Logic Error | Unknown backend '{name}'")
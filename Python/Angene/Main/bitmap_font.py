@@ -0,0 +1,139 @@
+# Angene\bitmap_font.py
+"""
+Built-in 5x8 bitmap font for renderers without a system font (the software
+rasterizer, headless thumbnails).
+
+Printable ASCII only, anything else draws as '?'. Each glyph is 5 columns of
+one byte, bit 0 is the top row; cells are 6 pixels wide with the spacing
+column, 8 pixels high including the descender row.
+"""
+
+FIRST = 32
+GLYPH_WIDTH = 5
+GLYPH_HEIGHT = 8
+ADVANCE = GLYPH_WIDTH + 1
+
+GLYPHS = (
+    b"\x00\x00\x00\x00\x00",  # ' '
+    b"\x00\x00\x5f\x00\x00",  # '!'
+    b"\x00\x07\x00\x07\x00",  # '"'
+    b"\x14\x7f\x14\x7f\x14",  # '#'
+    b"\x24\x2a\x7f\x2a\x12",  # '$'
+    b"\x23\x13\x08\x64\x62",  # '%'
+    b"\x36\x49\x56\x20\x50",  # '&'
+    b"\x00\x08\x07\x03\x00",  # "'"
+    b"\x00\x1c\x22\x41\x00",  # '('
+    b"\x00\x41\x22\x1c\x00",  # ')'
+    b"\x2a\x1c\x7f\x1c\x2a",  # '*'
+    b"\x08\x08\x3e\x08\x08",  # '+'
+    b"\x00\x80\x70\x30\x00",  # ','
+    b"\x08\x08\x08\x08\x08",  # '-'
+    b"\x00\x00\x60\x60\x00",  # '.'
+    b"\x20\x10\x08\x04\x02",  # '/'
+    b"\x3e\x51\x49\x45\x3e",  # '0'
+    b"\x00\x42\x7f\x40\x00",  # '1'
+    b"\x72\x49\x49\x49\x46",  # '2'
+    b"\x21\x41\x49\x4d\x33",  # '3'
+    b"\x18\x14\x12\x7f\x10",  # '4'
+    b"\x27\x45\x45\x45\x39",  # '5'
+    b"\x3c\x4a\x49\x49\x31",  # '6'
+    b"\x41\x21\x11\x09\x07",  # '7'
+    b"\x36\x49\x49\x49\x36",  # '8'
+    b"\x46\x49\x49\x29\x1e",  # '9'
+    b"\x00\x00\x14\x00\x00",  # ':'
+    b"\x00\x40\x34\x00\x00",  # ';'
+    b"\x00\x08\x14\x22\x41",  # '<'
+    b"\x14\x14\x14\x14\x14",  # '='
+    b"\x00\x41\x22\x14\x08",  # '>'
+    b"\x02\x01\x59\x09\x06",  # '?'
+    b"\x3e\x41\x5d\x59\x4e",  # '@'
+    b"\x7c\x12\x11\x12\x7c",  # 'A'
+    b"\x7f\x49\x49\x49\x36",  # 'B'
+    b"\x3e\x41\x41\x41\x22",  # 'C'
+    b"\x7f\x41\x41\x41\x3e",  # 'D'
+    b"\x7f\x49\x49\x49\x41",  # 'E'
+    b"\x7f\x09\x09\x09\x01",  # 'F'
+    b"\x3e\x41\x41\x51\x73",  # 'G'
+    b"\x7f\x08\x08\x08\x7f",  # 'H'
+    b"\x00\x41\x7f\x41\x00",  # 'I'
+    b"\x20\x40\x41\x3f\x01",  # 'J'
+    b"\x7f\x08\x14\x22\x41",  # 'K'
+    b"\x7f\x40\x40\x40\x40",  # 'L'
+    b"\x7f\x02\x1c\x02\x7f",  # 'M'
+    b"\x7f\x04\x08\x10\x7f",  # 'N'
+    b"\x3e\x41\x41\x41\x3e",  # 'O'
+    b"\x7f\x09\x09\x09\x06",  # 'P'
+    b"\x3e\x41\x51\x21\x5e",  # 'Q'
+    b"\x7f\x09\x19\x29\x46",  # 'R'
+    b"\x26\x49\x49\x49\x32",  # 'S'
+    b"\x03\x01\x7f\x01\x03",  # 'T'
+    b"\x3f\x40\x40\x40\x3f",  # 'U'
+    b"\x1f\x20\x40\x20\x1f",  # 'V'
+    b"\x3f\x40\x38\x40\x3f",  # 'W'
+    b"\x63\x14\x08\x14\x63",  # 'X'
+    b"\x03\x04\x78\x04\x03",  # 'Y'
+    b"\x61\x59\x49\x4d\x43",  # 'Z'
+    b"\x00\x7f\x41\x41\x41",  # '['
+    b"\x02\x04\x08\x10\x20",  # '\\'
+    b"\x00\x41\x41\x41\x7f",  # ']'
+    b"\x04\x02\x01\x02\x04",  # '^'
+    b"\x40\x40\x40\x40\x40",  # '_'
+    b"\x00\x03\x07\x08\x00",  # '`'
+    b"\x20\x54\x54\x78\x40",  # 'a'
+    b"\x7f\x28\x44\x44\x38",  # 'b'
+    b"\x38\x44\x44\x44\x28",  # 'c'
+    b"\x38\x44\x44\x28\x7f",  # 'd'
+    b"\x38\x54\x54\x54\x18",  # 'e'
+    b"\x00\x08\x7e\x09\x02",  # 'f'
+    b"\x18\xa4\xa4\x9c\x78",  # 'g'
+    b"\x7f\x08\x04\x04\x78",  # 'h'
+    b"\x00\x44\x7d\x40\x00",  # 'i'
+    b"\x20\x40\x40\x3d\x00",  # 'j'
+    b"\x7f\x10\x28\x44\x00",  # 'k'
+    b"\x00\x41\x7f\x40\x00",  # 'l'
+    b"\x7c\x04\x78\x04\x78",  # 'm'
+    b"\x7c\x08\x04\x04\x78",  # 'n'
+    b"\x38\x44\x44\x44\x38",  # 'o'
+    b"\xfc\x18\x24\x24\x18",  # 'p'
+    b"\x18\x24\x24\x18\xfc",  # 'q'
+    b"\x7c\x08\x04\x04\x08",  # 'r'
+    b"\x48\x54\x54\x54\x24",  # 's'
+    b"\x04\x04\x3f\x44\x24",  # 't'
+    b"\x3c\x40\x40\x20\x7c",  # 'u'
+    b"\x1c\x20\x40\x20\x1c",  # 'v'
+    b"\x3c\x40\x30\x40\x3c",  # 'w'
+    b"\x44\x28\x10\x28\x44",  # 'x'
+    b"\x4c\x90\x90\x90\x7c",  # 'y'
+    b"\x44\x64\x54\x4c\x44",  # 'z'
+    b"\x00\x08\x36\x41\x00",  # '{'
+    b"\x00\x00\x77\x00\x00",  # '|'
+    b"\x00\x41\x36\x08\x00",  # '}'
+    b"\x02\x01\x02\x04\x02",  # '~'
+)
+
+
+def glyph_columns(ch):
+    """The 5 column bytes of a character"""
+    index = ord(ch) - FIRST
+    if index < 0 or index >= len(GLYPHS):
+        index = ord("?") - FIRST
+    return GLYPHS[index]
+
+
+def text_mask(text):
+    """
+    Rows of 0/1 pixels covering text, (GLYPH_HEIGHT x ADVANCE * len(text)),
+    as a list of bytearrays
+    """
+    width = ADVANCE * len(text)
+    rows = [bytearray(width) for _ in range(GLYPH_HEIGHT)]
+    x = 0
+    for ch in text:
+        for column in glyph_columns(ch):
+            if column:
+                for y in range(GLYPH_HEIGHT):
+                    if column >> y & 1:
+                        rows[y][x] = 1
+            x += 1
+        x += 1  # spacing column
+    return rows
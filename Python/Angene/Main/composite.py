@@ -0,0 +1,228 @@
+# Angene\composite.py
+"""
+Premultiplied-alpha compositing with NumPy.
+
+Pixels are uint32 arrays with alpha in the top byte and the color channels
+below it in either order: RGBA on the software renderer, BGRA in GDI DIB
+sections. Every mode treats the three color channels alike, so both work
+unchanged. Sources are premultiplied (color already scaled by alpha, what
+AlphaBlend expects too); use premultiply() on straight-alpha pixels first.
+
+Modes, with S / D the source / destination channels in 0..1 and Sa / Da
+their alpha (the separable blend modes of the W3C compositing spec, all
+composited source-over):
+
+    normal    S + D (1 - Sa)
+    add       min(S + D, 1)
+    multiply  S D + S (1 - Da) + D (1 - Sa)
+    screen    S + D - S D
+
+opacity (0..1) scales the whole source first, so a fade is one blend() or
+blend_color() with a falling opacity. Everything runs in 16-bit integer
+math over whole spans (a clipped framebuffer slice) or gathered sprite
+pixels, rounded exactly like x * y / 255.
+
+NumPy is optional: importing this module works without it, blending does
+not.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NORMAL = "normal"
+ADD = "add"
+MULTIPLY = "multiply"
+SCREEN = "screen"
+MODES = (NORMAL, ADD, MULTIPLY, SCREEN)
+
+# Alpha byte of an opaque pixel in the uint32 view
+OPAQUE = 0xFF000000
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Angene Logic Error | Compositing needs NumPy (pip install numpy).")
+
+
+def check_mode(mode):
+    """Raise for anything but one of MODES"""
+    if mode not in MODES:
+        raise RuntimeError(f"Angene Logic Error | Unknown blend mode {mode!r}, "
+                           f"expected one of {', '.join(MODES)}.")
+
+
+def opacity_byte(opacity):
+    """opacity (0..1) as 0..255"""
+    if opacity >= 1:
+        return 255
+    if opacity <= 0:
+        return 0
+    return int(opacity * 255 + 0.5)
+
+
+def _mul(a, b):
+    """a * b / 255 rounded, for uint16 arrays of 0..255 values"""
+    t = a * b + 128
+    return (t + (t >> 8)) >> 8
+
+
+def _channels(pixels):
+    """(..., 4) uint8 view of uint32 pixels"""
+    return pixels.view(np.uint8).reshape(pixels.shape + (4,))
+
+
+def _strided(pixels):
+    """True when pixels' rows are not contiguous, channel views need them to be"""
+    return pixels.ndim > 0 and pixels.strides[-1] != pixels.itemsize
+
+
+def premultiply(pixels):
+    """Straight-alpha uint32 pixels as a new premultiplied array"""
+    _require_numpy()
+    pixels = np.asarray(pixels, dtype=np.uint32)
+    out = pixels.copy()
+    alpha = pixels >> 24
+    partial = alpha != 255
+    if not partial.any():
+        return out
+    c = _channels(out)
+    c16 = c[..., :3].astype(np.uint16)
+    c[..., :3] = _mul(c16, alpha.astype(np.uint16)[..., None])
+    return out
+
+
+def unpremultiply(pixels):
+    """Premultiplied uint32 pixels as a new straight-alpha array"""
+    _require_numpy()
+    pixels = np.asarray(pixels, dtype=np.uint32)
+    out = pixels.copy()
+    alpha = (pixels >> 24).astype(np.uint32)[..., None]
+    c = _channels(out)
+    color = c[..., :3].astype(np.uint32)
+    safe = np.maximum(alpha, 1)
+    c[..., :3] = np.where(alpha == 0, 0, np.minimum((color * 255 + safe // 2) // safe, 255))
+    return out
+
+
+def _blend_channels(d, s, mode):
+    """
+    Composite premultiplied channels s over d: uint16 (..., 4) arrays, s
+    may broadcast. Returns the result as uint16.
+    """
+    sa = s[..., 3:4]
+    if mode == NORMAL:
+        return s + _mul(d, 255 - sa)
+    if mode == ADD:
+        return np.minimum(s + d, 255)
+    if mode == SCREEN:
+        return s + d - _mul(s, d)
+    # MULTIPLY: the alpha channel works out to normal's Sa + Da (1 - Sa)
+    da = d[..., 3:4]
+    out = _mul(s, d) + _mul(s, 255 - da) + _mul(d, 255 - sa)
+    out[..., 3:] = sa + _mul(da, 255 - sa)
+    return np.minimum(out, 255)
+
+
+def blend(dst, src, mode=NORMAL, opacity=1.0):
+    """
+    Composite premultiplied src over dst in place.
+
+    Args:
+        dst: uint32 array (a framebuffer slice works, it is written through)
+        src: uint32 array of dst's shape
+        mode: One of MODES
+        opacity: 0..1, scales the whole source
+    """
+    _require_numpy()
+    check_mode(mode)
+    o = opacity_byte(opacity)
+    if o == 0:
+        return  # a zero source leaves every mode's destination as it is
+    if _strided(dst):
+        out = dst.copy()
+        blend(out, src, mode, opacity)
+        dst[...] = out
+        return
+    if _strided(src):
+        src = src.copy()
+    if mode == NORMAL and o == 255:
+        alpha = src >> 24
+        if (alpha == 255).all():
+            dst[...] = src
+            return
+        if not alpha.any():
+            return
+    s = _channels(src).astype(np.uint16)
+    if o != 255:
+        s = _mul(s, o)
+    d = _channels(dst)
+    d[...] = _blend_channels(d.astype(np.uint16), s, mode)
+
+
+def blend_color(dst, color, mode=NORMAL, opacity=1.0):
+    """
+    Composite one solid color over all of dst in place: translucent panels,
+    shadows, fades.
+
+    Args:
+        color: uint32 pixel in dst's channel order, alpha in the top byte
+               (a straight-alpha color, premultiplied here)
+    """
+    _require_numpy()
+    check_mode(mode)
+    o = opacity_byte(opacity)
+    s = np.frombuffer(int(color & 0xFFFFFFFF).to_bytes(4, "little"), np.uint8).astype(np.uint16)
+    s[:3] = _mul(s[:3], s[3])
+    if o != 255:
+        s = _mul(s, o)
+    if mode == NORMAL:
+        if s[3] == 0:
+            return
+        if s[3] == 255:
+            dst[...] = np.frombuffer(s.astype(np.uint8).tobytes(), np.uint32)[0]
+            return
+    if _strided(dst):
+        out = dst.copy()
+        blend_color(out, color, mode, opacity)
+        dst[...] = out
+        return
+    d = _channels(dst)
+    d[...] = _blend_channels(d.astype(np.uint16), s, mode)
+
+
+def blend_boxes(dst, src, boxes, mode=NORMAL, opacity=1.0):
+    """
+    Composite rectangles of premultiplied src over dst in place, in order:
+    what blend() does per sprite of a batch, without its per call checks
+    and copies.
+
+    Args:
+        dst, src: 2D uint32 arrays, C contiguous
+        boxes: x0, y0, x1, y1, u, v per rectangle: the dst area and the top
+               left corner of its pixels in src
+    """
+    _require_numpy()
+    check_mode(mode)
+    o = opacity_byte(opacity)
+    if o == 0:
+        return
+    d_all = _channels(dst)
+    s_all = _channels(src)
+    for x0, y0, x1, y1, u, v in boxes:
+        s = s_all[v:v + y1 - y0, u:u + x1 - x0].astype(np.uint16)
+        if o != 255:
+            s = _mul(s, o)
+        d = d_all[y0:y1, x0:x1]
+        d[...] = _blend_channels(d.astype(np.uint16), s, mode)
+
+
+def blend_at(flat, index, src, mode=NORMAL, opacity=1.0):
+    """
+    Composite src pixels over flat[index] (gathered sprite pixels). index
+    must not repeat, overlapping pixels need blending in turn.
+    """
+    target = flat[index]
+    blend(target, src, mode, opacity)
+    flat[index] = target
@@ -0,0 +1,115 @@
+# Angene\damage.py
+"""
+Dirty rectangle tracking for 2D windows.
+
+With engine.run(dirty_rects=True) every 2D window gets a DamageTracker.
+The renderer adds the bounds of each primitive it draws (clear() damages
+the whole surface), scenes can add regions with Window.invalidate(rect),
+and present only copies the merged rectangles to the screen. A frame that
+damaged nothing is not presented at all:
+
+    class Clock:
+        is_static = True
+
+        def OnDraw(self, r):
+            # no clear(): the surface keeps last frame, redraw the label only
+            r.draw_rect(8, 8, 120, 20, BACKGROUND)
+            r.draw_text(10, 10, time.strftime("%H:%M:%S"), WHITE)
+
+Rectangles are x0, y0, x1, y1 with x1 / y1 exclusive, clipped to the
+surface.
+"""
+
+# Most rectangles kept per frame; a new one merges into the rectangle it
+# grows least once this many exist
+MAX_RECTS = 8
+
+# Damage covering this much of the surface is presented in full
+FULL_FRACTION = 0.6
+
+
+class DamageTracker:
+    """Damaged rectangles of one surface, merged into a few as they come in"""
+    __slots__ = ("width", "height", "rects", "full", "max_rects")
+
+    def __init__(self, width, height, max_rects=MAX_RECTS):
+        self.width = width
+        self.height = height
+        self.rects = []
+        # Nothing has been shown yet
+        self.full = True
+        self.max_rects = max_rects
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.add_all()
+
+    def add_all(self):
+        """Damage the whole surface"""
+        self.full = True
+        self.rects.clear()
+
+    def add(self, x0, y0, x1, y1):
+        """Damage x0, y0, x1, y1 (flipped rectangles are fine)"""
+        if self.full:
+            return
+        if x0 > x1:
+            x0, x1 = x1, x0
+        if y0 > y1:
+            y0, y1 = y1, y0
+        x0 = max(int(x0), 0)
+        y0 = max(int(y0), 0)
+        x1 = min(int(x1), self.width)
+        y1 = min(int(y1), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        # Merge into the rectangle whose bounds grow the least; free when
+        # the two overlap enough, forced when the list is full
+        area = (x1 - x0) * (y1 - y0)
+        rects = self.rects
+        best = -1
+        best_growth = None
+        for i, (a0, b0, a1, b1) in enumerate(rects):
+            u0 = a0 if a0 < x0 else x0
+            v0 = b0 if b0 < y0 else y0
+            u1 = a1 if a1 > x1 else x1
+            v1 = b1 if b1 > y1 else y1
+            growth = (u1 - u0) * (v1 - v0) - (a1 - a0) * (b1 - b0) - area
+            if growth <= 0:
+                rects[i] = (u0, v0, u1, v1)
+                return
+            if best_growth is None or growth < best_growth:
+                best = i
+                best_growth = growth
+        if len(rects) < self.max_rects:
+            rects.append((x0, y0, x1, y1))
+            return
+        a0, b0, a1, b1 = rects[best]
+        rects[best] = (min(a0, x0), min(b0, y0), max(a1, x1), max(b1, y1))
+
+    def add_rect(self, x, y, w, h):
+        """Damage x, y, w, h"""
+        self.add(x, y, x + w, y + h)
+
+    def empty(self):
+        return not self.full and not self.rects
+
+    def take(self):
+        """
+        The damaged rectangles since the last take(), then reset. Empty
+        when nothing changed; one full-surface rectangle when most did.
+        """
+        if self.full:
+            self.full = False
+            return [(0, 0, self.width, self.height)]
+        rects = self.rects
+        if not rects:
+            return []
+        self.rects = []
+        if len(rects) > 1:
+            total = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+            if total >= FULL_FRACTION * self.width * self.height:
+                return [(0, 0, self.width, self.height)]
+        return rects
@@ -348,4 +348,35 @@ SWP_NOCOPYBITS      = 0x0100
 SWP_NOOWNERZORDER   = 0x0200
 SWP_NOSENDCHANGING  = 0x0400
 SWP_DEFERERASE      = 0x2000
-SWP_ASYNCWINDOWPOS  = 0x4000
\ No newline at end of file
+SWP_ASYNCWINDOWPOS  = 0x4000
+# WM_ACTIVATE state (WA_) definitions
+WA_INACTIVE         = 0
+WA_ACTIVE           = 1
+WA_CLICKACTIVE      = 2
+
+# WM_SIZE request (SIZE_) definitions
+SIZE_RESTORED       = 0
+SIZE_MINIMIZED      = 1
+SIZE_MAXIMIZED      = 2
+SIZE_MAXSHOW        = 3
+SIZE_MAXHIDE        = 4
+
+# QueueStatusFlags (QS_) definitions
+QS_KEY              = 0x0001
+QS_MOUSEMOVE        = 0x0002
+QS_MOUSEBUTTON      = 0x0004
+QS_POSTMESSAGE      = 0x0008
+QS_TIMER            = 0x0010
+QS_PAINT            = 0x0020
+QS_SENDMESSAGE      = 0x0040
+QS_HOTKEY           = 0x0080
+QS_ALLPOSTMESSAGE   = 0x0100
+QS_RAWINPUT         = 0x0400
+QS_ALLINPUT         = 0x04FF
+
+# MsgWaitForMultipleObjectsEx flags (MWMO_) definitions
+MWMO_WAITALL        = 0x0001
+MWMO_ALERTABLE      = 0x0002
+MWMO_INPUTAVAILABLE = 0x0004
+
+INFINITE            = 0xFFFFFFFF
@@ -0,0 +1,198 @@
+# Angene\dispatch.py
+"""
+Scene callback dispatch tables.
+
+Scenes are duck typed: any of the lifecycle methods below may be missing.
+Instead of probing with hasattr() for every window on every step, a scene's
+methods are resolved once (when it is set on a Window) and the engine keeps
+flat per-phase lists of bound methods that are rebuilt only when a window
+or scene changes.
+
+Phase order within one frame:
+    Start (once) -> OnEvents / OnMessage
+                 -> FixedUpdate -> Update -> LateUpdate (0..n fixed steps)
+                 -> OnDraw
+Update and LateUpdate move out of the fixed steps, once per frame, with
+engine.run(update_per_tick=False).
+OnApplicationQuit runs when the window closes. A window whose async Start
+is still running takes part in no other phase until it finishes; its input
+waits in its EventBatch.
+"""
+
+from Angene.Main.aio import AsyncCallback
+
+# Lifecycle phases in the order the engine runs them
+PHASES = (
+    "Start",
+    "OnEvents",
+    "OnMessage",
+    "FixedUpdate",
+    "Update",
+    "LateUpdate",
+    "OnDraw",
+    "OnApplicationQuit",
+)
+
+# Phases that may be async def (OnDraw must finish within its frame)
+ASYNC_PHASES = frozenset(PHASES) - {"OnDraw"}
+
+# Async phases whose calls queue while the previous one runs, input is
+# never dropped (the others skip a call instead of piling up)
+QUEUED_PHASES = frozenset(("OnEvents", "OnMessage"))
+
+# Async phases the loop lets finish when it stops instead of cancelling
+FINISHED_PHASES = frozenset(("OnApplicationQuit",))
+
+# Older spellings still accepted for a phase
+ALIASES = {
+    "OnMessage": ("OnWindowMessage",),
+}
+
+
+def accepts_positional(fn, count):
+    """True if fn can be called with count positional arguments"""
+    import inspect  # only needed once scenes are set, keeps import fast
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = 0
+    for p in params:
+        if p.kind == p.VAR_POSITIONAL:
+            return True
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
+            positional += 1
+    return positional >= count
+
+
+def is_coroutine_function(fn):
+    """True for async def functions and methods"""
+    import inspect
+    return inspect.iscoroutinefunction(fn)
+
+
+class SceneCallbacks:
+    """A scene's lifecycle methods, bound once (None where not defined)"""
+    __slots__ = ("scene", "draw_alpha") + PHASES
+
+    def __init__(self, scene):
+        self.scene = scene
+        for phase in PHASES:
+            fn = getattr(scene, phase, None) if scene is not None else None
+            if fn is None:
+                for alias in ALIASES.get(phase, ()):
+                    fn = getattr(scene, alias, None)
+                    if fn is not None:
+                        break
+            if not callable(fn):
+                fn = None
+            elif phase in ASYNC_PHASES and is_coroutine_function(fn):
+                # Started as an asyncio task, see aio.AsyncCallback
+                fn = AsyncCallback(fn, queue=phase in QUEUED_PHASES,
+                                   finish=phase in FINISHED_PHASES)
+            setattr(self, phase, fn)
+
+        # OnDraw(r, alpha) receives the interpolation factor, OnDraw(r) does not
+        self.draw_alpha = bool(self.OnDraw) and accepts_positional(self.OnDraw, 2)
+
+
+# Shared table for windows without a scene
+EMPTY = SceneCallbacks(None)
+
+
+class DispatchTable:
+    """Per-phase lists of bound callbacks across all windows"""
+
+    def __init__(self):
+        self.dirty = True
+        self.pending_start = []   # windows whose scene has not started yet
+        self.events = []          # (window, OnEvents, OnMessage, copy the batch)
+        self.event_queues = {}    # hwnd -> EventBatch of windows with handlers
+        # The lists below hold (bound method, profiler span name)
+        self.fixed_update = []    # FixedUpdate
+        self.update = []          # Update
+        self.late_update = []     # LateUpdate
+        self.draw = []            # (window, OnDraw, takes alpha, span, present span)
+
+    def invalidate(self):
+        """Mark the table stale; it is rebuilt at the next phase boundary"""
+        self.dirty = True
+
+    def rebuild(self, windows):
+        pending_start = []
+        events = []
+        event_queues = {}
+        fixed_update = []
+        update = []
+        late_update = []
+        draw = []
+
+        for w in windows:
+            cb = w.callbacks
+            if cb.scene is None:
+                continue
+            if not w.scene_started:
+                pending_start.append(w)
+            starting = isinstance(cb.Start, AsyncCallback) and cb.Start.running()
+            # Span names are built here so profiling never formats per frame
+            label = f"{w.title}/{type(cb.scene).__name__}"
+            if cb.OnEvents or cb.OnMessage:
+                # An async OnEvents runs after the batch is cleared for reuse
+                copy = isinstance(cb.OnEvents, AsyncCallback)
+                event_queues[w.hwnd] = w.events
+                if not starting:
+                    events.append((w, cb.OnEvents, cb.OnMessage, copy))
+            if starting:
+                continue  # the rest waits for the async Start
+            if cb.FixedUpdate:
+                fixed_update.append((cb.FixedUpdate, label + ".FixedUpdate"))
+            if cb.Update:
+                update.append((cb.Update, label + ".Update"))
+            if cb.LateUpdate:
+                late_update.append((cb.LateUpdate, label + ".LateUpdate"))
+            if cb.OnDraw:
+                draw.append((w, cb.OnDraw, cb.draw_alpha,
+                             label + ".OnDraw", label + ".Present"))
+
+        self.pending_start = pending_start
+        self.events = events
+        self.event_queues = event_queues
+        self.fixed_update = fixed_update
+        self.update = update
+        self.late_update = late_update
+        self.draw = draw
+        self.dirty = False
+
+    def refresh(self, windows):
+        """Rebuild if stale and start any scene that was just set"""
+        if self.dirty:
+            self.rebuild(windows)
+        if self.pending_start:
+            self.run_start()
+            if self.dirty:
+                # An async Start is still running, leave its window out
+                self.rebuild(windows)
+
+    def run_start(self):
+        """
+        Call Start on every scene that has not started yet. An async Start
+        that does not finish right away marks the table stale, and again
+        once it is done.
+        """
+        pending = self.pending_start
+        if not pending:
+            return
+        self.pending_start = []
+        for w in pending:
+            if w.scene_started:
+                continue
+            w.scene_started = True
+            start = w.callbacks.Start
+            if start:
+                start()
+                if isinstance(start, AsyncCallback) and start.running():
+                    self.dirty = True
+                    start.task.add_done_callback(self._start_done)
+
+    def _start_done(self, task):
+        self.dirty = True
@@ -0,0 +1,368 @@
+# Angene\display_list.py
+"""
+Recorded display lists for the painter.Renderer API.
+
+A DisplayList has the same clear / draw_rect / draw_text (and batched
+draw_rects / draw_texts) methods as a Renderer but only appends (opcode, rect, color) to flat arrays. Replaying it
+draws the commands grouped by color, so a GDI renderer selects each brush
+once per group instead of four SelectObject calls per rectangle:
+
+    hud = DisplayList()
+    hud.draw_rect(0, 0, 200, 20, RGB(30, 30, 30))
+    hud.draw_text(4, 2, "Score", RGB(255, 255, 255))
+
+    def OnDraw(self, r):
+        r.draw_list(hud)        # re-submit without rebuilding it
+
+With engine.run(display_lists=True) every 2D OnDraw records into a
+per-window list that is replayed at the end of the draw; if it matches the
+previous frame's list the replay is skipped, the surface already holds it.
+
+Grouping never changes what ends up on screen: a rectangle only moves into
+an earlier group of its color when it does not overlap anything drawn in
+between, text is never reordered, and everything before a clear() is
+dropped.
+"""
+
+from array import array
+
+OP_CLEAR = 0
+OP_RECT = 1
+OP_TEXT = 2
+OP_LAYER = 3
+OP_IMAGE = 4
+OP_BLEND = 5
+
+# Batches searched backwards for one of the same color
+LOOKBACK = 8
+
+# Batches up to this many coordinates (4 per rect) are checked rect by rect
+# when their bounds overlap; bigger ones count as overlapping
+EXACT_OVERLAP_ITEMS = 64
+
+
+def _column(values, n):
+    """values as a sequence of n numbers, a single number is repeated"""
+    if isinstance(values, (int, float)):
+        return [values] * n
+    if hasattr(values, "tolist"):
+        values = values.tolist()  # NumPy arrays, array.array, memoryview
+    return values
+
+
+def rect_coords(x, y, w, h):
+    """
+    Interleaved x0, y0, x1, y1 array('i') for rectangles given as columns
+    of x, y, w, h: sequences, buffer-protocol objects or NumPy arrays, w and
+    h may also be a single number. Values are truncated like draw_rect().
+    """
+    if hasattr(x, "astype") and hasattr(y, "astype"):
+        # NumPy: arithmetic and conversion stay in C
+        columns = (x, y, x + w, y + h)
+        columns = [array('i', c.astype("=i4").tobytes()) for c in columns]
+    else:
+        n = len(x)
+        xs = _column(x, n)
+        ys = _column(y, n)
+        columns = (
+            array('i', map(int, xs)),
+            array('i', map(int, ys)),
+            array('i', [int(a + b) for a, b in zip(xs, _column(w, n))]),
+            array('i', [int(a + b) for a, b in zip(ys, _column(h, n))]),
+        )
+    coords = array('i', bytes(16 * len(columns[0])))
+    for i, column in enumerate(columns):
+        coords[i::4] = column
+    return coords
+
+
+def color_column(color, n):
+    """array('L') of n colors from one COLORREF or one per item"""
+    if isinstance(color, int):
+        return array('L', [color]) * n
+    return array('L', _column(color, n))
+
+
+def _overlaps_any(items, x0, y0, x1, y1):
+    """True if any x0, y0, x1, y1 rectangle in items overlaps the given one"""
+    for j in range(0, len(items), 4):
+        a0 = items[j]
+        a1 = items[j + 2]
+        if a0 > a1:
+            a0, a1 = a1, a0
+        if x0 >= a1 or a0 >= x1:
+            continue
+        b0 = items[j + 1]
+        b1 = items[j + 3]
+        if b0 > b1:
+            b0, b1 = b1, b0
+        if y0 < b1 and b0 < y1:
+            return True
+    return False
+
+
+class DisplayList:
+    """Array-backed command buffer with the painter.Renderer API"""
+    __slots__ = ("ops", "coords", "colors", "texts", "objects", "_batches")
+
+    def __init__(self):
+        self.ops = array('B')
+        self.coords = array('i')   # x0, y0, x1, y1 per command (text: x, y, index, 0)
+        self.colors = array('L')
+        self.texts = []
+        # (layers.Layer, its version when drawn), (images.Image, src rect,
+        # opacity, mode) or (color, opacity, mode) of a blend_rect(); these
+        # commands keep the index in their color slot
+        self.objects = []
+        self._batches = None       # compiled replay order, see batches()
+
+    # Recording (painter.Renderer API)
+
+    def clear(self, color):
+        """Clear the entire drawing surface with a solid color"""
+        self.ops.append(OP_CLEAR)
+        self.coords.extend((-1, -1, 10000, 10000))
+        self.colors.append(color)
+        self._batches = None
+
+    def draw_rect(self, x, y, w, h, color):
+        """Draw a filled rectangle"""
+        self.ops.append(OP_RECT)
+        self.coords.extend((int(x), int(y), int(x + w), int(y + h)))
+        self.colors.append(color)
+        self._batches = None
+
+    def draw_text(self, x, y, text, color):
+        """Draw text at the specified position"""
+        self.ops.append(OP_TEXT)
+        self.coords.extend((int(x), int(y), len(self.texts), 0))
+        self.colors.append(color)
+        self.texts.append(str(text)[:256])
+        self._batches = None
+
+    def draw_rects(self, x, y, w, h, color):
+        """Draw many filled rectangles, see painter.Renderer.draw_rects()"""
+        coords = rect_coords(x, y, w, h)
+        n = len(coords) // 4
+        self.ops.frombytes(bytes((OP_RECT,)) * n)
+        self.coords.extend(coords)
+        self.colors.extend(color_column(color, n))
+        self._batches = None
+
+    def draw_texts(self, x, y, texts, color):
+        """Draw many strings, see painter.Renderer.draw_texts()"""
+        n = len(texts)
+        colors = color_column(color, n)
+        for xi, yi, text in zip(_column(x, n), _column(y, n), texts):
+            self.ops.append(OP_TEXT)
+            self.coords.extend((int(xi), int(yi), len(self.texts), 0))
+            self.texts.append(str(text)[:256])
+        self.colors.extend(colors)
+        self._batches = None
+
+    def draw_layer(self, layer, x=0, y=0):
+        """Composite a layers.Layer (not reordered, replays when invalidated)"""
+        x = int(x)
+        y = int(y)
+        self.ops.append(OP_LAYER)
+        self.coords.extend((x, y, x + layer.width, y + layer.height))
+        self.colors.append(len(self.objects))
+        self.objects.append((layer, layer.version))
+        self._batches = None
+
+    def draw_image(self, image, x, y, w=None, h=None, src=None, opacity=1.0, mode="normal"):
+        """Draw an images.Image, see painter.Renderer.draw_image()"""
+        if src is None:
+            src = (0, 0, image.width, image.height)
+        x = int(x)
+        y = int(y)
+        self.ops.append(OP_IMAGE)
+        self.coords.extend((x, y, x + int(src[2] if w is None else w), y + int(src[3] if h is None else h)))
+        self.colors.append(len(self.objects))
+        self.objects.append((image, tuple(src), opacity, mode))
+        self._batches = None
+
+    def draw_sprites(self, image, items, opacity=1.0, mode="normal"):
+        """Draw many parts of one image, recorded as one image command each"""
+        for j in range(0, len(items), 8):
+            x, y, w, h = items[j:j + 4]
+            self.draw_image(image, x, y, w, h, tuple(items[j + 4:j + 8]), opacity, mode)
+
+    def blend_rect(self, x, y, w, h, color, opacity=1.0, mode="normal"):
+        """Composite a solid rectangle, see painter.Renderer.blend_rect() (not reordered)"""
+        self.ops.append(OP_BLEND)
+        self.coords.extend((int(x), int(y), int(x + w), int(y + h)))
+        self.colors.append(len(self.objects))
+        self.objects.append((color, opacity, mode))
+        self._batches = None
+
+    def draw_list(self, other):
+        """Append another display list's commands"""
+        text_base = len(self.texts)
+        object_base = len(self.objects)
+        self.ops.extend(other.ops)
+        if text_base and other.texts:
+            coords = array('i', other.coords)
+            for i, op in enumerate(other.ops):
+                if op == OP_TEXT:
+                    coords[i * 4 + 2] += text_base
+            self.coords.extend(coords)
+        else:
+            self.coords.extend(other.coords)
+        if object_base and other.objects:
+            colors = array('L', other.colors)
+            for i, op in enumerate(other.ops):
+                if op >= OP_LAYER:
+                    colors[i] += object_base
+            self.colors.extend(colors)
+        else:
+            self.colors.extend(other.colors)
+        self.texts.extend(other.texts)
+        self.objects.extend(other.objects)
+        self._batches = None
+
+    def reset(self):
+        """Drop all commands, keeping the allocated arrays"""
+        del self.ops[:]
+        del self.coords[:]
+        del self.colors[:]
+        self.texts.clear()
+        self.objects.clear()
+        self._batches = None
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __eq__(self, other):
+        if not isinstance(other, DisplayList):
+            return NotImplemented
+        # array comparisons run in C
+        return (self.ops == other.ops and self.colors == other.colors
+                and self.coords == other.coords and self.texts == other.texts
+                and self.objects == other.objects)
+
+    __hash__ = None
+
+    def copy_from(self, other):
+        """Make this list a copy of other, reusing this list's arrays"""
+        self.ops[:] = other.ops
+        self.coords[:] = other.coords
+        self.colors[:] = other.colors
+        self.texts[:] = other.texts
+        self.objects[:] = other.objects
+        self._batches = other._batches
+
+    # Replay
+
+    def batches(self):
+        """
+        Commands in replay order as (opcode, color, items): items is a flat
+        array of x0, y0, x1, y1 per rect (or clear), of x, y, index into
+        texts per text. Layers, images and blended rectangles come one per
+        batch with their index into objects as the color, see draw_object().
+        Compiled once and cached until the list changes.
+        """
+        if self._batches is None:
+            self._batches = self._compile()
+        return self._batches
+
+    def _compile(self):
+        ops = self.ops
+        coords = self.coords
+        colors = self.colors
+
+        # Nothing before the last clear is visible
+        start = 0
+        for i in range(len(ops) - 1, -1, -1):
+            if ops[i] == OP_CLEAR:
+                start = i
+                break
+
+        # [opcode, color, items, bx0, by0, bx1, by1]
+        batches = []
+        for i in range(start, len(ops)):
+            op = ops[i]
+            color = colors[i]
+            j = i * 4
+            if op >= OP_LAYER:
+                # Never merged, and rectangles do not move across them
+                batches.append([op, color, coords[j:j + 4], 0, 0, 0, 0])
+                continue
+            if op == OP_TEXT:
+                last = batches[-1] if batches else None
+                item = (coords[j], coords[j + 1], coords[j + 2])
+                if last is not None and last[0] == OP_TEXT and last[1] == color:
+                    last[2].extend(item)
+                else:
+                    batches.append([OP_TEXT, color, array('i', item), 0, 0, 0, 0])
+                continue
+
+            x0, y0, x1, y1 = coords[j], coords[j + 1], coords[j + 2], coords[j + 3]
+            # Bounds for the overlap test, GDI accepts flipped rectangles
+            bx0, bx1 = (x0, x1) if x0 <= x1 else (x1, x0)
+            by0, by1 = (y0, y1) if y0 <= y1 else (y1, y0)
+            target = None
+            if op == OP_RECT:
+                # Latest earlier batch of this color, as long as nothing in
+                # between overlaps (text extents are unknown, never skip text)
+                for k in range(len(batches) - 1, max(len(batches) - LOOKBACK, 0) - 1, -1):
+                    batch = batches[k]
+                    if batch[0] != OP_RECT:
+                        break
+                    if batch[1] == color:
+                        target = batch
+                        break
+                    if bx0 < batch[5] and batch[3] < bx1 and by0 < batch[6] and batch[4] < by1:
+                        # Bounds overlap: look closer only while that is cheap
+                        items = batch[2]
+                        if len(items) > EXACT_OVERLAP_ITEMS or _overlaps_any(items, bx0, by0, bx1, by1):
+                            break
+            if target is None:
+                batches.append([op, color, array('i', (x0, y0, x1, y1)), bx0, by0, bx1, by1])
+            else:
+                target[2].extend((x0, y0, x1, y1))
+                if bx0 < target[3]:
+                    target[3] = bx0
+                if by0 < target[4]:
+                    target[4] = by0
+                if bx1 > target[5]:
+                    target[5] = bx1
+                if by1 > target[6]:
+                    target[6] = by1
+
+        return [(b[0], b[1], b[2]) for b in batches]
+
+    def draw_object(self, renderer, op, index, items):
+        """Draw a layer, image or blended rectangle batch with renderer"""
+        entry = self.objects[index]
+        x = items[0]
+        y = items[1]
+        if op == OP_LAYER:
+            renderer.draw_layer(entry[0], x, y)
+        elif op == OP_IMAGE:
+            image, src, opacity, mode = entry
+            renderer.draw_image(image, x, y, items[2] - x, items[3] - y, src, opacity, mode)
+        else:
+            color, opacity, mode = entry
+            renderer.blend_rect(x, y, items[2] - x, items[3] - y, color, opacity, mode)
+
+    def replay(self, renderer):
+        """Draw the list with renderer, through its draw_list() if it has one"""
+        draw_list = getattr(renderer, "draw_list", None)
+        if draw_list is not None:
+            draw_list(self)
+            return
+        texts = self.texts
+        for op, color, items in self.batches():
+            if op == OP_RECT:
+                for j in range(0, len(items), 4):
+                    x0 = items[j]
+                    y0 = items[j + 1]
+                    renderer.draw_rect(x0, y0, items[j + 2] - x0, items[j + 3] - y0, color)
+            elif op == OP_TEXT:
+                for j in range(0, len(items), 3):
+                    renderer.draw_text(items[j], items[j + 1], texts[items[j + 2]], color)
+            elif op >= OP_LAYER:
+                self.draw_object(renderer, op, color, items)
+            else:
+                renderer.clear(color)
@@ -1,16 +1,23 @@
 # Angene\window.py
-import threading
 import sys
-import ctypes
 from Angene.Main import painter
+from Angene.Main import images
+from Angene.Main import backends
+from Angene.Main.timing import FramePacer, CatchUpGuard
+from Angene.Main import dispatch as _dispatch
+from Angene.Main.events import EventBatch
+from Angene.Main.display_list import DisplayList
+from Angene.Main.damage import DamageTracker
+from Angene.Main.scheduler import Scheduler
+from Angene.Main.jobs import JobSystem
+from Angene.Main.profiler import Profiler
+from Angene.Main import trace
+from Angene.Main import aio
+from Angene.Main import replay as _replay
 import time
 import traceback
-from Angene.Main.definitions import *
 
-# hook into user32.dll with definitions
-user32 = ctypes.WinDLL('user32', use_last_error=True)
-gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
-kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+perf_counter = time.perf_counter
 
 # Add crash handler
 def exception_hook(exctype, value, tb):
@@ -30,6 +37,67 @@ scene_started = False
 
 last_time = time.perf_counter()
 
+window_map = {}
+
+# Bound scene callbacks per phase, rebuilt when windows or scenes change
+dispatch_table = _dispatch.DispatchTable()
+
+# Multi-rate timers (every/at_rate/after), advanced by game time each frame
+scheduler = Scheduler()
+
+# Worker pool for background jobs; main-thread callbacks run each frame
+jobs = JobSystem()
+
+# Frame phase profiler, engine.profiler.enable() then .stats() / .report()
+profiler = Profiler()
+
+# Trace Event Format recorder, see enable_tracing()
+tracer = trace.recorder
+
+# Interpolation factor between the last two fixed ticks, valid during OnDraw
+render_alpha = 1.0
+
+# Frame pacer of the running loop, engine.pacer.stats() for pacing error
+pacer = None
+
+# Catch-up guard of the running loop; catchup.dilation is game seconds per
+# real second (below 1.0 when the machine cannot keep up)
+catchup = None
+
+# Worker pool drawing 2D windows in parallel, see run(render_workers=...)
+render_pool = None
+
+# 2D OnDraw records into a per-window DisplayList, see run(display_lists=...)
+use_display_lists = False
+
+# 2D windows present only what was drawn, see run(dirty_rects=...)
+use_dirty_rects = False
+
+# Platform backend (window creation, message pump, present), created on first use
+backend = None
+
+def set_backend(name):
+    """
+    Select the platform backend before creating any window.
+
+    Args:
+        name: "win32", "null" or an already constructed backends.Backend
+    """
+    global backend
+    if window_map:
+        raise RuntimeError("Angene Logic Error | Cannot switch backend after windows were created.")
+    if isinstance(name, backends.Backend):
+        backend = name
+    else:
+        backend = backends.create_backend(name, window_map)
+    return backend
+
+def get_backend():
+    """Return the active backend, creating the platform default if needed"""
+    if backend is None:
+        set_backend(backends.default_backend_name())
+    return backend
+
 class Window:
     hwnd = None
     scene = None
@@ -38,329 +106,81 @@ class Window:
     mem_dc = None
     bmp = None
     old_bmp = None
+    renderer = None       # Backend's persistent 2D renderer for mem_dc
     scene_started = False
+    closed = False        # cleanup() ran, the surface is gone
     is_3d = False  # Flag to determine rendering mode
+    active = True         # Has focus (WM_ACTIVATE)
+    minimized = False     # Iconic (WM_SIZE)
+    needs_redraw = True   # Static scenes only draw when this is set
+    callbacks = _dispatch.EMPTY  # Scene methods resolved by set_scene
+    display_list = None       # This frame's recorded draw (display_lists=True)
+    last_display_list = None  # What the surface currently shows
+    damage = None             # DamageTracker of the surface (dirty_rects=True)
 
     def __init__(self, title, width, height, use_3d=False):
-        self.hwnd = create_new_window(title, width, height)
+        self.backend = get_backend()
+        self.hwnd = self.backend.create_window(title, width, height)
+        self.title = title
         self.width = width
         self.height = height
         self.scene_started = False
         self.is_3d = use_3d
+        self.events = EventBatch()
         window_map[self.hwnd] = self
+        dispatch_table.invalidate()
 
         # Only create memory DC for 2D rendering
         if not use_3d:
-            hdc = user32.GetDC(self.hwnd)
-            self.mem_dc = gdi32.CreateCompatibleDC(hdc)
-            self.bmp = gdi32.CreateCompatibleBitmap(hdc, width, height)
-            self.old_bmp = gdi32.SelectObject(self.mem_dc, self.bmp)
-            user32.ReleaseDC(self.hwnd, hdc)
+            self.backend.create_surface(self)
 
     def cleanup(self):
+        # WM_CLOSE and engine shutdown can both get here
+        if self.closed:
+            return
+        self.closed = True
+        dispatch_table.invalidate()
+
         # Only cleanup memory DC if 2D
         if not self.is_3d:
-            if self.old_bmp:
-                gdi32.SelectObject(self.mem_dc, self.old_bmp)
-            if self.bmp:
-                gdi32.DeleteObject(self.bmp)
-            if self.mem_dc:
-                gdi32.DeleteDC(self.mem_dc)
-        
+            self.backend.destroy_surface(self)
+
         # Cleanup 3D renderer if present
         if self.scene and hasattr(self.scene, 'renderer_3d') and self.scene.renderer_3d:
             self.scene.renderer_3d.cleanup()
-    
+
+    def invalidate(self, rect=None):
+        """
+        Redraw this window next frame (wakes an idle loop, any thread)
+
+        Args:
+            rect: x, y, w, h of the surface to present again with
+                  dirty_rects, for changes the renderer did not see
+        """
+        if rect is not None and self.damage is not None:
+            self.damage.add_rect(*rect)
+        self.needs_redraw = True
+        self.backend.wake(self.hwnd)
+
     def set_scene(self, scene):
         self.scene = scene
         self.scene_started = False
-
-# Define GetGuiResources for monitoring GDI objects
-user32.GetGuiResources = user32.GetGuiResources
-user32.GetGuiResources.argtypes = [ctypes.c_void_p, ctypes.c_uint]
-user32.GetGuiResources.restype = ctypes.c_ulong
-
-GR_GDIOBJECTS = 0
-GR_USEROBJECTS = 1
+        self.needs_redraw = True
+        # Resolve lifecycle methods once instead of hasattr() every frame
+        self.callbacks = _dispatch.SceneCallbacks(scene)
+        dispatch_table.invalidate()
 
 def get_gdi_object_count():
     """Get current GDI object count for this process"""
-    process = kernel32.GetCurrentProcess()
-    return user32.GetGuiResources(process, GR_GDIOBJECTS)
-
-kernel32.GetCurrentProcess.argtypes = []
-kernel32.GetCurrentProcess.restype = ctypes.c_void_p
-
-# GDI fixes for x64 compatibility
-SelectObject = gdi32.SelectObject
-SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
-SelectObject.restype = ctypes.c_void_p
-
-CreateSolidBrush = gdi32.CreateSolidBrush
-CreateSolidBrush.argtypes = [ctypes.c_ulong]
-CreateSolidBrush.restype = ctypes.c_void_p
-
-DeleteObject = gdi32.DeleteObject
-DeleteObject.argtypes = [ctypes.c_void_p]
-DeleteObject.restype = ctypes.c_bool
-
-# Define GetDC and ReleaseDC properly
-user32.GetDC.argtypes = [ctypes.c_void_p]
-user32.GetDC.restype = ctypes.c_void_p
-
-user32.ReleaseDC.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
-user32.ReleaseDC.restype = ctypes.c_int
-
-# Define CreateCompatibleDC and CreateCompatibleBitmap
-gdi32.CreateCompatibleDC.argtypes = [ctypes.c_void_p]
-gdi32.CreateCompatibleDC.restype = ctypes.c_void_p
-
-gdi32.CreateCompatibleBitmap.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
-gdi32.CreateCompatibleBitmap.restype = ctypes.c_void_p
-
-gdi32.DeleteDC.argtypes = [ctypes.c_void_p]
-gdi32.DeleteDC.restype = ctypes.c_bool
-
-# Define BitBlt properly
-gdi32.BitBlt.argtypes = [
-    ctypes.c_void_p,  # hdcDest
-    ctypes.c_int,     # nXDest
-    ctypes.c_int,     # nYDest
-    ctypes.c_int,     # nWidth
-    ctypes.c_int,     # nHeight
-    ctypes.c_void_p,  # hdcSrc
-    ctypes.c_int,     # nXSrc
-    ctypes.c_int,     # nYSrc
-    ctypes.c_ulong    # dwRop
-]
-gdi32.BitBlt.restype = ctypes.c_bool
-
-
-# Define WndProc with CORRECT signature
-WNDPROC = ctypes.WINFUNCTYPE(
-    ctypes.c_longlong,      # LRESULT (return type)
-    ctypes.c_void_p,        # HWND
-    ctypes.c_uint,          # UINT (message)
-    ctypes.c_ulonglong,     # WPARAM (64-bit)
-    ctypes.c_longlong       # LPARAM (64-bit)
-)
-
-# Classes
-class RECT(ctypes.Structure):
-    _fields_ = [("left", ctypes.c_long),
-                ("top", ctypes.c_long),
-                ("right", ctypes.c_long),
-                ("bottom", ctypes.c_long)]
-
-
-class PAINTSTRUCT(ctypes.Structure):
-    _fields_ = [
-        ("hdc", ctypes.c_void_p),
-        ("fErase", ctypes.c_bool),
-        ("rcPaint", RECT),
-        ("fRestore", ctypes.c_bool),
-        ("fIncUpdate", ctypes.c_bool),
-        ("rgbReserved", ctypes.c_byte * 32),
-    ]
-
-CreateWindowExW = user32.CreateWindowExW
-GetMessage = user32.GetMessageW
-TranslateMessage = user32.TranslateMessage
-DispatchMessage = user32.DispatchMessageW
-PeekMessageW = user32.PeekMessageW
-
-# Properly define DefWindowProcW FIRST
-DefWindowProcW = user32.DefWindowProcW
-DefWindowProcW.argtypes = [
-    ctypes.c_void_p,        # HWND
-    ctypes.c_uint,          # UINT (message)
-    ctypes.c_ulonglong,     # WPARAM
-    ctypes.c_longlong       # LPARAM
-]
-DefWindowProcW.restype = ctypes.c_longlong
-
-BeginPaint = user32.BeginPaint
-BeginPaint.argtypes = [ctypes.c_void_p, ctypes.POINTER(PAINTSTRUCT)]
-BeginPaint.restype = ctypes.c_void_p
-
-EndPaint = user32.EndPaint
-EndPaint.argtypes = [ctypes.c_void_p, ctypes.POINTER(PAINTSTRUCT)]
-EndPaint.restype = ctypes.c_bool
-
-window_map = {}
+    return get_backend().gdi_object_count()
 
-# Window message loop
-def WndProc(hwnd, msg, wParam, lParam):
-    window_instance = window_map.get(hwnd)
-    if not window_instance:
-        return DefWindowProcW(hwnd, msg, wParam, lParam)
-
-    # Only handle window lifecycle messages
-    # NOT WM_PAINT - we'll render directly
-    if msg == WM_CLOSE:
-        if window_instance:
-            if (window_instance.scene and window_instance.scene_started and hasattr(window_instance.scene, 'OnApplicationQuit')):
-                window_instance.scene.OnApplicationQuit()
-            window_instance.cleanup()
-        user32.DestroyWindow(hwnd)
-        return 0
-
-    if msg == WM_DESTROY:
-        user32.PostQuitMessage(0)
-        return 0
-    
-    if msg == WM_ERASEBKGND:
-        return 1  # Indicate background erased
-
-    # Let Windows handle WM_PAINT with default behavior
-    # We'll render directly in the main loop instead
-    return DefWindowProcW(hwnd, msg, wParam, lParam)
-
-wndproc_pointer = WNDPROC(WndProc)
-_g_references = [wndproc_pointer]
-
-class WndClassEx(ctypes.Structure):
-    _fields_ = [
-        ("cbSize", ctypes.c_uint),
-        ("style", ctypes.c_uint),
-        ("lpfnWndProc", WNDPROC),
-        ("cbClsExtra", ctypes.c_int),
-        ("cbWndExtra", ctypes.c_int),
-        ("hInstance", ctypes.c_void_p),
-        ("hIcon", ctypes.c_void_p),
-        ("hCursor", ctypes.c_void_p),
-        ("hbrBackground", ctypes.c_void_p),
-        ("lpszMenuName", ctypes.c_wchar_p),
-        ("lpszClassName", ctypes.c_wchar_p),
-        ("hIconSm", ctypes.c_void_p)
-    ]
-
-# Get hInstance ONCE at module level
-hInstance = kernel32.GetModuleHandleW(None)
-
-# Register Window Class
-wc = WndClassEx()
-wc.cbSize = ctypes.sizeof(WndClassEx)
-wc.style = 0x0003  # CS_HREDRAW | CS_VREDRAW
-wc.lpfnWndProc = wndproc_pointer
-wc.cbClsExtra = 0
-wc.cbWndExtra = 0
-wc.hInstance = hInstance
-wc.hIcon = None
-wc.hCursor = user32.LoadCursorW(None, 32512)
-wc.hbrBackground = None  # We handle our own background
-wc.lpszMenuName = None
-wc.lpszClassName = "AngeneClass"
-wc.hIconSm = None
-
-atom = user32.RegisterClassExW(ctypes.byref(wc))
-if not atom:
-    raise ctypes.WinError(ctypes.get_last_error())
-
-print("Window class registered successfully")
-
-# Types
-class tagMSG(ctypes.Structure):
-    _fields_ = [
-        ("hwnd", ctypes.c_void_p),
-        ("message", ctypes.c_uint),
-        ("wParam", ctypes.c_ulonglong),
-        ("lParam", ctypes.c_longlong),
-        ("time", ctypes.c_ulong),
-        ("pt_x", ctypes.c_long),
-        ("pt_y", ctypes.c_long)
-    ]
-
-# Set up CreateWindowExW properly
-CreateWindowExW.restype = ctypes.c_void_p
-CreateWindowExW.argtypes = [
-    ctypes.c_ulong,        # dwExStyle
-    ctypes.c_wchar_p,      # lpClassName
-    ctypes.c_wchar_p,      # lpWindowName
-    ctypes.c_ulong,        # dwStyle
-    ctypes.c_int,          # X
-    ctypes.c_int,          # Y
-    ctypes.c_int,          # nWidth
-    ctypes.c_int,          # nHeight
-    ctypes.c_void_p,       # hWndParent
-    ctypes.c_void_p,       # hMenu
-    ctypes.c_void_p,       # hInstance
-    ctypes.c_void_p        # lpParam
-]
-
-GetMessage.argtypes = [
-    ctypes.POINTER(tagMSG),
-    ctypes.c_void_p,
-    ctypes.c_uint,
-    ctypes.c_uint
-]
-GetMessage.restype = ctypes.c_int
-
-TranslateMessage.argtypes = [ctypes.POINTER(tagMSG)]
-TranslateMessage.restype = ctypes.c_bool
-
-DispatchMessage.argtypes = [ctypes.POINTER(tagMSG)]
-DispatchMessage.restype = ctypes.c_longlong
-
-# Painting functions
-BeginPaint = user32.BeginPaint
-BeginPaint.argtypes = [ctypes.c_void_p, ctypes.POINTER(PAINTSTRUCT)]
-BeginPaint.restype = ctypes.c_void_p
-
-EndPaint = user32.EndPaint
-EndPaint.argtypes = [ctypes.c_void_p, ctypes.POINTER(PAINTSTRUCT)]
-EndPaint.restype = ctypes.c_bool
-
-PeekMessageW.argtypes = [
-    ctypes.POINTER(tagMSG),
-    ctypes.c_void_p,
-    ctypes.c_uint,
-    ctypes.c_uint,
-    ctypes.c_uint
-]
-PeekMessageW.restype = ctypes.c_bool
-
-user32.InvalidateRect.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_bool]
-user32.InvalidateRect.restype = ctypes.c_bool
-
-PM_REMOVE = 0x0001
-
-# Window constants
-WS_OVERLAPPEDWINDOW = 0x00CF0000
-CW_USEDEFAULT = ctypes.c_int(0x80000000).value
-SW_SHOW = 5
-
-ShowWindow = user32.ShowWindow
-ShowWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
-ShowWindow.restype = ctypes.c_bool
-
-UpdateWindow = user32.UpdateWindow
-UpdateWindow.argtypes = [ctypes.c_void_p]
-UpdateWindow.restype = ctypes.c_bool
+def get_brush_stats():
+    """painter.Renderer brush cache counters (cached, budget, hits, misses, ...)"""
+    return painter.Renderer.brush_stats()
 
 # Functions
 def create_new_window(title="New Window", width=500, height=400, style=0):
-    hwnd = CreateWindowExW(
-        style,
-        "AngeneClass",
-        title,
-        WS_OVERLAPPEDWINDOW,
-        CW_USEDEFAULT,
-        CW_USEDEFAULT,
-        width,
-        height,
-        None,
-        None,
-        ctypes.c_void_p(hInstance),
-        None
-    )
-    
-    if not hwnd:
-        raise ctypes.WinError(ctypes.get_last_error())
-    
-    ShowWindow(hwnd, SW_SHOW)
-    UpdateWindow(hwnd)
-    return hwnd
+    return get_backend().create_window(title, width, height, style)
 
 window = None
 
@@ -368,148 +188,547 @@ def init(title="Angene Window", width=800, height=600, style=0):
     global window
     window = create_new_window(title, width=width, height=height, style=style)
 
-def run(target_fps=60):
+def quit():
+    """Ask the main loop to exit after the current frame"""
+    get_backend().post_quit()
+
+def _route_message(hwnd, message, wParam, lParam, msg_time):
+    # Queue the message on the window that owns it, O(1) per message
+    queue = dispatch_table.event_queues.get(hwnd)
+    if queue is not None:
+        queue.push(message, wParam, lParam, msg_time)
+    elif hwnd is None:
+        # Thread messages have no window, every scene gets them
+        for queue in dispatch_table.event_queues.values():
+            queue.push(message, wParam, lParam, msg_time)
+
+def _deliver_events():
+    # INPUT PHASE - each scene gets its frame's events once
+    for w, on_events, on_message, copy in dispatch_table.events:
+        batch = w.events
+        if not batch:
+            continue
+        # Input may change what a static scene shows
+        w.needs_redraw = True
+        if on_events:
+            on_events(batch.copy() if copy else batch)
+        else:
+            hwnd = w.hwnd
+            for message, wParam, lParam, _ in batch:
+                on_message(hwnd, message, wParam, lParam)
+        batch.clear()
+
+def _call_phase(callbacks, dt, prof):
+    if prof is None:
+        for fn, _ in callbacks:
+            fn(dt)
+        return
+    for fn, span in callbacks:
+        start = perf_counter()
+        fn(dt)
+        prof.record_span(span, start, perf_counter(), "scene")
+
+def _fixed_update(dt, prof=None):
+    # FIXED UPDATE PHASE
+    dispatch_table.refresh(window_map.values())
+    _call_phase(dispatch_table.fixed_update, dt, prof)
+
+def _update(dt, prof=None):
+    # UPDATE PHASE
+    table = dispatch_table
+    table.refresh(window_map.values())
+    _call_phase(table.update, dt, prof)
+
+    table.refresh(window_map.values())
+    _call_phase(table.late_update, dt, prof)
+
+def _draw(active, w, on_draw, takes_alpha, alpha, draw_span, prof):
+    """Run one window's OnDraw; True if a 2D surface needs presenting"""
+    if w.is_3d:
+        # 3D OpenGL rendering - scene handles it directly
+        renderer = None
+    else:
+        # 2D rendering to the offscreen surface
+        renderer = active.begin_draw(w)
+        if renderer is None:
+            return False
+        if use_dirty_rects:
+            _track_damage(w, renderer)
+
+    if prof is not None:
+        start = perf_counter()
+    target = None
+    if use_display_lists and renderer is not None:
+        # Record now, replay grouped by brush below
+        target = renderer
+        renderer = w.display_list
+        if renderer is None:
+            renderer = w.display_list = DisplayList()
+            w.last_display_list = DisplayList()
+        renderer.reset()
+    if alpha is not None and takes_alpha:
+        on_draw(renderer, alpha)
+    else:
+        on_draw(renderer)
+    if target is not None and renderer != w.last_display_list:
+        # Unchanged lists are not replayed, the surface already shows them
+        renderer.replay(target)
+        w.display_list, w.last_display_list = w.last_display_list, renderer
+    if prof is not None:
+        prof.mark(draw_span, start, "scene")
+
+    if renderer is None:
+        return False
+    active.end_draw(w)
+    return True
+
+def _track_damage(w, renderer):
+    damage = w.damage
+    if damage is None:
+        damage = w.damage = DamageTracker(w.width, w.height)
+    elif damage.width != w.width or damage.height != w.height:
+        damage.resize(w.width, w.height)
+    if hasattr(renderer, "damage"):
+        renderer.damage = damage
+    else:
+        # This renderer cannot tell what it drew
+        damage.add_all()
+
+def _present(active, w, present_span, prof):
+    rects = None
+    if use_dirty_rects and w.damage is not None:
+        rects = w.damage.take()
+        if not rects:
+            return  # nothing changed, the window already shows this frame
+    if prof is not None:
+        start = perf_counter()
+    active.present(w, rects)
+    if prof is not None:
+        prof.mark(present_span, start)
+
+def _render(active, alpha=None, prof=None):
+    # RENDER PHASE - Direct rendering
+    dispatch_table.refresh(window_map.values())
+    draw = dispatch_table.draw
+    # A pool only pays off with more than one window to draw
+    pool = render_pool if len(draw) > 1 else None
+    pending = []
+    for w, on_draw, takes_alpha, draw_span, present_span in draw:
+        if w.minimized:
+            continue
+        if not w.needs_redraw and getattr(w.scene, "is_static", False):
+            continue
+        w.needs_redraw = False
+
+        if pool is not None and not w.is_3d:
+            # OnDraw into the offscreen surface on a worker
+            job = pool.submit(_draw, active, w, on_draw, takes_alpha, alpha, draw_span, prof)
+            pending.append((w, present_span, job))
+        elif _draw(active, w, on_draw, takes_alpha, alpha, draw_span, prof):
+            _present(active, w, present_span, prof)
+
+    if pending:
+        # Barrier: every surface is finished before any of them is shown,
+        # presents stay on the main thread that owns the windows
+        ready = [(w, present_span) for w, present_span, job in pending if job.result()]
+        for w, present_span in ready:
+            _present(active, w, present_span, prof)
+
+def _idle_state():
+    """
+    (idle, background): idle when every scene is static and has nothing to
+    redraw, background when no visible window has focus
+    """
+    idle = True
+    background = True
+    for w in window_map.values():
+        if w.scene is None:
+            continue
+        if w.needs_redraw or not getattr(w.scene, "is_static", False):
+            idle = False
+        if w.active and not w.minimized:
+            background = False
+    return idle, background
+
+def _shutdown(active):
+    global render_pool
+    if render_pool is not None:
+        render_pool.shutdown(wait=True)
+        render_pool = None
+    jobs.shutdown(wait=False)
+    for w in list(window_map.values()):
+        try:
+            w.cleanup()
+        except:
+            pass
+    active.shutdown()
+
+# What _frames() waits for between frames
+_WAIT_PACER = 0
+_WAIT_IDLE = 1
+_WAIT_NONE = 2  # replaying, next frame right away
+
+def _drop_message(hwnd, message, wParam, lParam, msg_time):
+    # Live input while a recording is replayed
+    pass
+
+def _frames(active, target_fps, tick_rate, interpolate, max_substeps,
+            max_catchup, max_render_skip, background_fps, render_workers,
+            record=None, replay=None, display_lists=False, dirty_rects=False,
+            update_per_tick=True):
+    """
+    The frame loop shared by run() and run_asyncio(). Runs one frame per
+    iteration and yields what to wait for before the next one:
+    (_WAIT_PACER, None) until pacer's deadline, (_WAIT_IDLE, timeout) for
+    input when every scene is idle, or (_WAIT_NONE, None) while replaying.
+    Returns once the backend quits or the replay ends.
+    """
+    global last_time, pacer, render_alpha, catchup, render_pool, use_display_lists
+    global use_dirty_rects
+
+    if target_fps == "display":
+        target_fps = active.refresh_rate() or 60
+    # Simulation step, independent of the render rate when tick_rate is set
+    if tick_rate:
+        tick_time = 1.0 / tick_rate
+    else:
+        tick_time = 1.0 / target_fps if target_fps > 0 else 0
+    render_alpha = 1.0
+    catchup = CatchUpGuard(tick_time, max_substeps, max_catchup, max_render_skip)
+    last_time = time.perf_counter()
+    pacer = FramePacer(target_fps)
+    use_display_lists = display_lists
+    use_dirty_rects = dirty_rects
+    if render_workers > 0:
+        from concurrent.futures import ThreadPoolExecutor
+        render_pool = ThreadPoolExecutor(render_workers, thread_name_prefix="AngeneRender")
+
+    # Deterministic record / replay of dt and routed messages
+    on_message = _route_message
+    recorder = player = None
+    if record:
+        recorder = _replay.Recorder(record, window_map, tick_time)
+        on_message = recorder.wrap(on_message)
+    if replay:
+        player = _replay.Player(replay, window_map)
+        if abs(player.tick_time - tick_time) > 1e-9:
+            print(f"Warning: {replay} was recorded with a {player.tick_time:.6f}s tick, "
+                  f"replaying with {tick_time:.6f}s will diverge")
+    elif target_fps > 0:
+        pacer.calibrate()
+
+    print(f"Initial GDI objects: {active.gdi_object_count()}")
+    print(f"Using DIRECT RENDERING (game engine mode) | backend: {active.name}")
+
+    try:
+        yield from _frame_loop(active, target_fps, tick_time, interpolate, background_fps,
+                               on_message, recorder, player, update_per_tick)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if player is not None:
+            player.close()
+
+def _frame_loop(active, target_fps, tick_time, interpolate, background_fps,
+                on_message, recorder, player, update_per_tick=True):
+    global last_time, render_alpha
+
+    frame_count = 0
+    accumulator = 0.0
+    throttled = False
+    last_gdi_check = last_time
+
+    while True:
+        # Per-frame check so a disabled profiler costs one attribute read
+        prof = profiler if profiler.enabled else None
+        if prof is not None:
+            frame_start = mark = perf_counter()
+
+        # START PHASE - scenes that were just set
+        dispatch_table.refresh(window_map.values())
+
+        # Process all pending messages (non-blocking)
+        if player is None:
+            running = active.pump_messages(on_message)
+        else:
+            # Keep the windows responsive, input comes from the recording
+            running = active.pump_messages(_drop_message) and player.next_frame(on_message, active)
+        if not running:
+            # Cleanup all windows
+            _shutdown(active)
+            print(f"Final GDI objects: {active.gdi_object_count()}")
+            return
+
+        # Calculate delta time
+        now = time.perf_counter()
+        dt = now - last_time if player is None else player.dt
+        last_time = now
+        real_dt = dt
+        idle_time = 0.0
+
+        if prof is not None:
+            mark = prof.mark("pump", mark)
+
+        # Cap delta time and backlog, dt becomes the dilated game time
+        dt, accumulator = catchup.advance(dt, accumulator)
+
+        _deliver_events()
+        if prof is not None:
+            mark = prof.mark("events", mark)
+
+        # Job continuations that must run on the main thread
+        jobs.drain_main()
+        if prof is not None:
+            mark = prof.mark("jobs", mark)
+
+        if tick_time > 0:
+            # Fixed timestep updates, bounded per frame
+            steps = 0
+            while accumulator >= tick_time and steps < catchup.max_substeps:
+                _fixed_update(tick_time, prof)
+                if update_per_tick:
+                    _update(tick_time, prof)
+                accumulator -= tick_time
+                frame_count += 1
+                steps += 1
+            catchup.end_ticks(steps, accumulator)
+        else:
+            # Uncapped: one variable step per frame
+            _fixed_update(dt, prof)
+            if update_per_tick:
+                _update(dt, prof)
+            accumulator = 0.0
+            frame_count += 1
+        if prof is not None:
+            mark = prof.mark("fixed_update", mark)
+
+        # Timers at their own rates, before a per-frame Update
+        scheduler.advance(dt)
+        if prof is not None:
+            mark = prof.mark("scheduler", mark)
+
+        # Per-frame Update/LateUpdate with the real frame delta
+        if not update_per_tick:
+            _update(dt, prof)
+            if prof is not None:
+                mark = prof.mark("update", mark)
+
+        # Monitor every 10 seconds
+        if now - last_gdi_check >= 10.0:
+            gdi_count = active.gdi_object_count()
+            if gdi_count:
+                cached = len(painter.Renderer._brush_cache)
+                print(f"Frame {frame_count} | GDI: {gdi_count} | Brushes: {cached}/{painter.Renderer.brush_budget}")
+            else:
+                print(f"Frame {frame_count} | GDI: {gdi_count}")
+            last_gdi_check = now
+
+        # Drop render frames first while the simulation is behind
+        if catchup.should_render():
+            if interpolate:
+                render_alpha = min(accumulator / tick_time, 1.0) if tick_time > 0 else 1.0
+                _render(active, render_alpha, prof)
+            else:
+                _render(active, None, prof)
+        # Nothing draws until the next frame: free evicted image surfaces and
+        # brushes (here, not in present(), which unchanged frames skip)
+        images.collect()
+        painter.Renderer.collect_brushes()
+        if prof is not None:
+            mark = prof.mark("render", mark)
+
+        idle, background = _idle_state()
+        if idle:
+            # Nothing to simulate or redraw: block instead of spinning.
+            # The idle time still counts for timers, not for Update dt.
+            if player is None:
+                idle_start = perf_counter()
+                yield _WAIT_IDLE, scheduler.next_due()
+                idle_time = perf_counter() - idle_start
+            else:
+                idle_time = player.idle
+                yield _WAIT_NONE, None
+            scheduler.advance(idle_time)
+            last_time += idle_time
+            pacer.reset()
+        else:
+            # Unfocused or minimized: pace at the background rate
+            if background and background_fps > 0:
+                if not throttled:
+                    throttled = True
+                    pacer.set_target(background_fps)
+                    catchup.set_frame_time(1.0 / background_fps)
+            elif throttled:
+                throttled = False
+                pacer.set_target(target_fps)
+                catchup.set_frame_time(None)
+            yield (_WAIT_PACER if player is None else _WAIT_NONE), None
+        if recorder is not None:
+            recorder.end_frame(real_dt, idle_time)
+        if prof is not None:
+            end = prof.mark("sleep", mark)
+            prof.record_span("frame", frame_start, end)
+            if tracer.enabled:
+                tracer.check_hitch(end - frame_start, end)
+
+def run(target_fps=60, tick_rate=None, interpolate=False,
+        max_substeps=5, max_catchup=0.25, max_render_skip=2,
+        background_fps=10, render_workers=0, record=None, replay=None,
+        display_lists=False, dirty_rects=False, update_per_tick=True):
     """
     Main engine loop with direct rendering (game engine style)
-    
+
+    FixedUpdate runs at the fixed tick rate (0..max_substeps times a frame),
+    Update and LateUpdate right after every tick with the tick's dt, as they
+    always have. update_per_tick=False runs them once per frame with the
+    frame's delta time instead.
+
     Args:
-        target_fps: Target frames per second (default: 60)
+        target_fps: Target frames per second (default: 60, 0 = uncapped,
+                    "display" = the monitor refresh rate)
+        tick_rate: Fixed simulation rate for FixedUpdate (default: target_fps)
+        interpolate: Pass OnDraw(r, alpha) the fraction of a tick left in the
+                     accumulator, so rendering can run faster than the
+                     simulation and still move smoothly
+        max_substeps: Most FixedUpdate ticks run in one frame
+        max_catchup: Seconds of tick backlog kept; older backlog is dropped
+                     and game time slows down instead of freezing
+        max_render_skip: Frames in a row that may skip OnDraw while behind
+        background_fps: Frame rate while no window is focused or all are
+                        minimized (0 = keep target_fps). When every scene
+                        sets is_static = True the loop instead blocks until
+                        input, Window.invalidate() or the next scheduler timer
+        render_workers: Threads that run the OnDraw of 2D windows in
+                        parallel (0 = draw on the main thread). Presents
+                        and 3D windows stay on the main thread; OnDraw of
+                        different windows must not share mutable state
+        record: Path to write a replay log of every frame's dt and input
+        replay: Path of a replay log to play back instead of the live clock
+                and input, unpaced (see Angene.Main.replay)
+        display_lists: 2D OnDraw records into a DisplayList that is replayed
+                       grouped by brush, and not at all when it matches the
+                       previous frame (see Angene.Main.display_list)
+        dirty_rects: 2D windows only present the rectangles their renderer
+                     drew into (or Window.invalidate(rect) named), nothing
+                     when they are unchanged (see Angene.Main.damage)
+        update_per_tick: Run Update and LateUpdate after every FixedUpdate
+                         tick with the tick's dt (default); False runs them
+                         once per frame with the real, possibly dilated,
+                         frame delta
+    """
+    if not window_map:
+        raise RuntimeError("Angene Logic Error | No windows created. Create a Window instance first.")
+
+    active = get_backend()
+    frames = _frames(active, target_fps, tick_rate, interpolate, max_substeps,
+                     max_catchup, max_render_skip, background_fps, render_workers,
+                     record, replay, display_lists, dirty_rects, update_per_tick)
+    try:
+        for wait, timeout in frames:
+            if wait == _WAIT_PACER:
+                # Sleep, then spin, until the frame deadline
+                pacer.wait()
+            elif wait == _WAIT_IDLE:
+                active.wait_messages(timeout)
+
+    except KeyboardInterrupt:
+        print("\nKeyboard interrupt received, shutting down...")
+        _shutdown(active)
+    except Exception as e:
+        _fatal(active, e)
+
+async def run_asyncio(target_fps=60, tick_rate=None, interpolate=False,
+                      max_substeps=5, max_catchup=0.25, max_render_skip=2,
+                      background_fps=10, render_workers=0, record=None, replay=None,
+                      display_lists=False, dirty_rects=False, update_per_tick=True):
     """
-    global last_time
+    run() as a coroutine, for scenes with async def callbacks or coroutines
+    started with engine.start_coroutine(). The frame sleeps are awaited, so
+    other tasks (sockets, files, subprocesses) run in the frame's spare time:
+
+        asyncio.run(engine.run_asyncio(target_fps=60))
 
+    Arguments are the same as run(). On exit async OnApplicationQuit tasks
+    are awaited (see aio.FINISH_TIMEOUT), the other scene tasks cancelled.
+    """
+    import asyncio
     if not window_map:
         raise RuntimeError("Angene Logic Error | No windows created. Create a Window instance first.")
 
-    msg = tagMSG()
-    frame_count = 0
-    frame_time = 1.0 / target_fps if target_fps > 0 else 0
-    accumulator = 0.0
-    last_gdi_check = time.perf_counter()
-    
-    print(f"Initial GDI objects: {get_gdi_object_count()}")
-    print("Using DIRECT RENDERING (game engine mode)")
-    
-    # SRCCOPY constant for BitBlt
-    SRCCOPY = 0x00CC0020
-    
+    active = get_backend()
+    frames = _frames(active, target_fps, tick_rate, interpolate, max_substeps,
+                     max_catchup, max_render_skip, background_fps, render_workers,
+                     record, replay, display_lists, dirty_rects, update_per_tick)
     try:
-        while True:
-            frame_start = time.perf_counter()
-            
-            # Process all pending messages (non-blocking)
-            while PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE):
-                if msg.message == WM_QUIT:
-                    # Cleanup all windows
-                    for w in window_map.values():
-                        w.cleanup()
-                    painter.Renderer.cleanup()
-                    print(f"Final GDI objects: {get_gdi_object_count()}")
-                    return
-                for w in window_map.values():
-                    if w.scene:
-                        if hasattr(w.scene, "OnWindowMessage"):
-                            w.scene.OnMessage(msg.hwnd, msg.message, msg.wParam, msg.lParam)
-                TranslateMessage(ctypes.byref(msg))
-                DispatchMessage(ctypes.byref(msg))
-
-            # Calculate delta time
-            now = time.perf_counter()
-            dt = now - last_time
-            last_time = now
-            
-            # Cap delta time
-            if dt > 0.1:
-                dt = 0.1
-
-            accumulator += dt
-
-            # Fixed timestep updates
-            while accumulator >= frame_time:
-                # UPDATE PHASE
-                for w in window_map.values():
-                    if w.scene:
-                        # Call Start only once
-                        if not w.scene_started:
-                            if hasattr(w.scene, "Start"):
-                                w.scene.Start()
-                            w.scene_started = True
-
-                        if hasattr(w.scene, "Update"):
-                            w.scene.Update(frame_time)
-                                
-                        if hasattr(w.scene, "LateUpdate"):
-                            w.scene.LateUpdate(frame_time)
-                
-                accumulator -= frame_time
-                frame_count += 1
-                
-                # Monitor every 10 seconds
-                if now - last_gdi_check >= 10.0:
-                    gdi_count = get_gdi_object_count()
-                    print(f"Frame {frame_count} | GDI: {gdi_count}")
-                    last_gdi_check = now
-            
-            # RENDER PHASE - Direct rendering
-            for w in window_map.values():
-                if w.scene:
-                    if w.is_3d:
-                        # 3D OpenGL rendering - scene handles it directly
-                        w.scene.OnDraw(None)
-                    else:
-                        # 2D GDI rendering
-                        hdc = user32.GetDC(w.hwnd)
-                        if hdc:
-                            # Render to memory DC
-                            renderer = painter.Renderer(w.mem_dc)
-                            w.scene.OnDraw(renderer)
-                            
-                            # Blit memory DC to screen
-                            gdi32.BitBlt(
-                                hdc,
-                                0, 0,
-                                w.width, w.height,
-                                w.mem_dc,
-                                0, 0,
-                                SRCCOPY
-                            )
-                            
-                            # Release DC
-                            user32.ReleaseDC(w.hwnd, hdc)
-            
-            # Sleep to maintain target FPS
-            if target_fps > 0:
-                frame_elapsed = time.perf_counter() - frame_start
-                sleep_time = frame_time - frame_elapsed
-                if sleep_time > 0:
-                    time.sleep(sleep_time * 0.95)
-    
+        for wait, timeout in frames:
+            if wait == _WAIT_PACER:
+                await aio.pace(pacer)
+            elif wait == _WAIT_IDLE:
+                await aio.idle(timeout)
+            else:
+                await asyncio.sleep(0)
+
     except KeyboardInterrupt:
         print("\nKeyboard interrupt received, shutting down...")
-        for w in window_map.values():
-            w.cleanup()
-        painter.Renderer.cleanup()
+        _shutdown(active)
+    except asyncio.CancelledError:
+        # The surrounding asyncio.run() is shutting down
+        _shutdown(active)
+        raise
     except Exception as e:
-        print("=" * 60)
-        print("FATAL ERROR IN MAIN LOOP!")
-        print("=" * 60)
-        print(f"Exception: {e}")
-        traceback.print_exc()
-        print("=" * 60)
-        for w in window_map.values():
-            try:
-                w.cleanup()
-            except:
-                pass
-        painter.Renderer.cleanup()
+        _fatal(active, e)
+    finally:
+        await aio.finish()
+        aio.cancel_all()
+
+def start_coroutine(coro, name=None):
+    """Run a coroutine alongside the frame loop (needs run_asyncio())"""
+    return aio.start_coroutine(coro, name)
+
+def _fatal(active, e):
+    print("=" * 60)
+    print("FATAL ERROR IN MAIN LOOP!")
+    print("=" * 60)
+    print(f"Exception: {e}")
+    traceback.print_exc()
+    print("=" * 60)
+    _shutdown(active)
+
+def enable_tracing(enabled=True, hitch_threshold=None, last_seconds=5.0):
+    """
+    Record every frame span into engine.tracer (Chrome/Perfetto JSON).
+
+    Args:
+        enabled: Turn tracing on or off (also turns the profiler on)
+        hitch_threshold: If set, frames slower than this many seconds dump
+                         the last `last_seconds` of trace to a file (copied
+                         in the frame, written on a background thread)
+        last_seconds: Length of the automatic hitch dumps
+    """
+    tracer.enable(enabled)
+    if enabled:
+        profiler.enable()
+        profiler.tracer = tracer
+        tracer.dump_on_hitch(hitch_threshold, last_seconds)
+    else:
+        profiler.tracer = None
+
+def dump_trace(path=None, last_seconds=None):
+    """Write the recorded trace (or its last N seconds) and return the path"""
+    return tracer.dump(path, last_seconds)
 
 def set_resolution(hwnd, width, height):
-    user32.SetWindowPos(
-        hwnd,
-        None,
-        0, 0,
-        width, height,
-        0x0002  # SWP_NOMOVE
-    )
-
-def run_async(fn):
-    threading.Thread(target=fn, daemon=True).start()
+    get_backend().set_resolution(hwnd, width, height)
+
+def run_async(fn, *args, blocking=False, **kwargs):
+    """
+    Run fn(*args, **kwargs) in the background and return its Job.
+
+    This used to start a thread per call; it now runs on the job pool (see
+    engine.jobs), which has CPU count - 1 workers shared with every other
+    job. Functions that block or never return (network loops, sleeps)
+    should pass blocking=True to get a thread of their own instead.
+    """
+    if blocking:
+        return jobs.spawn(fn, *args, **kwargs)
+    return jobs.submit(fn, *args, **kwargs)
@@ -0,0 +1,74 @@
+# Angene\events.py
+"""
+Per-window input event queues.
+
+The message pump routes every message to the Window that owns msg.hwnd and
+appends it here instead of calling into Python scenes per message. Once per
+frame the engine hands each scene its whole batch:
+
+    def OnEvents(self, events):
+        for msg, wParam, lParam, time in events:
+            ...
+
+Consecutive WM_MOUSEMOVE messages are coalesced into the latest one, so a
+mouse-move flood costs one slot per frame rather than one per message.
+"""
+
+from array import array
+
+from Angene.Main.definitions import WM_MOUSEMOVE
+
+
+class EventBatch:
+    """Compact array-backed list of (msg, wParam, lParam, time) events"""
+    __slots__ = ("msg", "wparam", "lparam", "time", "coalesced")
+
+    def __init__(self):
+        self.msg = array('I')
+        self.wparam = array('Q')
+        self.lparam = array('q')
+        self.time = array('L')
+        self.coalesced = 0  # mouse moves merged into a previous one
+
+    def push(self, message, wParam, lParam, time):
+        msgs = self.msg
+        if message == WM_MOUSEMOVE and msgs and msgs[-1] == WM_MOUSEMOVE:
+            # Replace the previous move, only the latest position matters
+            self.wparam[-1] = wParam
+            self.lparam[-1] = lParam
+            self.time[-1] = time
+            self.coalesced += 1
+            return
+        msgs.append(message)
+        self.wparam.append(wParam)
+        self.lparam.append(lParam)
+        self.time.append(time)
+
+    def copy(self):
+        """Independent batch with the same events"""
+        batch = EventBatch()
+        batch.msg = self.msg[:]
+        batch.wparam = self.wparam[:]
+        batch.lparam = self.lparam[:]
+        batch.time = self.time[:]
+        batch.coalesced = self.coalesced
+        return batch
+
+    def clear(self):
+        del self.msg[:]
+        del self.wparam[:]
+        del self.lparam[:]
+        del self.time[:]
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self.msg)
+
+    def __bool__(self):
+        return len(self.msg) > 0
+
+    def __getitem__(self, index):
+        return (self.msg[index], self.wparam[index], self.lparam[index], self.time[index])
+
+    def __iter__(self):
+        return zip(self.msg, self.wparam, self.lparam, self.time)
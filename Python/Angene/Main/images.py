@@ -0,0 +1,501 @@
+# Angene\images.py
+"""
+Images and sprites for the 2D renderers.
+
+load() decodes a PNG, BMP or PPM / PGM file once into an Image (RGBA, straight
+alpha); the first draw uploads it to a native surface of the renderer (a DIB
+section on Win32, a NumPy array on the software backend) that is reused
+for every later draw:
+
+    from Angene.Main import images
+
+    ship = images.load("ship.png")
+    tiles = images.load_sheet("tiles.png", 16, 16)   # list of Sprites
+
+    def OnDraw(self, r):
+        r.draw_image(ship, self.x, self.y)
+        r.draw_image(ship, 0, 0, 64, 64)             # scaled
+        tiles[3].draw(r, 32, 32)                     # sub-rectangle
+
+Decoded images and their surfaces are kept in a cache with a memory budget
+(images.cache, 256 MB by default). Over budget, the least recently drawn
+images leave the cache and give up their native surfaces; an Image a scene
+still holds is re-uploaded, not re-decoded, when it is drawn again.
+Native surfaces (DIB sections) are freed between frames (collect(), called
+by the engine loop after rendering), never while a render worker may be
+using them; plain NumPy surfaces are simply dropped.
+
+The decoders are pure Python (zlib for PNG): fine for sprites, slow for very
+large images, which is what the cache is for. Interlaced PNGs are not
+supported.
+"""
+
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+
+def _numpy():
+    # Imported on first decode, painter imports this module at engine import
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class Image:
+    """Decoded RGBA pixels plus the native surfaces made from them"""
+    __slots__ = ("width", "height", "rgba", "has_alpha", "key", "name",
+                 "surfaces", "__weakref__")
+
+    def __init__(self, width, height, rgba, key=None, name=None):
+        """
+        Args:
+            width, height: Size in pixels
+            rgba: width * height * 4 bytes, straight (not premultiplied) alpha
+            key: COLORREF drawn as transparent, for images without alpha
+            name: Label (the path for loaded images)
+        """
+        if len(rgba) != width * height * 4:
+            raise RuntimeError(f"Angene Logic Error | Image data is {len(rgba)} bytes, "
+                               f"expected {width * height * 4} for {width}x{height} RGBA.")
+        self.width = width
+        self.height = height
+        self.rgba = bytes(rgba)
+        self.has_alpha = self.rgba[3::4].count(255) != width * height
+        self.key = key
+        self.name = name
+        self.surfaces = {}  # renderer kind -> native surface
+
+    @property
+    def nbytes(self):
+        return self.width * self.height * 4
+
+    def surface(self, kind, upload):
+        """Native surface of kind, made with upload(image) on first use"""
+        surface = self.surfaces.get(kind)
+        if surface is None:
+            surface = cache.upload(self, kind, upload)
+        else:
+            cache.touch(self)
+        return surface
+
+    def sprite(self, x, y, w, h):
+        """Sprite of the x, y, w, h sub-rectangle"""
+        return Sprite(self, (x, y, w, h))
+
+    def __repr__(self):
+        return f"<Image {self.name or ''} {self.width}x{self.height}>"
+
+
+class Sprite:
+    """A rectangle of an Image (a sprite sheet frame or atlas entry)"""
+    __slots__ = ("image", "src", "width", "height")
+
+    def __init__(self, image, src=None):
+        self.image = image
+        self.src = src if src is not None else (0, 0, image.width, image.height)
+        self.width = self.src[2]
+        self.height = self.src[3]
+
+    def draw(self, r, x, y, w=None, h=None, opacity=1.0, mode="normal"):
+        """Draw at x, y, scaled to w x h when given"""
+        r.draw_image(self.image, x, y, w, h, self.src, opacity, mode)
+
+
+class ImageCache:
+    """Loaded images and native surfaces, least recently drawn evicted first"""
+
+    def __init__(self, budget=256 * 1024 * 1024):
+        self.budget = budget
+        self.used = 0
+        self.images = OrderedDict()   # Image -> bytes charged
+        self.paths = {}               # (path, key) -> Image
+        self.hits = 0
+        self.loads = 0
+        self.uploads = 0
+        self.evictions = 0
+        self._retired = []            # surfaces for collect()
+        self._lock = threading.RLock()
+
+    def load(self, path, key=None):
+        """The Image for path, decoded only the first time"""
+        ident = (os.path.abspath(path), key)
+        with self._lock:
+            image = self.paths.get(ident)
+            if image is not None:
+                self.hits += 1
+                self.touch(image)
+                return image
+        image = decode_file(path, key)
+        with self._lock:
+            if ident in self.paths:
+                return self.paths[ident]  # another thread was faster
+            self.paths[ident] = image
+            self.loads += 1
+            self._charge(image, image.nbytes)
+            return image
+
+    def touch(self, image):
+        try:
+            self.images.move_to_end(image)
+        except KeyError:
+            pass
+
+    def upload(self, image, kind, upload):
+        """Create image's native surface of kind and charge it to the budget"""
+        with self._lock:
+            surface = image.surfaces.get(kind)
+            if surface is not None:
+                return surface
+            surface = upload(image)
+            image.surfaces[kind] = surface
+            self.uploads += 1
+            self._charge(image, image.nbytes)
+            return surface
+
+    def _charge(self, image, nbytes):
+        self.images[image] = self.images.get(image, 0) + nbytes
+        self.images.move_to_end(image)
+        self.used += nbytes
+        # Never evict the image being added
+        while self.used > self.budget and len(self.images) > 1:
+            victim = next(iter(self.images))
+            if victim is image:
+                break
+            self.evict(victim)
+
+    def evict(self, image):
+        """Drop image from the cache; its native surfaces are freed by collect()"""
+        with self._lock:
+            self.used -= self.images.pop(image, 0)
+            for ident in [k for k, v in self.paths.items() if v is image]:
+                del self.paths[ident]
+            for surface in image.surfaces.values():
+                # Arrays go with their last reference, a drawing renderer
+                # holds its own; only OS handles wait for collect()
+                if hasattr(surface, "destroy"):
+                    self._retired.append(surface)
+            image.surfaces = {}
+            self.evictions += 1
+
+    def set_budget(self, budget):
+        with self._lock:
+            self.budget = budget
+            while self.used > self.budget and self.images:
+                self.evict(next(iter(self.images)))
+
+    def collect(self):
+        """Destroy evicted surfaces; call while nothing is drawing"""
+        if not self._retired:
+            return
+        with self._lock:
+            retired = self._retired
+            self._retired = []
+        for surface in retired:
+            destroy = getattr(surface, "destroy", None)
+            if destroy is not None:
+                destroy()
+
+    def clear(self):
+        for image in list(self.images):
+            self.evict(image)
+        self.collect()
+
+    def stats(self):
+        return {
+            "images": len(self.images),
+            "used": self.used,
+            "budget": self.budget,
+            "hits": self.hits,
+            "loads": self.loads,
+            "uploads": self.uploads,
+            "evictions": self.evictions,
+        }
+
+
+cache = ImageCache()
+
+
+def load(path, key=None):
+    """Decoded Image for path from the shared cache (PNG, BMP, PPM / PGM)"""
+    return cache.load(path, key)
+
+
+def load_sheet(path, frame_width, frame_height, key=None):
+    """Sprites of every frame_width x frame_height cell, row by row"""
+    image = load(path, key)
+    return [Sprite(image, (x, y, frame_width, frame_height))
+            for y in range(0, image.height - frame_height + 1, frame_height)
+            for x in range(0, image.width - frame_width + 1, frame_width)]
+
+
+def collect():
+    """Free surfaces evicted from the shared cache"""
+    cache.collect()
+
+
+# Decoding
+
+def decode_file(path, key=None):
+    with open(path, "rb") as f:
+        data = f.read()
+    return decode(data, key, name=path)
+
+
+def decode(data, key=None, name=None):
+    """Image from PNG, BMP or binary PPM / PGM bytes"""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        width, height, rgba = decode_png(data)
+    elif data[:2] == b"BM":
+        width, height, rgba = decode_bmp(data)
+    elif data[:2] in (b"P5", b"P6"):
+        width, height, rgba = decode_pnm(data)
+    else:
+        raise RuntimeError(f"Angene Logic Error | {name or 'Image'} is not a PNG, BMP or PPM file.")
+    return Image(width, height, rgba, key, name)
+
+
+def _expand_rgb(rgb, count):
+    rgba = bytearray(count * 4)
+    rgba[0::4] = rgb[0::3]
+    rgba[1::4] = rgb[1::3]
+    rgba[2::4] = rgb[2::3]
+    rgba[3::4] = b"\xff" * count
+    return rgba
+
+
+def _expand_gray(gray, count, alpha=None):
+    rgba = bytearray(count * 4)
+    rgba[0::4] = gray
+    rgba[1::4] = gray
+    rgba[2::4] = gray
+    rgba[3::4] = alpha if alpha is not None else b"\xff" * count
+    return rgba
+
+
+def decode_pnm(data):
+    """(width, height, rgba) of a binary PPM (P6) or PGM (P5), maxval 255"""
+    fields = []
+    pos = 2
+    while len(fields) < 3:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b"#":
+            pos = data.index(b"\n", pos)
+            continue
+        start = pos
+        while not data[pos:pos + 1].isspace():
+            pos += 1
+        fields.append(int(data[start:pos]))
+    width, height, maxval = fields
+    if maxval != 255:
+        raise RuntimeError("Angene Logic Error | Only 8-bit PPM / PGM files are supported.")
+    pos += 1  # single whitespace before the raster
+    count = width * height
+    if data[:2] == b"P6":
+        return width, height, _expand_rgb(data[pos:pos + count * 3], count)
+    return width, height, _expand_gray(data[pos:pos + count], count)
+
+
+def decode_bmp(data):
+    """(width, height, rgba) of an uncompressed 24 / 32-bit or 8-bit palette BMP"""
+    offset = struct.unpack_from("<I", data, 10)[0]
+    header_size, width, height, planes, bpp, compression = struct.unpack_from("<IiiHHI", data, 14)
+    top_down = height < 0
+    height = abs(height)
+    if compression not in (0, 3) or bpp not in (8, 24, 32):
+        raise RuntimeError("Angene Logic Error | Only uncompressed 8, 24 and 32-bit BMP files are supported.")
+
+    stride = (width * bpp // 8 + 3) & ~3
+    count = width * height
+    rows = [data[offset + y * stride:offset + y * stride + width * bpp // 8] for y in range(height)]
+    if not top_down:
+        rows.reverse()
+    pixels = b"".join(rows)
+
+    rgba = bytearray(count * 4)
+    if bpp == 8:
+        colors = struct.unpack_from("<I", data, 46)[0] or 256
+        palette = data[14 + header_size:14 + header_size + colors * 4]
+        # BGRX palette -> one RGBA entry per index
+        table = [bytes((palette[i * 4 + 2], palette[i * 4 + 1], palette[i * 4], 255))
+                 for i in range(colors)]
+        rgba = bytearray(b"".join(table[i] for i in pixels))
+        return width, height, rgba
+
+    step = bpp // 8
+    rgba[0::4] = pixels[2::step]
+    rgba[1::4] = pixels[1::step]
+    rgba[2::4] = pixels[0::step]
+    if bpp == 32:
+        alpha = pixels[3::4]
+        # Many writers leave the X byte at 0: treat all-zero alpha as opaque
+        rgba[3::4] = alpha if alpha.count(0) != count else b"\xff" * count
+    else:
+        rgba[3::4] = b"\xff" * count
+    return width, height, rgba
+
+
+def image_bgra(image, premultiply=False):
+    """
+    image's pixels as BGRA bytes (GDI DIB order), with color multiplied by
+    alpha when premultiply is set (what AlphaBlend expects)
+    """
+    rgba = image.rgba
+    out = bytearray(rgba)
+    out[0::4] = rgba[2::4]
+    out[2::4] = rgba[0::4]
+    if not premultiply:
+        return out
+    np = _numpy()
+    if np is not None:
+        pixels = np.frombuffer(bytes(out), np.uint8).reshape(-1, 4).astype(np.uint16)
+        pixels[:, :3] = (pixels[:, :3] * pixels[:, 3:] + 127) // 255
+        return bytearray(pixels.astype(np.uint8).tobytes())
+    for i in range(3, len(out), 4):
+        a = out[i]
+        if a != 255:
+            out[i - 3] = (out[i - 3] * a + 127) // 255
+            out[i - 2] = (out[i - 2] * a + 127) // 255
+            out[i - 1] = (out[i - 1] * a + 127) // 255
+    return out
+
+
+def _paeth_row(row, prev, bpp):
+    for i in range(len(row)):
+        a = row[i - bpp] if i >= bpp else 0
+        b = prev[i]
+        c = prev[i - bpp] if i >= bpp else 0
+        p = a + b - c
+        pa = p - a if p > a else a - p
+        pb = p - b if p > b else b - p
+        pc = p - c if p > c else c - p
+        if pa <= pb and pa <= pc:
+            row[i] = (row[i] + a) & 0xFF
+        elif pb <= pc:
+            row[i] = (row[i] + b) & 0xFF
+        else:
+            row[i] = (row[i] + c) & 0xFF
+
+
+def _unfilter(raw, height, stride, bpp):
+    """PNG scanline unfiltering, returns the filter-free pixel bytes"""
+    np = _numpy()
+    out = bytearray(height * stride)
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        kind = raw[pos]
+        row = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if kind == 1:  # Sub
+            if np is not None:
+                row = bytearray(np.cumsum(np.frombuffer(bytes(row), np.uint8).reshape(-1, bpp),
+                                          axis=0, dtype=np.uint8).tobytes())
+            else:
+                for i in range(bpp, stride):
+                    row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif kind == 2:  # Up
+            if np is not None:
+                row = bytearray((np.frombuffer(bytes(row), np.uint8)
+                                 + np.frombuffer(bytes(prev), np.uint8)).tobytes())
+            else:
+                row = bytearray((a + b) & 0xFF for a, b in zip(row, prev))
+        elif kind == 3:  # Average
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            _paeth_row(row, prev, bpp)
+        elif kind != 0:
+            raise RuntimeError(f"Angene Logic Error | Bad PNG filter type {kind}.")
+        out[y * stride:(y + 1) * stride] = row
+        prev = row
+    return out
+
+
+def decode_png(data):
+    """(width, height, rgba) of a non-interlaced PNG of any color type"""
+    pos = 8
+    idat = []
+    palette = None
+    transparency = None
+    while pos < len(data):
+        length, kind = struct.unpack_from(">I4s", data, pos)
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+        elif kind == b"PLTE":
+            palette = chunk
+        elif kind == b"tRNS":
+            transparency = chunk
+        elif kind == b"IDAT":
+            idat.append(chunk)
+        elif kind == b"IEND":
+            break
+    if interlace:
+        raise RuntimeError("Angene Logic Error | Interlaced PNG files are not supported.")
+
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color_type]
+    bits = channels * depth
+    stride = (width * bits + 7) // 8
+    pixels = _unfilter(zlib.decompress(b"".join(idat)), height, stride, max(1, bits // 8))
+    count = width * height
+
+    if depth == 16:
+        # Keep the high byte of every sample
+        pixels = pixels[0::2]
+    elif depth < 8:
+        # Unpack 1 / 2 / 4-bit samples, rows are padded to whole bytes
+        per_byte = 8 // depth
+        mask = (1 << depth) - 1
+        shifts = [8 - depth * (i + 1) for i in range(per_byte)]
+        unpacked = bytearray()
+        for y in range(height):
+            row = pixels[y * stride:(y + 1) * stride]
+            values = [(byte >> s) & mask for byte in row for s in shifts]
+            unpacked += bytes(values[:width])
+        pixels = unpacked
+        if color_type == 0:
+            scale = 255 // mask
+            pixels = bytes(v * scale for v in pixels)
+
+    if color_type == 6:
+        return width, height, bytearray(pixels)
+    if color_type == 2:
+        rgba = _expand_rgb(pixels, count)
+        if transparency is not None and len(transparency) >= 6:
+            # 16-bit samples were cut to their high byte
+            low = 0 if depth == 16 else 1
+            key = bytes(transparency[low:6:2])
+            for i in range(count):
+                if pixels[i * 3:i * 3 + 3] == key:
+                    rgba[i * 4 + 3] = 0
+        return width, height, rgba
+    if color_type == 4:
+        return width, height, _expand_gray(pixels[0::2], count, pixels[1::2])
+    if color_type == 0:
+        rgba = _expand_gray(pixels, count)
+        if transparency is not None and len(transparency) >= 2:
+            if depth == 16:
+                gray = transparency[0]
+            elif depth == 8:
+                gray = transparency[1]
+            else:
+                gray = transparency[1] * (255 // ((1 << depth) - 1))
+            for i in range(count):
+                if pixels[i] == gray:
+                    rgba[i * 4 + 3] = 0
+        return width, height, rgba
+
+    # Palette
+    entries = len(palette) // 3
+    alpha = transparency or b""
+    table = [bytes((palette[i * 3], palette[i * 3 + 1], palette[i * 3 + 2],
+                    alpha[i] if i < len(alpha) else 255)) for i in range(entries)]
+    return width, height, bytearray(b"".join(table[i] for i in pixels))
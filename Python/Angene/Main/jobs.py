@@ -0,0 +1,400 @@
+# Angene\jobs.py
+"""
+Work-stealing job system.
+
+A fixed pool of worker threads runs jobs; every job is also a future that
+can be waited on, chained and used as a dependency of other jobs. Results
+that have to touch scenes or windows are handed back to the main thread,
+which engine.run() drains once per frame, right before FixedUpdate:
+
+    from Angene.Main import engine
+
+    path = engine.jobs.submit(find_path, start, goal)
+    path.then(self.set_path, main_thread=True)     # set_path(result) next frame
+
+    chunks = [engine.jobs.submit(generate, c) for c in coords]
+    mesh = engine.jobs.submit(build_mesh, after=chunks)
+    engine.jobs.when_all(chunks).then(self.on_loaded, main_thread=True)
+
+Each worker owns a deque: jobs submitted from a worker go to its own deque
+and are popped newest first (cache friendly for fan-out), idle workers
+steal the oldest job from the others. Jobs submitted from any other thread
+go into shared queues by priority.
+
+The pool is sized for CPU work. Functions that block (sockets, sleeps,
+waiting on other processes) or run for the life of the game would hold a
+worker the whole time; give those their own thread with spawn().
+
+A failed job that nobody waited on or chained is reported (printed and
+kept in JobSystem.errors) once it is garbage collected, like an asyncio
+task whose exception was never retrieved.
+"""
+
+import os
+import random
+import threading
+import time
+import traceback
+from collections import deque
+
+from Angene.Main import trace
+
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_local = threading.local()
+
+
+class Job:
+    """Future for a submitted function"""
+    __slots__ = ("fn", "args", "kwargs", "name", "priority", "state", "value",
+                 "error", "_event", "_lock", "_callbacks", "_waiting", "_observed", "system")
+
+    def __init__(self, system, fn, args, kwargs, name=None, priority=NORMAL):
+        self.system = system
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.name = name or getattr(fn, "__name__", "job")
+        self.priority = priority
+        self.state = PENDING
+        self.value = None
+        self.error = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._waiting = 0  # unfinished dependencies
+        self._observed = False  # result() or a callback will see a failure
+
+    def done(self):
+        return self._event.is_set()
+
+    def failed(self):
+        return self.state == FAILED
+
+    def result(self, timeout=None):
+        """
+        Wait for the job and return its result (re-raises its exception).
+        Waiting on a worker runs other jobs meanwhile, waiting on the main
+        thread drains main-thread callbacks, so neither can deadlock the pool.
+        """
+        self._observed = True
+        if not self._event.is_set():
+            self.system._wait_for(self, timeout)
+        if self.state == FAILED:
+            raise self.error
+        return self.value
+
+    def add_done_callback(self, fn):
+        """Call fn(job) when the job finishes (immediately if it has)"""
+        self._observed = True
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def then(self, fn, main_thread=False, priority=None):
+        """
+        Job running fn(result) after this one succeeds. With main_thread=True
+        it runs during engine.run()'s next main-thread drain instead of on a
+        worker. If this job fails the continuation fails with the same error.
+        """
+        system = self.system
+        job = Job(system, fn, (), None, priority=self.priority if priority is None else priority)
+
+        def resume(parent):
+            if parent.state == FAILED:
+                job._finish(None, parent.error)
+                return
+            job.args = (parent.value,)
+            if main_thread:
+                system.call_on_main(job._run)
+            else:
+                system._enqueue(job)
+
+        self.add_done_callback(resume)
+        return job
+
+    def _run(self):
+        self.state = RUNNING
+        recorder = trace.recorder
+        try:
+            if recorder.enabled:
+                with recorder.span(self.name, "worker"):
+                    value = self.fn(*self.args, **(self.kwargs or {}))
+            else:
+                value = self.fn(*self.args, **(self.kwargs or {}))
+        except BaseException as e:
+            self._finish(None, e)
+            return
+        self._finish(value, None)
+
+    def _finish(self, value, error):
+        with self._lock:
+            self.value = value
+            self.error = error
+            self.state = FAILED if error is not None else DONE
+            self._event.set()
+            callbacks = self._callbacks
+            self._callbacks = []
+        for fn in callbacks:
+            fn(self)
+
+    def __del__(self):
+        # Nobody waited on or chained the failure, do not lose it silently
+        if self.state == FAILED and not self._observed:
+            self.system._unobserved(self)
+
+    def __repr__(self):
+        return f"<Job {self.name} {self.state}>"
+
+
+class _Worker:
+    __slots__ = ("index", "local", "thread")
+
+    def __init__(self, index):
+        self.index = index
+        self.local = deque()
+        self.thread = None
+
+
+class JobSystem:
+    """Fixed worker pool with per-worker deques and work stealing"""
+
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers: Worker threads (default: CPU count - 1, at least 1).
+                     Threads start on the first submit.
+        """
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+        self.worker_count = max(1, workers)
+        self._workers = []
+        self._shared = (deque(), deque(), deque())  # by priority
+        self._main = deque()                        # main-thread callbacks
+        self._cv = threading.Condition()
+        self._sleeping = 0
+        self._running = False
+        self._start_lock = threading.Lock()
+
+        self.completed = 0
+        self.stolen = 0
+        # Failed jobs nobody chained or waited on, with their exception
+        self.errors = deque(maxlen=64)
+
+    # Lifecycle
+
+    def start(self):
+        with self._start_lock:
+            if self._running:
+                return
+            self._running = True
+            self._workers = [_Worker(i) for i in range(self.worker_count)]
+            for worker in self._workers:
+                worker.thread = threading.Thread(
+                    target=self._worker_loop, args=(worker,),
+                    name=f"AngeneJob_{worker.index}", daemon=True)
+                worker.thread.start()
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the queued jobs are done"""
+        if not self._running:
+            return
+        self._running = False
+        with self._cv:
+            self._cv.notify_all()
+        if wait:
+            current = threading.current_thread()
+            for worker in self._workers:
+                if worker.thread is not current:
+                    worker.thread.join()
+        self._workers = []
+
+    # Submission
+
+    def submit(self, fn, *args, after=None, priority=NORMAL, name=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker and return its Job.
+
+        Args:
+            after: Jobs that must finish first; if one fails this job fails
+                   with its error without running
+            priority: HIGH, NORMAL or LOW for jobs submitted off the pool
+            name: Label in traces (default: the function name)
+        """
+        job = Job(self, fn, args, kwargs, name, priority)
+        deps = [d for d in after if not d.done() or d.failed()] if after else ()
+        if not deps:
+            self._enqueue(job)
+            return job
+
+        job._waiting = len(deps)
+        counter_lock = threading.Lock()
+
+        def dep_done(dep):
+            with counter_lock:
+                if job.state != PENDING:
+                    return
+                if dep.state == FAILED:
+                    job.state = FAILED
+                    failed = True
+                else:
+                    job._waiting -= 1
+                    failed = False
+                    if job._waiting:
+                        return
+            if failed:
+                job._finish(None, dep.error)
+            else:
+                self._enqueue(job)
+
+        for dep in deps:
+            dep.add_done_callback(dep_done)
+        return job
+
+    def spawn(self, fn, *args, name=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a thread of its own and return its Job.
+        For blocking or long running work that would tie up a pool worker;
+        the Job chains and waits like any other.
+        """
+        job = Job(self, fn, args, kwargs, name)
+        threading.Thread(target=job._run, name=f"AngeneSpawn_{job.name}", daemon=True).start()
+        return job
+
+    def map(self, fn, items, priority=NORMAL):
+        """One job per item, fn(item) each"""
+        return [self.submit(fn, item, priority=priority) for item in items]
+
+    def when_all(self, jobs):
+        """Job whose result is the list of results of jobs, in order"""
+        jobs = list(jobs)
+        return self.submit(lambda: [j.value for j in jobs], after=jobs, name="when_all")
+
+    def call_on_main(self, fn, *args):
+        """Queue fn(*args) for the main thread's next drain_main()"""
+        self._main.append((fn, args))
+
+    def drain_main(self, budget=None):
+        """
+        Run queued main-thread callbacks (engine.run() calls this each frame).
+        budget is the most seconds to spend; the rest waits for next frame.
+        Returns the number of callbacks run.
+        """
+        queue = self._main
+        count = 0
+        deadline = time.perf_counter() + budget if budget is not None else None
+        while queue:
+            fn, args = queue.popleft()
+            fn(*args)
+            count += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return count
+
+    def pending(self):
+        """Jobs queued but not started"""
+        return sum(len(q) for q in self._shared) + sum(len(w.local) for w in self._workers)
+
+    # Scheduling
+
+    def _enqueue(self, job):
+        if not self._running:
+            self.start()
+        worker = getattr(_local, "worker", None)
+        if worker is not None and _local.system is self:
+            worker.local.append(job)
+        else:
+            self._shared[job.priority].append(job)
+        # A worker going to sleep counts itself and checks the queues again
+        # under the lock, so it either sees this job or gets this notify
+        if self._sleeping:
+            with self._cv:
+                self._cv.notify()
+
+    def _find(self, worker):
+        # Own deque newest first, then shared queues by priority, then steal
+        # the oldest job of another worker
+        if worker is not None:
+            try:
+                return worker.local.pop()
+            except IndexError:
+                pass
+        for queue in self._shared:
+            try:
+                return queue.popleft()
+            except IndexError:
+                pass
+        workers = self._workers
+        if len(workers) > 1 or worker is None:
+            start = random.randrange(len(workers)) if workers else 0
+            for i in range(len(workers)):
+                victim = workers[(start + i) % len(workers)]
+                if victim is worker:
+                    continue
+                try:
+                    job = victim.local.popleft()
+                except IndexError:
+                    continue
+                self.stolen += 1
+                return job
+        return None
+
+    def _execute(self, job):
+        job._run()
+        self.completed += 1
+
+    def _worker_loop(self, worker):
+        _local.worker = worker
+        _local.system = self
+        while True:
+            job = self._find(worker)
+            if job is not None:
+                self._execute(job)
+                continue
+            with self._cv:
+                if not self._running:
+                    break
+                self._sleeping += 1
+                job = self._find(worker)
+                if job is None:
+                    self._cv.wait()
+                self._sleeping -= 1
+            if job is not None:
+                self._execute(job)
+        # Leave nothing behind for a restarted pool
+        job = self._find(worker)
+        while job is not None:
+            self._execute(job)
+            job = self._find(worker)
+
+    def _wait_for(self, job, timeout):
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        worker = getattr(_local, "worker", None)
+        on_main = threading.current_thread() is threading.main_thread()
+        while not job._event.is_set():
+            if deadline is not None and time.perf_counter() >= deadline:
+                raise TimeoutError(f"Angene Logic Error | Job {job.name} did not finish in time.")
+            if worker is not None:
+                # Help instead of blocking a pool thread
+                other = self._find(worker)
+                if other is not None:
+                    self._execute(other)
+                    continue
+            elif on_main and self._main:
+                self.drain_main()
+                continue
+            job._event.wait(0.001)
+
+    def _unobserved(self, job):
+        self.errors.append((job, job.error))
+        print(f"Angene job {job.name} failed:")
+        traceback.print_exception(type(job.error), job.error, job.error.__traceback__)
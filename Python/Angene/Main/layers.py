@@ -0,0 +1,86 @@
+# Angene\layers.py
+"""
+Retained layers: static 2D content drawn once into an offscreen surface and
+composited with a single blit per frame until it is invalidated.
+
+    class Menu:
+        def Start(self):
+            self.background = Layer(640, 480, self.draw_background)
+
+        def draw_background(self, r):
+            r.clear(RGB(20, 20, 30))
+            for i, item in enumerate(ITEMS):
+                r.draw_rect(40, 40 + i * 30, 200, 24, RGB(50, 50, 70))
+                r.draw_text(48, 44 + i * 30, item, RGB(255, 255, 255))
+
+        def OnDraw(self, r):
+            r.draw_layer(self.background)       # one BitBlt
+            r.draw_text(10, 450, f"{fps} fps", RGB(255, 255, 0))
+
+        def OnApplicationQuit(self):
+            self.background.cleanup()
+
+The surface matches the renderer the layer is first drawn with (a memory DC
+on Win32, a NumPy framebuffer on the software backend). A layer with a key
+color starts every redraw cleared to it and composites with that color
+transparent (TransparentBlt on Win32). A layer belongs to one window, render
+workers draw windows at the same time.
+"""
+
+
+class Layer:
+    """Offscreen surface redrawn only after invalidate()"""
+
+    def __init__(self, width, height, draw=None, key=None):
+        """
+        Args:
+            width, height: Surface size in pixels
+            draw: draw(r) callback filling the layer; subclasses may
+                  override OnDraw(r) instead
+            key: COLORREF shown as transparent when composited, None for an
+                 opaque layer
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.draw = draw
+        self.key = key
+        self.surface = None
+        self.dirty = True
+        self.version = 0     # bumped by invalidate(), display lists compare it
+        self.redraws = 0
+
+    def OnDraw(self, r):
+        if self.draw is not None:
+            self.draw(r)
+
+    def invalidate(self):
+        """Redraw the layer the next time it is composited"""
+        self.dirty = True
+        self.version += 1
+
+    def resize(self, width, height):
+        """Change the size, the surface is recreated and redrawn"""
+        self.cleanup()
+        self.width = int(width)
+        self.height = int(height)
+
+    def render(self, target):
+        """The layer's surface for target's renderer type, redrawn if dirty"""
+        surface = self.surface
+        if surface is None:
+            surface = self.surface = target.create_offscreen(self.width, self.height)
+            self.dirty = True
+        if self.dirty:
+            if self.key is not None:
+                surface.clear(self.key)
+            self.OnDraw(surface)
+            self.dirty = False
+            self.redraws += 1
+        return surface
+
+    def cleanup(self):
+        """Free the surface (a GDI DC and bitmap on Win32)"""
+        if self.surface is not None:
+            self.surface.destroy()
+            self.surface = None
+        self.invalidate()
@@ -1,55 +1,252 @@
 # Angene\painter.py
 import ctypes
+import operator
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
 
-gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+from Angene.Main.display_list import OP_TEXT, OP_LAYER, DisplayList, rect_coords
+from Angene.Main.images import image_bgra
 
-# Properly define all GDI functions
-CreateSolidBrush = gdi32.CreateSolidBrush
-CreateSolidBrush.argtypes = [ctypes.c_ulong]
-CreateSolidBrush.restype = ctypes.c_void_p
+try:
+    gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+except (AttributeError, OSError):
+    # No GDI on this platform, only headless backends can draw
+    gdi32 = None
 
-SelectObject = gdi32.SelectObject
-SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
-SelectObject.restype = ctypes.c_void_p
+if gdi32 is not None:
+    # Properly define all GDI functions
+    CreateSolidBrush = gdi32.CreateSolidBrush
+    CreateSolidBrush.argtypes = [ctypes.c_ulong]
+    CreateSolidBrush.restype = ctypes.c_void_p
 
-DeleteObject = gdi32.DeleteObject
-DeleteObject.argtypes = [ctypes.c_void_p]
-DeleteObject.restype = ctypes.c_bool
+    SelectObject = gdi32.SelectObject
+    SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    SelectObject.restype = ctypes.c_void_p
 
-Rectangle = gdi32.Rectangle
-Rectangle.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
-Rectangle.restype = ctypes.c_bool
+    DeleteObject = gdi32.DeleteObject
+    DeleteObject.argtypes = [ctypes.c_void_p]
+    DeleteObject.restype = ctypes.c_bool
 
-TextOutW = gdi32.TextOutW
-TextOutW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_wchar_p, ctypes.c_int]
-TextOutW.restype = ctypes.c_bool
+    Rectangle = gdi32.Rectangle
+    Rectangle.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    Rectangle.restype = ctypes.c_bool
 
-SetBkMode = gdi32.SetBkMode
-SetBkMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
-SetBkMode.restype = ctypes.c_int
+    TextOutW = gdi32.TextOutW
+    TextOutW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_wchar_p, ctypes.c_int]
+    TextOutW.restype = ctypes.c_bool
 
-SetTextColor = gdi32.SetTextColor
-SetTextColor.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
-SetTextColor.restype = ctypes.c_ulong
+    SetBkMode = gdi32.SetBkMode
+    SetBkMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    SetBkMode.restype = ctypes.c_int
 
-# Get stock objects (NULL_PEN to prevent outline drawing which can leak)
-GetStockObject = gdi32.GetStockObject
-GetStockObject.argtypes = [ctypes.c_int]
-GetStockObject.restype = ctypes.c_void_p
+    SetTextColor = gdi32.SetTextColor
+    SetTextColor.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    SetTextColor.restype = ctypes.c_ulong
+
+    SetDCBrushColor = gdi32.SetDCBrushColor
+    SetDCBrushColor.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    SetDCBrushColor.restype = ctypes.c_ulong
+
+    ExtCreateRegion = gdi32.ExtCreateRegion
+    ExtCreateRegion.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p]
+    ExtCreateRegion.restype = ctypes.c_void_p
+
+    FillRgn = gdi32.FillRgn
+    FillRgn.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+    FillRgn.restype = ctypes.c_bool
+
+    GetTextExtentPoint32W = gdi32.GetTextExtentPoint32W
+    GetTextExtentPoint32W.argtypes = [ctypes.c_void_p, ctypes.c_wchar_p, ctypes.c_int, ctypes.c_void_p]
+    GetTextExtentPoint32W.restype = ctypes.c_bool
+
+    # Offscreen surfaces (layers.Layer)
+    CreateCompatibleDC = gdi32.CreateCompatibleDC
+    CreateCompatibleDC.argtypes = [ctypes.c_void_p]
+    CreateCompatibleDC.restype = ctypes.c_void_p
+
+    CreateCompatibleBitmap = gdi32.CreateCompatibleBitmap
+    CreateCompatibleBitmap.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+    CreateCompatibleBitmap.restype = ctypes.c_void_p
+
+    DeleteDC = gdi32.DeleteDC
+    DeleteDC.argtypes = [ctypes.c_void_p]
+    DeleteDC.restype = ctypes.c_bool
+
+    BitBlt = gdi32.BitBlt
+    BitBlt.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                       ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+    BitBlt.restype = ctypes.c_bool
+
+    msimg32 = ctypes.WinDLL('msimg32')
+    TransparentBlt = msimg32.TransparentBlt
+    TransparentBlt.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                               ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                               ctypes.c_uint]
+    TransparentBlt.restype = ctypes.c_bool
+
+    # Images (images.Image)
+    CreateDIBSection = gdi32.CreateDIBSection
+    CreateDIBSection.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint,
+                                 ctypes.POINTER(ctypes.c_void_p), ctypes.c_void_p, ctypes.c_ulong]
+    CreateDIBSection.restype = ctypes.c_void_p
+
+    StretchBlt = gdi32.StretchBlt
+    StretchBlt.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                           ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                           ctypes.c_ulong]
+    StretchBlt.restype = ctypes.c_bool
+
+    SetStretchBltMode = gdi32.SetStretchBltMode
+    SetStretchBltMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    SetStretchBltMode.restype = ctypes.c_int
+
+    # BLENDFUNCTION is four bytes passed by value, packed into a DWORD
+    AlphaBlend = msimg32.AlphaBlend
+    AlphaBlend.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                           ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                           ctypes.c_uint32]
+    AlphaBlend.restype = ctypes.c_bool
+
+    # Finish batched GDI calls before touching DIB section memory
+    GdiFlush = gdi32.GdiFlush
+    GdiFlush.argtypes = []
+    GdiFlush.restype = ctypes.c_bool
+
+    # Get stock objects (NULL_PEN to prevent outline drawing which can leak)
+    GetStockObject = gdi32.GetStockObject
+    GetStockObject.argtypes = [ctypes.c_int]
+    GetStockObject.restype = ctypes.c_void_p
 
 NULL_PEN = 8
 NULL_BRUSH = 5
+DC_BRUSH = 18
 
 TRANSPARENT = 1
+SRCCOPY = 0x00CC0020
+COLORONCOLOR = 3
+DIB_RGB_COLORS = 0
+BI_RGB = 0
+AC_SRC_OVER = 0x00
+AC_SRC_ALPHA = 0x01
+
+# BLENDFUNCTION(AC_SRC_OVER, 0, 255, AC_SRC_ALPHA): per-pixel premultiplied alpha
+BLEND_PREMULTIPLIED = AC_SRC_OVER | (255 << 16) | (AC_SRC_ALPHA << 24)
+
+
+def _blend_function(alpha, per_pixel):
+    """BLENDFUNCTION with SourceConstantAlpha alpha, AC_SRC_ALPHA when per_pixel"""
+    return AC_SRC_OVER | (alpha << 16) | ((AC_SRC_ALPHA if per_pixel else 0) << 24)
+
+
+def _alpha_byte(opacity):
+    """opacity (0..1) as SourceConstantAlpha, like composite.opacity_byte()"""
+    if opacity >= 1:
+        return 255
+    if opacity <= 0:
+        return 0
+    return int(opacity * 255 + 0.5)
+
+
+def _composite_module():
+    """The composite module, for blending AlphaBlend cannot do (needs NumPy)"""
+    from Angene.Main import composite
+    if composite.np is None:
+        raise RuntimeError("Angene Logic Error | Blend modes and translucent color keyed images "
+                           "on the GDI renderer need NumPy (pip install numpy).")
+    return composite
+
+
+def _bgra(color):
+    """COLORREF as an opaque BGRA DIB pixel"""
+    return 0xFF000000 | ((color & 0xFF) << 16) | (color & 0xFF00) | ((color >> 16) & 0xFF)
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", ctypes.c_uint32),
+        ("biWidth", ctypes.c_int32),
+        ("biHeight", ctypes.c_int32),
+        ("biPlanes", ctypes.c_uint16),
+        ("biBitCount", ctypes.c_uint16),
+        ("biCompression", ctypes.c_uint32),
+        ("biSizeImage", ctypes.c_uint32),
+        ("biXPelsPerMeter", ctypes.c_int32),
+        ("biYPelsPerMeter", ctypes.c_int32),
+        ("biClrUsed", ctypes.c_uint32),
+        ("biClrImportant", ctypes.c_uint32),
+    ]
+RDH_RECTANGLES = 1
+
+# Same-color runs at least this long are filled as one region
+REGION_MIN_RECTS = 8
+# Rectangles per ExtCreateRegion call
+REGION_MAX_RECTS = 2048
+
+_minus_one = (-1).__add__
+
+
+def _create_region(items):
+    """
+    Region covering the x0, y0, x1, y1 rectangles in items with the pixels
+    Rectangle() fills under a NULL pen, or None (flipped rectangles, GDI
+    refused the region): the caller draws those one by one.
+    """
+    x0 = items[0::4]
+    y0 = items[1::4]
+    # Rectangle() leaves out the right and bottom edge, a region does not
+    x1 = array('i', map(_minus_one, items[2::4]))
+    y1 = array('i', map(_minus_one, items[3::4]))
+    if any(map(operator.gt, x0, x1)) or any(map(operator.gt, y0, y1)):
+        return None
+    count = len(x0)
+    rects = array('i', bytes(count * 16))
+    rects[0::4] = x0
+    rects[1::4] = y0
+    rects[2::4] = x1
+    rects[3::4] = y1
+    # RGNDATAHEADER: dwSize, iType, nCount, nRgnSize, rcBound, then the RECTs
+    data = array('i', (32, RDH_RECTANGLES, count, count * 16,
+                       min(x0), min(y0), max(x1), max(y1)))
+    data.extend(rects)
+    return ExtCreateRegion(None, len(data) * 4, data.buffer_info()[0]) or None
+
 
 def RGB(r, g, b):
     """Create a COLORREF from RGB values (0-255 each)"""
     return (r & 0xFF) | ((g & 0xFF) << 8) | ((b & 0xFF) << 16)
 
 class Renderer:
-    """Rendering class that handles drawing to a device context"""
-    _brush_cache = {}  # class-level cache to reuse brushes
+    """
+    Rendering class that handles drawing to a device context.
+
+    The Win32 backend keeps one Renderer per window for the life of its
+    memory DC. It shadows the pen, brush, text color and background mode
+    currently selected into the DC and only calls GDI when one changes, so a
+    run of same-colored rectangles costs one Rectangle() call each. Call
+    reset_state() after drawing on hdc directly, release() before deleting
+    the DC.
+
+    Brushes live in a class-level LRU cache of at most brush_budget GDI
+    handles. A color only gets its own brush the second time it is drawn;
+    until then, and whenever creating one fails, it is filled with the stock
+    DC brush recolored through SetDCBrushColor. Fades and gradients that use
+    each color once never allocate a handle.
+    """
+    brush_budget = 256  # most cached brush handles, see set_brush_budget()
+    brush_hits = 0
+    brush_misses = 0
+    brush_evictions = 0
+    dc_brush_fills = 0  # fills that went through the DC brush
+
+    _brush_cache = OrderedDict()  # color -> brush, least recently used first
+    _brush_seen = OrderedDict()   # colors drawn once, not cached yet
+    _retired = []       # evicted brushes, deleted by collect_brushes()
     _null_pen = None    # Cached NULL pen to prevent outline drawing
+    _dc_brush = None    # Stock DC brush for colors without a cached brush
+    _brush_lock = threading.Lock()  # render workers may create brushes at once
+    _live = weakref.WeakSet()  # renderers that may hold cached brushes selected
     
     def __init__(self, hdc):
         # Don't wrap if already a void pointer
@@ -61,69 +258,573 @@ class Renderer:
         # Get NULL_PEN once and cache it
         if Renderer._null_pen is None:
             Renderer._null_pen = GetStockObject(NULL_PEN)
+            Renderer._dc_brush = GetStockObject(DC_BRUSH)
+
+        # Shadowed DC state, None = unknown
+        self._pen = None
+        self._brush = None
+        self._text_color = None
+        self._bk_mode = None
+        self._dc_brush_color = None
+        self._stretch_mode = None
+        self._scratch_list = None
+        # DIB sections for blend_rect() and read-back compositing, made on use
+        self._solid = None
+        self._solid_color = None
+        self._readback = None
+        # damage.DamageTracker told about everything drawn, set by the engine
+        self.damage = None
+        # Objects the DC had selected before this renderer, put back by release()
+        self._old_pen = None
+        self._old_brush = None
+        with Renderer._brush_lock:
+            Renderer._live.add(self)
     
     def _get_brush(self, color):
-        """Return a cached brush for color, creating it if necessary"""
-        if color not in Renderer._brush_cache:
+        """Return the cached brush for color, None to use the DC brush"""
+        cache = Renderer._brush_cache
+        brush = cache.get(color)
+        if brush is not None:
+            Renderer.brush_hits += 1
+            try:
+                cache.move_to_end(color)
+            except KeyError:
+                pass  # evicted meanwhile, still valid until collect_brushes()
+            return brush
+        with Renderer._brush_lock:
+            brush = cache.get(color)
+            if brush is not None:
+                return brush
+            Renderer.brush_misses += 1
+            seen = Renderer._brush_seen
+            if color not in seen:
+                # First use, a single-use color never costs a handle
+                seen[color] = True
+                if len(seen) > 4 * Renderer.brush_budget:
+                    seen.popitem(last=False)
+                return None
+            del seen[color]
             brush = CreateSolidBrush(color)
             if not brush:
                 print(f"Warning: Failed to create brush for color {color}")
                 return None
-            Renderer._brush_cache[color] = brush
-        return Renderer._brush_cache[color]
+            cache[color] = brush
+            while len(cache) > Renderer.brush_budget:
+                Renderer._retired.append(cache.popitem(last=False)[1])
+                Renderer.brush_evictions += 1
+            return brush
+
+    def _brush_for(self, color):
+        """Cached brush for color, or the DC brush set to color"""
+        brush = self._get_brush(color)
+        if brush is None:
+            brush = Renderer._dc_brush
+            Renderer.dc_brush_fills += 1
+            if self._dc_brush_color != color:
+                SetDCBrushColor(self.hdc, color)
+                self._dc_brush_color = color
+        return brush
+
+    def _select_fill(self, color):
+        """Select the NULL pen and a brush of color unless they already are"""
+        if self._pen is None:
+            previous = SelectObject(self.hdc, Renderer._null_pen)
+            if self._old_pen is None:
+                self._old_pen = previous
+            self._pen = Renderer._null_pen
+        brush = self._brush_for(color)
+        if self._brush != brush:
+            previous = SelectObject(self.hdc, brush)
+            if self._old_brush is None:
+                self._old_brush = previous
+            self._brush = brush
+
+    def _select_text(self, color):
+        """Set transparent text of color unless it already is"""
+        if self._bk_mode != TRANSPARENT:
+            SetBkMode(self.hdc, TRANSPARENT)
+            self._bk_mode = TRANSPARENT
+        if self._text_color != color:
+            SetTextColor(self.hdc, color)
+            self._text_color = color
+
+    def reset_state(self):
+        """Forget the shadowed state, e.g. after drawing on hdc directly"""
+        self._pen = None
+        self._brush = None
+        self._text_color = None
+        self._bk_mode = None
+        self._dc_brush_color = None
+        self._stretch_mode = None
+
+    def release(self):
+        """Select the DC's original pen and brush back in, free blending surfaces"""
+        if self._old_brush:
+            SelectObject(self.hdc, self._old_brush)
+        if self._old_pen:
+            SelectObject(self.hdc, self._old_pen)
+        self._old_pen = None
+        self._old_brush = None
+        self.reset_state()
+        for surface in (self._solid, self._readback):
+            if surface is not None:
+                surface.destroy()
+        self._solid = None
+        self._solid_color = None
+        self._readback = None
     
     def clear(self, color):
         """Clear the entire drawing surface with a solid color"""
-        brush = self._get_brush(color)
-        if not brush:
-            return
-        
-        # Select NULL pen to prevent outline
-        old_pen = SelectObject(self.hdc, Renderer._null_pen)
-        old_brush = SelectObject(self.hdc, brush)
-        
+        self._select_fill(color)
         # Use large coordinates to fill entire surface
         Rectangle(self.hdc, -1, -1, 10000, 10000)
-        
-        # Restore old objects
-        if old_brush:
-            SelectObject(self.hdc, old_brush)
-        if old_pen:
-            SelectObject(self.hdc, old_pen)
+        if self.damage is not None:
+            self.damage.add_all()
     
     def draw_rect(self, x, y, w, h, color):
         """Draw a filled rectangle"""
-        brush = self._get_brush(color)
-        if not brush:
-            return
-        
-        # Select NULL pen to prevent outline
-        old_pen = SelectObject(self.hdc, Renderer._null_pen)
-        old_brush = SelectObject(self.hdc, brush)
-        
+        self._select_fill(color)
         Rectangle(self.hdc, int(x), int(y), int(x + w), int(y + h))
-        
-        # Restore old objects
-        if old_brush:
-            SelectObject(self.hdc, old_brush)
-        if old_pen:
-            SelectObject(self.hdc, old_pen)
+        if self.damage is not None:
+            self.damage.add(x, y, x + w, y + h)
     
     def draw_text(self, x, y, text, color):
         """Draw text at the specified position"""
         try:
-            SetBkMode(self.hdc, TRANSPARENT)
-            SetTextColor(self.hdc, color)
+            self._select_text(color)
             # Ensure text is a string and has reasonable length
             text_str = str(text)[:256]  # Limit length to prevent issues
             TextOutW(self.hdc, int(x), int(y), text_str, len(text_str))
+            if self.damage is not None:
+                self._damage_text(int(x), int(y), text_str)
         except Exception as e:
             print(f"Error drawing text: {e}")
     
+    def draw_rects(self, x, y, w, h, color):
+        """
+        Draw many filled rectangles, same result as draw_rect() in a loop.
+
+        Args:
+            x, y, w, h: Columns of rectangle coordinates (sequences, buffers
+                        or NumPy arrays; w and h may be single numbers)
+            color: One COLORREF for all of them, or one per rectangle
+        """
+        if isinstance(color, int):
+            self._fill_rects(color, rect_coords(x, y, w, h))
+            return
+        # Mixed colors: group them like a display list replay
+        scratch = self._scratch()
+        scratch.draw_rects(x, y, w, h, color)
+        self.draw_list(scratch)
+
+    def draw_texts(self, x, y, texts, color):
+        """
+        Draw many strings, same result as draw_text() in a loop.
+
+        Args:
+            x, y: Columns of positions (sequences, buffers or NumPy arrays)
+            texts: The strings
+            color: One COLORREF for all of them, or one per string
+        """
+        scratch = self._scratch()
+        scratch.draw_texts(x, y, texts, color)
+        self.draw_list(scratch)
+
+    def _scratch(self):
+        """This renderer's reusable DisplayList for batched calls, emptied"""
+        if self._scratch_list is None:
+            self._scratch_list = DisplayList()
+        else:
+            self._scratch_list.reset()
+        return self._scratch_list
+
+    def _damage_text(self, x, y, text):
+        size = (ctypes.c_long * 2)()
+        if GetTextExtentPoint32W(self.hdc, text, len(text), size):
+            self.damage.add(x, y, x + size[0], y + size[1])
+
+    def _fill_rects(self, color, items):
+        """Fill the x0, y0, x1, y1 rectangles in items with color"""
+        hdc = self.hdc
+        if self.damage is not None and items:
+            xs = items[0::2]
+            ys = items[1::2]
+            self.damage.add(min(xs), min(ys), max(xs), max(ys))
+        count = len(items) // 4
+        if count >= REGION_MIN_RECTS:
+            # One region per chunk: three GDI calls instead of one per rect
+            brush = self._brush_for(color)
+            step = REGION_MAX_RECTS * 4
+            for start in range(0, len(items), step):
+                chunk = items[start:start + step]
+                region = _create_region(chunk)
+                if region is None:
+                    self._select_fill(color)
+                    for j in range(0, len(chunk), 4):
+                        Rectangle(hdc, chunk[j], chunk[j + 1], chunk[j + 2], chunk[j + 3])
+                    continue
+                FillRgn(hdc, region, brush)
+                DeleteObject(region)
+            return
+        self._select_fill(color)
+        for j in range(0, len(items), 4):
+            Rectangle(hdc, items[j], items[j + 1], items[j + 2], items[j + 3])
+
+    def create_offscreen(self, width, height):
+        """Renderer drawing into a new memory DC compatible with this one"""
+        return OffscreenRenderer(self.hdc, width, height)
+
+    def blit(self, source, x=0, y=0, key=None):
+        """
+        Copy an offscreen renderer's surface to x, y.
+
+        Args:
+            source: Renderer from create_offscreen()
+            key: COLORREF left out (transparent), None copies everything
+        """
+        x = int(x)
+        y = int(y)
+        width = source.width
+        height = source.height
+        if key is None:
+            BitBlt(self.hdc, x, y, width, height, source.hdc, 0, 0, SRCCOPY)
+        else:
+            TransparentBlt(self.hdc, x, y, width, height, source.hdc, 0, 0, width, height, key)
+        if self.damage is not None:
+            self.damage.add(x, y, x + width, y + height)
+
+    def draw_layer(self, layer, x=0, y=0):
+        """Composite a layers.Layer, redrawing it first if it was invalidated"""
+        self.blit(layer.render(self), x, y, layer.key)
+
+    def draw_image(self, image, x, y, w=None, h=None, src=None, opacity=1.0, mode="normal"):
+        """
+        Draw an images.Image (uploaded to a DIB section on first use).
+
+        Args:
+            x, y: Destination position
+            w, h: Destination size, scaled when it differs from the source
+                  (default: the source size)
+            src: x, y, w, h of the part of the image to draw (default: all)
+            opacity: 0..1, multiplies the image's own alpha
+            mode: "normal", "add", "multiply" or "screen" (see composite);
+                  AlphaBlend does normal, the rest is composited in NumPy
+        """
+        surface = image.surface("gdi", ImageSurface)
+        if src is None:
+            sx, sy, sw, sh = 0, 0, image.width, image.height
+        else:
+            sx, sy, sw, sh = src
+        x = int(x)
+        y = int(y)
+        w = sw if w is None else int(w)
+        h = sh if h is None else int(h)
+        alpha = _alpha_byte(opacity)
+        hdc = self.hdc
+        with surface.lock:
+            if mode != "normal" or (alpha < 255 and image.key is not None and not surface.alpha):
+                self._blend_image(image, surface, x, y, w, h, sx, sy, sw, sh, opacity, mode)
+            elif alpha == 0:
+                return
+            elif surface.alpha or alpha < 255:
+                AlphaBlend(hdc, x, y, w, h, surface.mem_dc, sx, sy, sw, sh,
+                           _blend_function(alpha, surface.alpha))
+            elif image.key is not None:
+                TransparentBlt(hdc, x, y, w, h, surface.mem_dc, sx, sy, sw, sh, image.key)
+            elif w == sw and h == sh:
+                BitBlt(hdc, x, y, w, h, surface.mem_dc, sx, sy, SRCCOPY)
+            else:
+                if self._stretch_mode != COLORONCOLOR:
+                    SetStretchBltMode(hdc, COLORONCOLOR)
+                    self._stretch_mode = COLORONCOLOR
+                StretchBlt(hdc, x, y, w, h, surface.mem_dc, sx, sy, sw, sh, SRCCOPY)
+        if self.damage is not None:
+            self.damage.add(x, y, x + w, y + h)
+
+    def draw_sprites(self, image, items, opacity=1.0, mode="normal"):
+        """
+        Draw many parts of one images.Image in a single pass: the surface is
+        looked up and locked once and the blit is chosen once, see
+        atlas.SpriteBatch.
+
+        Args:
+            items: x, y, w, h, sx, sy, sw, sh per sprite, flat (a list or array('i'))
+            opacity, mode: As for draw_image(), for every sprite
+        """
+        if not len(items):
+            return
+        surface = image.surface("gdi", ImageSurface)
+        hdc = self.hdc
+        src_dc = surface.mem_dc
+        alpha = _alpha_byte(opacity)
+        # Eight at a time, without slicing out a sprite
+        it = iter(items)
+        sprites = zip(it, it, it, it, it, it, it, it)
+        with surface.lock:
+            if mode != "normal" or (alpha < 255 and image.key is not None and not surface.alpha):
+                for x, y, w, h, sx, sy, sw, sh in sprites:
+                    self._blend_image(image, surface, x, y, w, h, sx, sy, sw, sh, opacity, mode)
+            elif alpha == 0:
+                return
+            elif surface.alpha or alpha < 255:
+                blend = _blend_function(alpha, surface.alpha)
+                for x, y, w, h, sx, sy, sw, sh in sprites:
+                    AlphaBlend(hdc, x, y, w, h, src_dc, sx, sy, sw, sh, blend)
+            elif image.key is not None:
+                key = image.key
+                for x, y, w, h, sx, sy, sw, sh in sprites:
+                    TransparentBlt(hdc, x, y, w, h, src_dc, sx, sy, sw, sh, key)
+            else:
+                if self._stretch_mode != COLORONCOLOR:
+                    SetStretchBltMode(hdc, COLORONCOLOR)
+                    self._stretch_mode = COLORONCOLOR
+                for x, y, w, h, sx, sy, sw, sh in sprites:
+                    if w == sw and h == sh:
+                        BitBlt(hdc, x, y, w, h, src_dc, sx, sy, SRCCOPY)
+                    else:
+                        StretchBlt(hdc, x, y, w, h, src_dc, sx, sy, sw, sh, SRCCOPY)
+        if self.damage is not None:
+            xs = items[0::8]
+            ys = items[1::8]
+            self.damage.add(min(xs), min(ys),
+                            max(map(operator.add, xs, items[2::8])),
+                            max(map(operator.add, ys, items[3::8])))
+
+    def blend_rect(self, x, y, w, h, color, opacity=1.0, mode="normal"):
+        """
+        Composite a solid rectangle over what is drawn: translucent panels,
+        shadows, fades. Covers all w x h pixels (draw_rect() leaves out the
+        right and bottom edge like GDI's Rectangle()).
+
+        Args:
+            opacity: 0..1, 0.5 lets half of what is underneath through
+            mode: "normal" (AlphaBlend), "add", "multiply" or "screen"
+                  (composited in NumPy, see composite)
+        """
+        x0, x1 = sorted((int(x), int(x + w)))
+        y0, y1 = sorted((int(y), int(y + h)))
+        w = x1 - x0
+        h = y1 - y0
+        alpha = _alpha_byte(opacity)
+        if not w or not h or alpha == 0:
+            return
+        if mode != "normal":
+            self._composite(x0, y0, w, h, _bgra(color), opacity, mode)
+        else:
+            solid = self._solid
+            if solid is None:
+                solid = self._solid = DibSurface(1, 1)
+            if self._solid_color != color:
+                GdiFlush()  # an earlier AlphaBlend may still read the old pixel
+                ctypes.c_uint32.from_address(solid.bits).value = _bgra(color)
+                self._solid_color = color
+            AlphaBlend(self.hdc, x0, y0, w, h, solid.mem_dc, 0, 0, 1, 1, _blend_function(alpha, False))
+        if self.damage is not None:
+            self.damage.add(x0, y0, x1, y1)
+
+    def _composite(self, x, y, w, h, source, opacity, mode):
+        """
+        Blend source over x, y, w, h of the DC by reading the pixels back
+        into a DIB section, for what AlphaBlend cannot do.
+
+        Args:
+            source: h x w premultiplied BGRA uint32 array, or one opaque
+                    BGRA pixel value for a solid color
+        """
+        composite = _composite_module()
+        composite.check_mode(mode)
+        readback = self._readback
+        if readback is None or readback.width < w or readback.height < h:
+            if readback is not None:
+                readback.destroy()
+            width = max(w, readback.width if readback is not None else 0)
+            height = max(h, readback.height if readback is not None else 0)
+            readback = self._readback = DibSurface(width, height)
+        BitBlt(readback.mem_dc, 0, 0, w, h, self.hdc, x, y, SRCCOPY)
+        GdiFlush()
+        target = readback.pixels()[:h, :w]
+        target |= 0xFF000000  # alpha is undefined in a compatible bitmap
+        if isinstance(source, int):
+            composite.blend_color(target, source, mode, opacity)
+        else:
+            composite.blend(target, source, mode, opacity)
+        BitBlt(self.hdc, x, y, w, h, readback.mem_dc, 0, 0, SRCCOPY)
+
+    def _blend_image(self, image, surface, x, y, w, h, sx, sy, sw, sh, opacity, mode):
+        """draw_image() through _composite(), nearest neighbor scaling"""
+        if w <= 0 or h <= 0 or sw <= 0 or sh <= 0:
+            return
+        numpy = _composite_module().np
+        pixels = surface.pixels()
+        rows = sy + (numpy.arange(h) * sh) // h
+        cols = sx + (numpy.arange(w) * sw) // w
+        source = pixels[rows[:, None], cols[None, :]]
+        if image.key is not None and not surface.alpha:
+            # Key color as fully transparent
+            source = numpy.where(source == _bgra(image.key), numpy.uint32(0), source)
+        self._composite(x, y, w, h, source, opacity, mode)
+
+    def draw_list(self, display_list):
+        """
+        Replay a display_list.DisplayList: at most one SelectObject per
+        color group (none when its brush is already selected), long groups
+        are filled as a single region
+        """
+        hdc = self.hdc
+        texts = display_list.texts
+        for op, color, items in display_list.batches():
+            if op == OP_TEXT:
+                self._select_text(color)
+                for j in range(0, len(items), 3):
+                    text = texts[items[j + 2]]
+                    TextOutW(hdc, items[j], items[j + 1], text, len(text))
+                    if self.damage is not None:
+                        self._damage_text(items[j], items[j + 1], text)
+                continue
+            if op >= OP_LAYER:
+                display_list.draw_object(self, op, color, items)
+                continue
+
+            self._fill_rects(color, items)
+
+    @classmethod
+    def set_brush_budget(cls, budget):
+        """Set the most cached brush handles; extra brushes are evicted"""
+        with cls._brush_lock:
+            cls.brush_budget = max(1, int(budget))
+            while len(cls._brush_cache) > cls.brush_budget:
+                cls._retired.append(cls._brush_cache.popitem(last=False)[1])
+                cls.brush_evictions += 1
+
+    @classmethod
+    def brush_stats(cls):
+        """Brush cache counters as a dict"""
+        return {
+            "cached": len(cls._brush_cache),
+            "budget": cls.brush_budget,
+            "hits": cls.brush_hits,
+            "misses": cls.brush_misses,
+            "evictions": cls.brush_evictions,
+            "dc_brush_fills": cls.dc_brush_fills,
+        }
+
+    @classmethod
+    def collect_brushes(cls):
+        """
+        Delete evicted brushes. Only call while no renderer is drawing (the
+        engine does it once a frame is rendered): renderers that still have
+        one selected switch to the DC brush first.
+        """
+        if not cls._retired:
+            return
+        # Render workers add renderers to _live, copy it under the lock
+        with cls._brush_lock:
+            retired = cls._retired
+            cls._retired = []
+            live = list(cls._live)
+        doomed = set(retired)
+        for renderer in live:
+            if renderer._brush in doomed:
+                SelectObject(renderer.hdc, cls._dc_brush)
+                renderer._brush = cls._dc_brush
+        for brush in retired:
+            DeleteObject(brush)
+
     @classmethod
     def cleanup(cls):
         """Delete all cached brushes. Call on engine exit."""
+        # Never delete a brush that is still selected into a DC
+        with cls._brush_lock:
+            live = list(cls._live)
+        for renderer in live:
+            renderer.release()
         for brush in cls._brush_cache.values():
             DeleteObject(brush)
+        for brush in cls._retired:
+            DeleteObject(brush)
         cls._brush_cache.clear()
-        # Note: Don't delete stock objects like NULL_PEN
\ No newline at end of file
+        cls._brush_seen.clear()
+        cls._retired = []
+        # Note: Don't delete stock objects like NULL_PEN
+
+
+class OffscreenRenderer(Renderer):
+    """Renderer owning a memory DC and bitmap, see Renderer.create_offscreen()"""
+
+    def __init__(self, hdc, width, height):
+        self.width = int(width)
+        self.height = int(height)
+        self.mem_dc = CreateCompatibleDC(hdc)
+        self.bmp = CreateCompatibleBitmap(hdc, self.width, self.height)
+        if not self.mem_dc or not self.bmp:
+            raise RuntimeError(f"Angene Logic Error | Could not create a {self.width}x{self.height} offscreen surface.")
+        self.old_bmp = SelectObject(self.mem_dc, self.bmp)
+        super().__init__(self.mem_dc)
+
+    def destroy(self):
+        """Delete the DC and bitmap"""
+        if self.mem_dc is None:
+            return
+        self.release()
+        SelectObject(self.mem_dc, self.old_bmp)
+        DeleteObject(self.bmp)
+        DeleteDC(self.mem_dc)
+        self.mem_dc = None
+        self.bmp = None
+
+
+class DibSurface:
+    """
+    A 32-bit top-down DIB section selected into its own memory DC: a blit
+    source or target whose pixels Python can also read and write.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = width
+        header.biHeight = -height  # top-down rows
+        header.biPlanes = 1
+        header.biBitCount = 32
+        header.biCompression = BI_RGB
+        bits = ctypes.c_void_p()
+        self.bmp = CreateDIBSection(None, ctypes.byref(header), DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+        if not self.bmp or not bits.value:
+            raise RuntimeError(f"Angene Logic Error | Could not create a {width}x{height} DIB section.")
+        self.bits = bits.value
+        self.mem_dc = CreateCompatibleDC(None)
+        self.old_bmp = SelectObject(self.mem_dc, self.bmp)
+
+    def pixels(self):
+        """(height, width) uint32 BGRA NumPy view of the bits, GdiFlush() first"""
+        import numpy
+        buffer = (ctypes.c_uint32 * (self.width * self.height)).from_address(self.bits)
+        return numpy.frombuffer(buffer, numpy.uint32).reshape(self.height, self.width)
+
+    def destroy(self):
+        """Delete the DC and DIB section"""
+        if self.mem_dc is None:
+            return
+        SelectObject(self.mem_dc, self.old_bmp)
+        DeleteObject(self.bmp)
+        DeleteDC(self.mem_dc)
+        self.mem_dc = None
+        self.bmp = None
+
+
+class ImageSurface(DibSurface):
+    """
+    An images.Image in a DIB section, premultiplied for AlphaBlend when the
+    image has alpha. The DC is a blit source for every window, lock
+    serializes render workers.
+    """
+
+    def __init__(self, image):
+        super().__init__(image.width, image.height)
+        self.alpha = image.has_alpha
+        self.lock = threading.Lock()
+        pixels = bytes(image_bgra(image, premultiply=self.alpha))
+        ctypes.memmove(self.bits, pixels, len(pixels))
+
@@ -0,0 +1,141 @@
+# Angene\profiler.py
+"""
+Frame phase profiler.
+
+engine.run() splits every frame into spans (message pump, each scene's
+Update/LateUpdate/OnDraw, present, sleep, ...) and, while the profiler is
+enabled, records their durations into fixed-size ring buffers. Percentiles
+are only computed when queried, so recording is one perf_counter() call and
+one array store per span. Render workers record their OnDraw spans from
+their own threads, so ring writes take a lock:
+
+    from Angene.Main import engine
+
+    engine.profiler.enable()
+    ...
+    print(engine.profiler.report())
+    engine.profiler.stats()["frame"]["p99"]   # seconds
+"""
+
+import threading
+import time
+from array import array
+
+perf_counter = time.perf_counter
+
+
+class SpanRing:
+    """Fixed-size ring of span durations in seconds"""
+    __slots__ = ("samples", "index", "count", "total", "max")
+
+    def __init__(self, size):
+        self.samples = array('d', bytes(8 * size))
+        self.index = 0
+        self.count = 0     # samples recorded since reset (not capped)
+        self.total = 0.0   # sum of all samples since reset
+        self.max = 0.0     # largest sample since reset
+
+    def add(self, value):
+        i = self.index
+        self.samples[i] = value
+        i += 1
+        self.index = 0 if i == len(self.samples) else i
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def window(self):
+        """Samples currently held, oldest first"""
+        size = len(self.samples)
+        if self.count < size:
+            return self.samples[:self.count]
+        return self.samples[self.index:] + self.samples[:self.index]
+
+    def stats(self):
+        held = sorted(self.window())
+        n = len(held)
+        if n == 0:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0,
+                    'p99': 0.0, 'max': 0.0, 'max_all': 0.0}
+        return {
+            'count': self.count,
+            'mean': sum(held) / n,
+            'p50': held[int((n - 1) * 0.50)],
+            'p95': held[int((n - 1) * 0.95)],
+            'p99': held[int((n - 1) * 0.99)],
+            'max': held[-1],          # within the ring window
+            'max_all': self.max,      # since the last reset
+        }
+
+
+class Profiler:
+    """Per-phase span recorder with percentile queries"""
+
+    def __init__(self, size=512):
+        """
+        Args:
+            size: Samples kept per phase (frames of history)
+        """
+        self.size = size
+        self.enabled = False
+        self._rings = {}
+        self._lock = threading.Lock()
+        # Optional trace.TraceRecorder that also receives every span
+        self.tracer = None
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._rings.clear()
+
+    def record(self, name, seconds):
+        """Add one sample to a phase"""
+        with self._lock:
+            ring = self._rings.get(name)
+            if ring is None:
+                ring = self._rings[name] = SpanRing(self.size)
+            ring.add(seconds)
+
+    def record_span(self, name, start, end, cat="engine"):
+        """Add a span given its perf_counter() start and end (any thread)"""
+        with self._lock:
+            ring = self._rings.get(name)
+            if ring is None:
+                ring = self._rings[name] = SpanRing(self.size)
+            ring.add(end - start)
+        if self.tracer is not None:
+            self.tracer.add(name, start, end, cat)
+
+    def mark(self, name, start, cat="engine"):
+        """Record a span from start until now under name and return now"""
+        now = perf_counter()
+        self.record_span(name, start, now, cat)
+        return now
+
+    def phases(self):
+        with self._lock:
+            return list(self._rings)
+
+    def stats(self, name=None):
+        """Stats dict for one phase, or {phase: stats} for all of them"""
+        with self._lock:
+            if name is not None:
+                ring = self._rings.get(name)
+                return ring.stats() if ring else SpanRing(1).stats()
+            return {phase: ring.stats() for phase, ring in self._rings.items()}
+
+    def report(self):
+        """Human readable table of all phases, in milliseconds"""
+        lines = [f"{'phase':<40} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+        for phase, st in sorted(self.stats().items()):
+            lines.append(
+                f"{phase:<40} {st['p50'] * 1000:8.3f} {st['p95'] * 1000:8.3f} "
+                f"{st['p99'] * 1000:8.3f} {st['max'] * 1000:8.3f}"
+            )
+        return "\n".join(lines)
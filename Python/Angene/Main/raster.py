@@ -0,0 +1,640 @@
+# Angene\raster.py
+"""
+NumPy software rasterizer with the painter.Renderer API.
+
+SoftwareRenderer draws clear / draw_rect / draw_text into an RGBA
+framebuffer with vectorized slice fills instead of one GDI call per
+primitive, so 2D scenes run anywhere NumPy does: tests on Linux,
+server-side thumbnails, benchmarks. The "software" backend gives every
+window one of these:
+
+    engine.set_backend("software")
+    window = engine.Window("Thumb", 320, 180)
+    window.set_scene(MyScene())
+    ...
+    engine.get_backend().save_frame(window, "thumb.png")
+
+Rectangles follow GDI's Rectangle() with a NULL pen (right and bottom edge
+left out) and text uses the built-in 5x8 bitmap font, so frames line up
+with what the Win32 backend shows, apart from the font.
+
+NumPy is optional: importing this module works without it, creating a
+SoftwareRenderer does not.
+"""
+
+import os
+import struct
+import zlib
+
+from Angene.Main import bitmap_font, composite
+from Angene.Main.display_list import OP_RECT, OP_TEXT, OP_LAYER
+from Angene.Main.backends import NullBackend
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Alpha byte of an opaque pixel in the uint32 view
+OPAQUE = 0xFF000000
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Angene Logic Error | The software renderer needs NumPy (pip install numpy).")
+
+
+def write_ppm(path, width, height, rgb):
+    """Write packed RGB bytes as a binary PPM (P6)"""
+    with open(path, "wb") as f:
+        f.write(b"P6\n%d %d\n255\n" % (width, height))
+        f.write(rgb)
+
+
+def _png_chunk(kind, data):
+    chunk = kind + data
+    return struct.pack(">I", len(data)) + chunk + struct.pack(">I", zlib.crc32(chunk) & 0xFFFFFFFF)
+
+
+def write_png(path, width, height, rgba):
+    """Write packed RGBA bytes as an 8-bit PNG (no filtering)"""
+    stride = width * 4
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)  # filter type None
+        raw += rgba[y * stride:(y + 1) * stride]
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        f.write(_png_chunk(b"IDAT", zlib.compress(bytes(raw), 6)))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def _image_pixels(image):
+    """
+    Software surface of an images.Image: (height, width) uint32 RGBA,
+    premultiplied when the image has alpha
+    """
+    _require_numpy()
+    pixels = np.frombuffer(image.rgba, dtype="<u4").reshape(image.height, image.width)
+    if image.has_alpha:
+        pixels = composite.premultiply(pixels)
+    return pixels
+
+
+def _key_mask(image):
+    """
+    Software surface kind "software key": True where an images.Image
+    without alpha is not its key color, so sprite batches skip the compare
+    """
+    return _image_pixels(image) != (image.key | OPAQUE)
+
+
+def _box_pixels(x0, y0, widths, heights, width):
+    """
+    (index, owner): flat index of every pixel covered by the boxes (int
+    arrays, already clipped) in a framebuffer width pixels wide, in box
+    order, and the box each pixel belongs to
+    """
+    max_w = int(widths.max())
+    max_h = int(heights.max())
+    area = int((widths * heights).sum())
+    if len(x0) * max_w * max_h <= 2 * area:
+        # Similar sizes (particles, tiles): a padded n x h x w grid
+        grid = ((y0 * width + x0)[:, None, None]
+                + (np.arange(max_h) * width)[None, :, None]
+                + np.arange(max_w)[None, None, :])
+        owner = np.broadcast_to(np.arange(len(x0))[:, None, None], grid.shape)
+        if area != grid.size:
+            inside = ((np.arange(max_h)[None, :, None] < heights[:, None, None])
+                      & (np.arange(max_w)[None, None, :] < widths[:, None, None]))
+            index = grid[inside]
+            owner = owner[inside]
+        else:
+            index = grid.reshape(-1)
+            owner = owner.reshape(-1)
+    else:
+        # rectangles -> rows -> pixels
+        rows = np.repeat(np.arange(len(x0)), heights)
+        row_base = np.cumsum(heights) - heights
+        row_y = y0[rows] + np.arange(len(rows)) - row_base[rows]
+        row_width = widths[rows]
+        pixel_row = np.repeat(np.arange(len(rows)), row_width)
+        pixel_base = np.cumsum(row_width) - row_width
+        index = (row_y * width + x0[rows])[pixel_row]
+        index += np.arange(len(pixel_row)) - pixel_base[pixel_row]
+        owner = rows[pixel_row]
+    return index, owner
+
+
+def _last_writes(index, size):
+    """
+    Mask of the entries of index (flat pixel indices < size) that are the
+    last write to their pixel, None when no pixel repeats. A fancy
+    assignment with repeated indices does not promise which write lands,
+    assigning only these keeps the last one.
+    """
+    n = len(index)
+    if n * 8 < size:
+        # Short index: sort it instead of touching the whole framebuffer
+        order = np.argsort(index, kind="stable")
+        ordered = index[order]
+        repeat = ordered[1:] == ordered[:-1]
+        if not repeat.any():
+            return None
+        keep = np.ones(n, dtype=bool)
+        keep[order[:-1][repeat]] = False  # a later entry writes the same pixel
+        return keep
+    # ufunc.at is unbuffered, every position is compared
+    positions = np.arange(n, dtype=np.int32 if n < 2 ** 31 else np.int64)
+    last = np.full(size, -1, dtype=positions.dtype)
+    np.maximum.at(last, index, positions)
+    keep = last[index] == positions
+    return None if keep.all() else keep
+
+
+class SoftwareRenderer:
+    """painter.Renderer drawing into an RGBA NumPy framebuffer"""
+
+    # Rendered text masks by string, most frames redraw the same labels
+    TEXT_CACHE_SIZE = 256
+    # draw_rects() fills bigger rectangles with one slice each, smaller ones
+    # are rasterized together through a flat index of all their pixels
+    BIG_RECT_PIXELS = 4096
+    # draw_sprites() blends or scales sprites through a flat index while they
+    # average at most this many visible pixels, above it slicing each one is
+    # faster (opaque and keyed copies always slice, see benchmarks/sprite_batch.py)
+    SMALL_SPRITE_PIXELS = 64
+
+    def __init__(self, width, height, text_scale=2):
+        """
+        Args:
+            width, height: Framebuffer size in pixels
+            text_scale: Pixel size of the 5x8 font (2 is close to the GDI
+                        system font)
+        """
+        _require_numpy()
+        self.width = width
+        self.height = height
+        self.text_scale = text_scale
+        # One little endian uint32 per pixel: the bytes read R, G, B, A, so a
+        # COLORREF (0x00BBGGRR) with the alpha byte set is the pixel value
+        self.pixels = np.zeros((height, width), dtype="<u4")
+        self._text_cache = {}
+        # damage.DamageTracker told about everything drawn, set by the engine
+        self.damage = None
+
+    @property
+    def rgba(self):
+        """(height, width, 4) uint8 view of the framebuffer"""
+        return self.pixels.view(np.uint8).reshape(self.height, self.width, 4)
+
+    def clear(self, color):
+        """Clear the entire drawing surface with a solid color"""
+        self.pixels.fill(color | OPAQUE)
+        if self.damage is not None:
+            self.damage.add_all()
+
+    def draw_rect(self, x, y, w, h, color):
+        """Draw a filled rectangle"""
+        # Same pixels as GDI Rectangle(x, y, x + w, y + h) with a NULL pen,
+        # which normalizes flipped rectangles
+        x0, x1 = sorted((int(x), int(x + w)))
+        y0, y1 = sorted((int(y), int(y + h)))
+        x0 = max(x0, 0)
+        y0 = max(y0, 0)
+        x1 = min(x1 - 1, self.width)
+        y1 = min(y1 - 1, self.height)
+        if x0 < x1 and y0 < y1:
+            self.pixels[y0:y1, x0:x1] = color | OPAQUE
+            if self.damage is not None:
+                self.damage.add(x0, y0, x1, y1)
+
+    def blend_rect(self, x, y, w, h, color, opacity=1.0, mode="normal"):
+        """
+        Composite a solid rectangle over what is drawn, see
+        painter.Renderer.blend_rect()
+        """
+        x0, x1 = sorted((int(x), int(x + w)))
+        y0, y1 = sorted((int(y), int(y + h)))
+        x0 = max(x0, 0)
+        y0 = max(y0, 0)
+        x1 = min(x1, self.width)
+        y1 = min(y1, self.height)
+        if x0 < x1 and y0 < y1:
+            composite.blend_color(self.pixels[y0:y1, x0:x1], color | OPAQUE, mode, opacity)
+            if self.damage is not None:
+                self.damage.add(x0, y0, x1, y1)
+
+    def draw_rects(self, x, y, w, h, color):
+        """
+        Draw many filled rectangles, same result as draw_rect() in a loop.
+
+        Args:
+            x, y, w, h: Columns of rectangle coordinates (sequences, buffers
+                        or NumPy arrays; w and h may be single numbers)
+            color: One COLORREF for all of them, or one per rectangle
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+        x1 = (x + np.asarray(w)).astype(np.int64)
+        y1 = (y + np.asarray(h)).astype(np.int64)
+        self._fill_boxes(x.astype(np.int64), y.astype(np.int64), x1, y1, color)
+
+    def draw_texts(self, x, y, texts, color):
+        """Draw many strings, same result as draw_text() in a loop"""
+        n = len(texts)
+        x = np.broadcast_to(np.asarray(x), n).tolist()
+        y = np.broadcast_to(np.asarray(y), n).tolist()
+        colors = np.broadcast_to(np.asarray(color), n).tolist()
+        for i in range(n):
+            self.draw_text(x[i], y[i], texts[i], colors[i])
+
+    def draw_list(self, display_list):
+        """Replay a display_list.DisplayList, one vectorized pass per batch"""
+        texts = display_list.texts
+        for op, color, items in display_list.batches():
+            if op == OP_TEXT:
+                for j in range(0, len(items), 3):
+                    self.draw_text(items[j], items[j + 1], texts[items[j + 2]], color)
+            elif op >= OP_LAYER:
+                display_list.draw_object(self, op, color, items)
+            elif op == OP_RECT:
+                boxes = np.frombuffer(items, dtype=np.int32).reshape(-1, 4).astype(np.int64)
+                self._fill_boxes(boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3], color)
+            else:
+                self.clear(color)
+
+    def _fill_boxes(self, x0, y0, x1, y1, color):
+        """Fill x0, y0, x1, y1 rectangles (int arrays) in order, GDI edges"""
+        n = len(x0)
+        colors = np.broadcast_to(np.asarray(color, dtype=np.uint32) | OPAQUE, n)
+        # Flipped rectangles are normalized like GDI does
+        x0, x1 = np.minimum(x0, x1), np.maximum(x0, x1)
+        y0, y1 = np.minimum(y0, y1), np.maximum(y0, y1)
+        x0 = np.maximum(x0, 0)
+        y0 = np.maximum(y0, 0)
+        x1 = np.minimum(x1 - 1, self.width)
+        y1 = np.minimum(y1 - 1, self.height)
+        keep = (x0 < x1) & (y0 < y1)
+        if not keep.all():
+            x0, y0, x1, y1, colors = x0[keep], y0[keep], x1[keep], y1[keep], colors[keep]
+        if not len(x0):
+            return
+        if self.damage is not None:
+            self.damage.add(int(x0.min()), int(y0.min()), int(x1.max()), int(y1.max()))
+
+        # Runs of small rectangles between big ones, so overlaps keep their order
+        widths = x1 - x0
+        heights = y1 - y0
+        big = np.flatnonzero(widths * heights > self.BIG_RECT_PIXELS)
+        start = 0
+        for b in big.tolist() + [len(x0)]:
+            if b > start:
+                self._fill_small(x0[start:b], y0[start:b], widths[start:b],
+                                 heights[start:b], colors[start:b])
+            if b < len(x0):
+                self.pixels[y0[b]:y1[b], x0[b]:x1[b]] = colors[b]
+            start = b + 1
+
+    def _fill_small(self, x0, y0, widths, heights, colors):
+        index, owner = _box_pixels(x0, y0, widths, heights, self.width)
+        flat = self.pixels.reshape(-1)
+        if (colors == colors[0]).all():
+            flat[index] = colors[0]
+        else:
+            # Later rectangles win where they overlap, like drawing them in turn
+            keep = _last_writes(index, flat.size)
+            if keep is not None:
+                index = index[keep]
+                owner = owner[keep]
+            flat[index] = colors[owner]
+
+    def draw_text(self, x, y, text, color):
+        """Draw text at the specified position (transparent background)"""
+        text_str = str(text)[:256]  # same limit as painter.Renderer
+        if not text_str:
+            return
+        mask = self._text_mask(text_str)
+        height, width = mask.shape
+        x = int(x)
+        y = int(y)
+
+        # Clip the mask against the framebuffer
+        sx = max(0, -x)
+        sy = max(0, -y)
+        ex = min(width, self.width - x)
+        ey = min(height, self.height - y)
+        if sx >= ex or sy >= ey:
+            return
+        region = self.pixels[y + sy:y + ey, x + sx:x + ex]
+        region[mask[sy:ey, sx:ex]] = color | OPAQUE
+        if self.damage is not None:
+            self.damage.add(x + sx, y + sy, x + ex, y + ey)
+
+    def create_offscreen(self, width, height):
+        """Framebuffer of its own for layers.Layer"""
+        return SoftwareRenderer(width, height, self.text_scale)
+
+    def blit(self, source, x=0, y=0, key=None):
+        """
+        Copy another SoftwareRenderer's pixels to x, y.
+
+        Args:
+            key: COLORREF left out (transparent), None copies everything
+        """
+        x = int(x)
+        y = int(y)
+        sx = max(0, -x)
+        sy = max(0, -y)
+        ex = min(source.width, self.width - x)
+        ey = min(source.height, self.height - y)
+        if sx >= ex or sy >= ey:
+            return
+        src = source.pixels[sy:ey, sx:ex]
+        dst = self.pixels[y + sy:y + ey, x + sx:x + ex]
+        if key is None:
+            dst[...] = src
+        else:
+            keep = src != (key | OPAQUE)
+            dst[keep] = src[keep]
+        if self.damage is not None:
+            self.damage.add(x + sx, y + sy, x + ex, y + ey)
+
+    def draw_layer(self, layer, x=0, y=0):
+        """Composite a layers.Layer, redrawing it first if it was invalidated"""
+        self.blit(layer.render(self), x, y, layer.key)
+
+    def destroy(self):
+        """Nothing to free, the framebuffer is garbage collected"""
+        pass
+
+    def draw_image(self, image, x, y, w=None, h=None, src=None, opacity=1.0, mode="normal"):
+        """
+        Draw an images.Image, same arguments as painter.Renderer.draw_image():
+        scaling is nearest neighbor, alpha, opacity and mode are composited
+        by the composite module and image.key is left out.
+        """
+        surface = image.surface("software", _image_pixels)
+        if src is None:
+            sx, sy, sw, sh = 0, 0, image.width, image.height
+        else:
+            sx, sy, sw, sh = src
+        x = int(x)
+        y = int(y)
+        w = sw if w is None else int(w)
+        h = sh if h is None else int(h)
+        if w <= 0 or h <= 0 or sw <= 0 or sh <= 0:
+            return
+
+        # Destination rectangle clipped to the framebuffer
+        dx0 = max(x, 0)
+        dy0 = max(y, 0)
+        dx1 = min(x + w, self.width)
+        dy1 = min(y + h, self.height)
+        if dx0 >= dx1 or dy0 >= dy1:
+            return
+        self._copy_image(image, surface, x, y, w, h, sx, sy, sw, sh, dx0, dy0, dx1, dy1, opacity, mode)
+        if self.damage is not None:
+            self.damage.add(dx0, dy0, dx1, dy1)
+
+    def _copy_image(self, image, surface, x, y, w, h, sx, sy, sw, sh, dx0, dy0, dx1, dy1,
+                    opacity=1.0, mode="normal"):
+        """Composite the part of an image drawn at x, y, w, h inside dx0, dy0, dx1, dy1"""
+        if w == sw and h == sh:
+            pixels = surface[sy + dy0 - y:sy + dy1 - y, sx + dx0 - x:sx + dx1 - x]
+        else:
+            rows = sy + (np.arange(dy0 - y, dy1 - y) * sh) // h
+            cols = sx + (np.arange(dx0 - x, dx1 - x) * sw) // w
+            pixels = surface[rows[:, None], cols[None, :]]
+        target = self.pixels[dy0:dy1, dx0:dx1]
+
+        if image.has_alpha or opacity < 1 or mode != "normal":
+            if image.key is not None and not image.has_alpha:
+                # Key color as fully transparent
+                pixels = np.where(pixels == (image.key | OPAQUE), np.uint32(0), pixels)
+            composite.blend(target, pixels, mode, opacity)
+        elif image.key is not None:
+            np.copyto(target, pixels, where=pixels != (image.key | OPAQUE))
+        else:
+            target[...] = pixels
+
+    def draw_sprites(self, image, items, opacity=1.0, mode="normal"):
+        """
+        Draw many parts of one images.Image in one call, see
+        atlas.SpriteBatch. Small blended or scaled sprites are composited
+        together through a flat index of all their pixels; bigger ones, and
+        unscaled opaque or keyed ones of any size (a slice copy beats
+        building the index), one slice each.
+
+        Args:
+            items: x, y, w, h, sx, sy, sw, sh per sprite, flat (a list or array('i'))
+            opacity, mode: As for draw_image(), for every sprite
+        """
+        if not len(items):
+            return
+        a = np.asarray(items, dtype=np.int64).reshape(-1, 8)
+        x, y, w, h, sx, sy, sw, sh = a.T
+        dx0 = np.maximum(x, 0)
+        dy0 = np.maximum(y, 0)
+        dx1 = np.minimum(x + w, self.width)
+        dy1 = np.minimum(y + h, self.height)
+        keep = (dx0 < dx1) & (dy0 < dy1) & (sw > 0) & (sh > 0)
+        if not keep.all():
+            a = a[keep]
+            dx0, dy0, dx1, dy1 = dx0[keep], dy0[keep], dx1[keep], dy1[keep]
+        if not len(a):
+            return
+        surface = image.surface("software", _image_pixels)
+
+        copies = (not image.has_alpha and opacity >= 1 and mode == "normal"
+                  and (a[:, 2] == a[:, 6]).all() and (a[:, 3] == a[:, 7]).all())
+        area = int(((dx1 - dx0) * (dy1 - dy0)).sum())
+        if not copies and area <= self.SMALL_SPRITE_PIXELS * len(a):
+            left = self._copy_small(image, surface, a, dx0, dy0, dx1, dy1, opacity, mode)
+            if left.any():
+                self._copy_each(image, surface, a[left], dx0[left], dy0[left], dx1[left],
+                                dy1[left], opacity, mode)
+        else:
+            self._copy_each(image, surface, a, dx0, dy0, dx1, dy1, opacity, mode)
+        if self.damage is not None:
+            self.damage.add(int(dx0.min()), int(dy0.min()), int(dx1.max()), int(dy1.max()))
+
+    def _copy_small(self, image, surface, a, dx0, dy0, dx1, dy1, opacity=1.0, mode="normal"):
+        """
+        Composite clipped sprites (rows of a) in one pass. Returns which
+        sprites are left to draw one at a time: blended ones overlapping
+        another sprite, where blending order matters.
+        """
+        x, y, w, h, sx, sy, sw, sh = a.T
+        widths = dx1 - dx0
+        heights = dy1 - dy0
+        index, owner = _box_pixels(dx0, dy0, widths, heights, self.width)
+        if (w == sw).all() and (h == sh).all():
+            # Same walk over the source rectangles, pixel for pixel
+            source, _ = _box_pixels(sx + dx0 - x, sy + dy0 - y, widths, heights, image.width)
+        else:
+            px = index % self.width
+            py = index // self.width
+            source = ((sy[owner] + ((py - y[owner]) * sh[owner]) // h[owner]) * image.width
+                      + sx[owner] + ((px - x[owner]) * sw[owner]) // w[owner])
+        pixels = surface.reshape(-1)[source]
+        flat = self.pixels.reshape(-1)
+        left = np.zeros(len(a), dtype=bool)
+
+        # Fully transparent source pixels change nothing in any mode
+        blend = opacity < 1 or mode != "normal"
+        visible = None
+        if image.has_alpha:
+            alpha = pixels >> 24
+            visible = alpha != 0
+            if not blend:
+                blend = bool((visible & (alpha != 255)).any())
+        elif image.key is not None:
+            visible = pixels != (image.key | OPAQUE)
+        if visible is not None:
+            index = index[visible]
+            pixels = pixels[visible]
+            owner = owner[visible]
+        if blend:
+            # Sprites sharing a pixel with another one
+            shared = np.bincount(index, minlength=flat.size)[index] > 1
+            if shared.any():
+                left[owner[shared]] = True
+                alone = ~left[owner]
+                index = index[alone]
+                pixels = pixels[alone]
+            composite.blend_at(flat, index, pixels, mode, opacity)
+        else:
+            # Later sprites win where they overlap, like drawing them in turn
+            keep = _last_writes(index, flat.size)
+            if keep is not None:
+                index = index[keep]
+                pixels = pixels[keep]
+            flat[index] = pixels
+        return left
+
+    def _copy_each(self, image, surface, a, dx0, dy0, dx1, dy1, opacity=1.0, mode="normal"):
+        """
+        Composite clipped sprites (rows of a) in order, one slice each but
+        none of draw_image()'s per call work
+        """
+        x, y, w, h, sx, sy, sw, sh = a.T
+        blend = image.has_alpha or opacity < 1 or mode != "normal"
+        if (not ((w == sw) & (h == sh)).all()
+                or (blend and image.key is not None and not image.has_alpha)):
+            # Scaled, or a key color to turn transparent first
+            clipped = np.column_stack((dx0, dy0, dx1, dy1)).tolist()
+            for (x, y, w, h, sx, sy, sw, sh), (x0, y0, x1, y1) in zip(a.tolist(), clipped):
+                self._copy_image(image, surface, x, y, w, h, sx, sy, sw, sh, x0, y0, x1, y1,
+                                 opacity, mode)
+            return
+        boxes = zip(dx0.tolist(), dy0.tolist(), dx1.tolist(), dy1.tolist(),
+                    (sx + dx0 - x).tolist(), (sy + dy0 - y).tolist())
+        target = self.pixels
+        if blend:
+            composite.blend_boxes(target, surface, boxes, mode, opacity)
+        elif image.key is None:
+            for x0, y0, x1, y1, u, v in boxes:
+                target[y0:y1, x0:x1] = surface[v:v + y1 - y0, u:u + x1 - x0]
+        else:
+            shown = image.surface("software key", _key_mask)
+            for x0, y0, x1, y1, u, v in boxes:
+                u1 = u + x1 - x0
+                v1 = v + y1 - y0
+                np.copyto(target[y0:y1, x0:x1], surface[v:v1, u:u1], where=shown[v:v1, u:u1])
+
+    def _text_mask(self, text):
+        mask = self._text_cache.get(text)
+        if mask is not None:
+            return mask
+        rows = bitmap_font.text_mask(text)
+        mask = np.frombuffer(b"".join(rows), dtype=np.uint8)
+        mask = mask.reshape(bitmap_font.GLYPH_HEIGHT, -1).astype(bool)
+        scale = self.text_scale
+        if scale > 1:
+            mask = mask.repeat(scale, axis=0).repeat(scale, axis=1)
+        if len(self._text_cache) >= self.TEXT_CACHE_SIZE:
+            self._text_cache.clear()
+        self._text_cache[text] = mask
+        return mask
+
+    # Output
+
+    def to_rgba_bytes(self):
+        return self.pixels.tobytes()
+
+    def to_rgb_bytes(self):
+        return np.ascontiguousarray(self.rgba[:, :, :3]).tobytes()
+
+    def save_ppm(self, path):
+        write_ppm(path, self.width, self.height, self.to_rgb_bytes())
+
+    def save_png(self, path):
+        write_png(path, self.width, self.height, self.to_rgba_bytes())
+
+    def save(self, path):
+        """Write the framebuffer, format picked by extension (.png / .ppm)"""
+        if path.lower().endswith(".ppm"):
+            self.save_ppm(path)
+        else:
+            self.save_png(path)
+
+    @classmethod
+    def cleanup(cls):
+        """Nothing to release, kept for painter.Renderer compatibility"""
+        pass
+
+
+class SoftwareBackend(NullBackend):
+    """
+    Headless backend whose windows draw into SoftwareRenderer framebuffers
+    (window.framebuffer). Frames can be saved on demand or every present.
+    """
+    name = "software"
+
+    def __init__(self, window_map, text_scale=2):
+        _require_numpy()
+        super().__init__(window_map)
+        self.text_scale = text_scale
+        self.capture_directory = None
+        self.capture_format = "png"
+        self.pixels_presented = 0  # pixels copied by present(), see dirty_rects
+
+    def create_surface(self, window):
+        window.framebuffer = SoftwareRenderer(window.width, window.height, self.text_scale)
+
+    def destroy_surface(self, window):
+        window.framebuffer = None
+
+    def begin_draw(self, window):
+        return getattr(window, "framebuffer", None)
+
+    def present(self, window, rects=None):
+        self.frames_presented += 1
+        if rects is None:
+            self.pixels_presented += window.width * window.height
+        else:
+            self.pixels_presented += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+        if self.capture_directory is not None:
+            name = f"window{window.hwnd}_{self.frames_presented:06d}.{self.capture_format}"
+            window.framebuffer.save(os.path.join(self.capture_directory, name))
+
+    def set_resolution(self, hwnd, width, height):
+        window = self.window_map.get(hwnd)
+        if window is None:
+            return
+        window.width = width
+        window.height = height
+        self.create_surface(window)
+
+    def capture(self, directory, fmt="png"):
+        """Save every presented frame into directory (None stops)"""
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.capture_directory = directory
+        self.capture_format = fmt
+
+    def save_frame(self, window, path):
+        """Write a window's last frame to .png or .ppm"""
+        window.framebuffer.save(path)
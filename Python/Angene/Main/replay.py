@@ -0,0 +1,177 @@
+# Angene\replay.py
+"""
+Deterministic input and timing record / replay.
+
+Recording writes every frame's real delta time and the window messages the
+pump routed during it to a compact binary log:
+
+    engine.run(target_fps=60, record="session.angrec")
+
+Replaying feeds the same stream back instead of perf_counter() and the live
+message queue, without frame pacing, so a session runs as fast as the code
+allows. Run it before and after a change and compare the profiler numbers:
+
+    engine.set_backend("null")          # optional, replays headless too
+    ... create the same windows and scenes ...
+    engine.run(target_fps=60, replay="session.angrec")
+
+Windows are identified by creation order, so the replaying script has to
+create its windows in the same order. Only what passes through the pump is
+recorded: Win32 sends WM_ACTIVATE / WM_SIZE / WM_CLOSE straight to the
+window procedure, those are not part of a recording. Neither are messages
+for windows the engine does not own (the live run drops those as well);
+only thread messages without a window are broadcast.
+
+File layout (little endian):
+    header  8s magic, d tick_time
+    frame   d real dt, d idle seconds, I message count
+    message H window index (0xFFFF = broadcast), I msg, Q wParam, q lParam,
+            I time
+"""
+
+import struct
+
+from Angene.Main.definitions import WM_ACTIVATE, WM_SIZE
+
+MAGIC = b"ANGREC\x00\x01"
+BROADCAST = 0xFFFF
+
+_HEADER = struct.Struct("<8sd")
+_FRAME = struct.Struct("<ddI")
+_MESSAGE = struct.Struct("<HIQqI")
+
+
+class _WindowIndex:
+    """Stable hwnd <-> creation order mapping, identical on both sides"""
+
+    def __init__(self, window_map):
+        self.window_map = window_map
+        self.hwnds = []
+        self.index = {}
+        self.sync()
+
+    def sync(self):
+        for hwnd in self.window_map:
+            if hwnd not in self.index:
+                self.index[hwnd] = len(self.hwnds)
+                self.hwnds.append(hwnd)
+
+    def index_of(self, hwnd):
+        """Index of hwnd, BROADCAST for None, None for a window not in the map"""
+        if hwnd is None:
+            return BROADCAST
+        i = self.index.get(hwnd)
+        if i is None:
+            self.sync()
+            i = self.index.get(hwnd)
+        return i
+
+    def hwnd_of(self, i):
+        if i == BROADCAST:
+            return None
+        if i >= len(self.hwnds):
+            self.sync()
+        return self.hwnds[i] if i < len(self.hwnds) else None
+
+
+class Recorder:
+    """Writes frames of (dt, idle time, routed messages) to a log file"""
+
+    def __init__(self, path, window_map, tick_time=0.0):
+        """
+        Args:
+            path: Output file
+            window_map: engine.window_map
+            tick_time: Fixed step of the recorded run, checked on replay
+        """
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(_HEADER.pack(MAGIC, tick_time))
+        self.windows = _WindowIndex(window_map)
+        self._pending = bytearray()
+        self._count = 0
+        self.frames = 0
+        self.messages = 0
+
+    def wrap(self, on_message):
+        """Message callback that records, then forwards to on_message"""
+        pack = _MESSAGE.pack
+        pending = self._pending
+        index_of = self.windows.index_of
+
+        def record(hwnd, msg, wParam, lParam, msg_time):
+            i = index_of(hwnd)
+            if i is not None:
+                pending.extend(pack(i, msg, wParam & 0xFFFFFFFFFFFFFFFF,
+                                    lParam, msg_time & 0xFFFFFFFF))
+                self._count += 1
+            on_message(hwnd, msg, wParam, lParam, msg_time)
+
+        return record
+
+    def end_frame(self, dt, idle=0.0):
+        """Write the frame with the messages recorded since the last one"""
+        self.file.write(_FRAME.pack(dt, idle, self._count))
+        if self._count:
+            self.file.write(self._pending)
+            del self._pending[:]
+            self.messages += self._count
+            self._count = 0
+        self.frames += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class Player:
+    """Reads a recording back one frame at a time"""
+
+    def __init__(self, path, window_map):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        magic, self.tick_time = _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise RuntimeError(f"Angene Logic Error | {path} is not an Angene recording.")
+        self.path = path
+        self.offset = _HEADER.size
+        self.windows = _WindowIndex(window_map)
+        self.frames = 0
+        self.dt = 0.0
+        self.idle = 0.0
+
+    def next_frame(self, on_message, backend):
+        """
+        Deliver the next frame's messages through on_message and load its
+        dt / idle time. Returns False at the end of the recording.
+        """
+        data = self.data
+        offset = self.offset
+        if offset + _FRAME.size > len(data):
+            return False
+        self.dt, self.idle, count = _FRAME.unpack_from(data, offset)
+        offset += _FRAME.size
+
+        unpack = _MESSAGE.unpack_from
+        hwnd_of = self.windows.hwnd_of
+        window_map = self.windows.window_map
+        size = _MESSAGE.size
+        for _ in range(count):
+            i, msg, wParam, lParam, msg_time = unpack(data, offset)
+            offset += size
+            hwnd = hwnd_of(i)
+            if i != BROADCAST and hwnd is None:
+                continue  # window of the recording does not exist here
+            if msg == WM_ACTIVATE or msg == WM_SIZE:
+                window = window_map.get(hwnd)
+                if window is not None:
+                    backend.track_window_state(window, msg, wParam)
+            on_message(hwnd, msg, wParam, lParam, msg_time)
+
+        self.offset = offset
+        self.frames += 1
+        return True
+
+    def close(self):
+        self.data = b""
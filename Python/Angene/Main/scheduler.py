@@ -0,0 +1,219 @@
+# Angene\scheduler.py
+"""
+Multi-rate callback scheduler backed by a hierarchical timer wheel.
+
+Instead of every scene polling time.time() each frame, callbacks register
+at their own rate and the engine advances one shared scheduler per frame:
+
+    from Angene.Main import engine
+
+    engine.scheduler.at_rate(120, self.physics)   # physics(dt) at 120 Hz
+    engine.scheduler.every(0.1, self.think)       # think(dt) at 10 Hz
+    engine.scheduler.after(2.0, self.spawn)       # spawn() once, in 2s
+    timer.cancel()
+
+Timers live in a hashed hierarchical wheel (5 levels, 8+6+6+6+6 bits of
+ticks, like the classic Linux timer wheel): adding, cancelling and expiring
+a timer are O(1), and a frame only touches the slots it moves through, so
+thousands of idle timers cost nothing per frame. Stretches without a timer
+in the finest level are skipped a whole wheel turn (256 ticks) at a time,
+so catching up after a long idle wait stays cheap. Repeating timers are fixed
+rate: they keep an exact due time and catch up if a frame was late.
+"""
+
+import math
+
+LEVEL0_BITS = 8
+LEVEL_BITS = 6
+LEVELS = 5
+
+LEVEL0_SIZE = 1 << LEVEL0_BITS
+LEVEL0_MASK = LEVEL0_SIZE - 1
+LEVEL_SIZE = 1 << LEVEL_BITS
+LEVEL_MASK = LEVEL_SIZE - 1
+
+# Furthest a timer can be placed, in ticks (~49 days at 1ms)
+MAX_SPAN = (1 << (LEVEL0_BITS + LEVEL_BITS * (LEVELS - 1))) - 1
+
+
+class Timer:
+    """Handle for a scheduled callback"""
+    __slots__ = ("callback", "interval", "due", "expires", "active", "name")
+
+    def __init__(self, callback, due, interval=None, name=None):
+        self.callback = callback
+        self.interval = interval  # None for one-shot timers
+        self.due = due            # exact due time in scheduler seconds
+        self.expires = 0          # due time in wheel ticks
+        self.active = True
+        self.name = name
+
+    def cancel(self):
+        """Stop the timer; it is dropped lazily when its slot comes up"""
+        self.active = False
+
+    def __repr__(self):
+        kind = "every %gs" % self.interval if self.interval else "once"
+        return f"<Timer {self.name or self.callback!r} {kind} due={self.due:.4f}>"
+
+
+class Scheduler:
+    """Hierarchical timer wheel advanced by engine time"""
+
+    def __init__(self, resolution=0.001):
+        """
+        Args:
+            resolution: Length of one wheel tick in seconds
+        """
+        self.resolution = resolution
+        self.time = 0.0
+        self._tick = 0  # next tick to process
+        self._level0 = 0  # timers in level 0 slots, cancelled ones included
+        self._wheels = [[[] for _ in range(LEVEL0_SIZE)]]
+        for _ in range(LEVELS - 1):
+            self._wheels.append([[] for _ in range(LEVEL_SIZE)])
+        self.fired = 0
+
+    # Registration
+
+    def every(self, interval, callback, name=None):
+        """Call callback(interval) every interval seconds"""
+        if interval <= 0:
+            raise ValueError("Angene Logic Error | Timer interval must be positive.")
+        timer = Timer(callback, self.time + interval, interval, name)
+        self._schedule(timer)
+        return timer
+
+    def at_rate(self, hz, callback, name=None):
+        """Call callback(1 / hz) hz times per second"""
+        return self.every(1.0 / hz, callback, name)
+
+    def after(self, delay, callback, name=None):
+        """Call callback() once, delay seconds from now"""
+        timer = Timer(callback, self.time + max(delay, 0.0), None, name)
+        self._schedule(timer)
+        return timer
+
+    # Wheel
+
+    def _schedule(self, timer):
+        timer.expires = math.ceil(timer.due / self.resolution - 1e-9)
+        self._insert(timer)
+
+    def _insert(self, timer):
+        expires = timer.expires
+        delta = expires - self._tick
+        if delta < 0:
+            # Already due, fire on the next processed tick
+            self._wheels[0][self._tick & LEVEL0_MASK].append(timer)
+            self._level0 += 1
+            return
+        if delta < LEVEL0_SIZE:
+            self._wheels[0][expires & LEVEL0_MASK].append(timer)
+            self._level0 += 1
+            return
+        if delta > MAX_SPAN:
+            expires = self._tick + MAX_SPAN
+            delta = MAX_SPAN
+        shift = LEVEL0_BITS
+        for level in range(1, LEVELS):
+            if delta < 1 << (shift + LEVEL_BITS) or level == LEVELS - 1:
+                self._wheels[level][(expires >> shift) & LEVEL_MASK].append(timer)
+                return
+            shift += LEVEL_BITS
+
+    def _cascade(self):
+        # Called when level 0 wraps: pull the next slot of each coarser level
+        # down, stopping at the first level that did not wrap itself
+        shift = LEVEL0_BITS
+        for level in range(1, LEVELS):
+            index = (self._tick >> shift) & LEVEL_MASK
+            wheel = self._wheels[level]
+            bucket = wheel[index]
+            if bucket:
+                wheel[index] = []
+                for timer in bucket:
+                    if timer.active:
+                        self._insert(timer)
+            if index != 0:
+                break
+            shift += LEVEL_BITS
+
+    def advance(self, dt):
+        """Move scheduler time forward by dt seconds and fire due timers"""
+        self.time += dt
+        target = int(self.time / self.resolution)
+        wheel0 = self._wheels[0]
+        while self._tick <= target:
+            index = self._tick & LEVEL0_MASK
+            if index == 0:
+                self._cascade()
+            if not self._level0:
+                # Empty level 0: jump to the next cascade, or past target,
+                # instead of visiting every tick of a long idle stretch
+                self._tick = min((self._tick | LEVEL0_MASK) + 1, target + 1)
+                continue
+            bucket = wheel0[index]
+            # Step first, so timers added by callbacks land in a later slot
+            self._tick += 1
+            if bucket:
+                wheel0[index] = []
+                self._level0 -= len(bucket)
+                for timer in bucket:
+                    if timer.active:
+                        self._fire(timer)
+
+    def _fire(self, timer):
+        interval = timer.interval
+        if interval is None:
+            timer.active = False
+            self.fired += 1
+            timer.callback()
+            return
+
+        # Fixed rate: fire again in the same tick if the interval is shorter
+        # than the resolution or we fell behind
+        while True:
+            self.fired += 1
+            timer.callback(interval)
+            if not timer.active:
+                return
+            timer.due += interval
+            timer.expires = math.ceil(timer.due / self.resolution - 1e-9)
+            if timer.expires >= self._tick:
+                self._insert(timer)
+                return
+
+    def next_due(self):
+        """
+        Seconds until the earliest active timer is due (0 if overdue),
+        None without timers. Scans the wheel, meant for idle decisions.
+        """
+        earliest = None
+        for wheel in self._wheels:
+            for bucket in wheel:
+                for timer in bucket:
+                    if timer.active and (earliest is None or timer.due < earliest):
+                        earliest = timer.due
+        if earliest is None:
+            return None
+        return max(earliest - self.time, 0.0)
+
+    def pending(self):
+        """Number of active timers in the wheel"""
+        count = 0
+        for wheel in self._wheels:
+            for bucket in wheel:
+                for timer in bucket:
+                    if timer.active:
+                        count += 1
+        return count
+
+    def clear(self):
+        """Cancel every timer"""
+        for wheel in self._wheels:
+            for bucket in wheel:
+                for timer in bucket:
+                    timer.active = False
+                bucket.clear()
+        self._level0 = 0
@@ -0,0 +1,248 @@
+# Angene\timing.py
+"""
+Frame pacing for engine.run().
+
+time.sleep() on its own wakes up late by an OS dependent amount (anything
+from ~50us to a full scheduler tick), which shows up as frame time jitter.
+FramePacer sleeps until "deadline - expected overshoot" and then spins on
+perf_counter for the last stretch, so frames land on their deadline without
+spinning for the whole budget.
+"""
+
+import math
+import time
+from array import array
+from collections import deque
+
+perf_counter = time.perf_counter
+
+
+class FramePacer:
+    """Deadline based hybrid sleep/spin frame limiter"""
+
+    def __init__(self, target_fps, history=240, overshoot_window=64):
+        """
+        Args:
+            target_fps: Frames per second to hold (0 disables pacing)
+            history: Number of frames kept for the pacing error stats
+            overshoot_window: Number of recent sleep overshoots used for the margin
+        """
+        self.frame_time = 1.0 / target_fps if target_fps > 0 else 0.0
+        self.deadline = None
+
+        # Recent sleep overshoots, a high percentile is used as the spin margin
+        self._overshoots = deque(maxlen=overshoot_window)
+        self.margin_percentile = 0.9
+        self.sleep_margin = 0.002
+
+        # Per-frame pacing error (actual wake - deadline) in seconds
+        self._errors = array('d', [0.0] * history)
+        self._spins = array('d', [0.0] * history)
+        self._index = 0
+        self.frames = 0
+        self.resyncs = 0
+
+    def calibrate(self, samples=10, request=0.001):
+        """Measure how late time.sleep() wakes up and seed the spin margin"""
+        for _ in range(samples):
+            start = perf_counter()
+            time.sleep(request)
+            self._overshoots.append(perf_counter() - start - request)
+        self._update_margin()
+        return self.sleep_margin
+
+    def _update_margin(self):
+        # A high percentile rather than the max, so one scheduler hiccup
+        # does not make us spin for the next few dozen frames. Never spin
+        # for more than half a frame.
+        ordered = sorted(self._overshoots)
+        margin = ordered[int((len(ordered) - 1) * self.margin_percentile)]
+        if self.frame_time > 0:
+            margin = min(margin, self.frame_time * 0.5)
+        self.sleep_margin = max(margin, 0.0)
+
+    def set_target(self, target_fps):
+        """Change the paced rate (0 disables pacing)"""
+        frame_time = 1.0 / target_fps if target_fps > 0 else 0.0
+        if frame_time != self.frame_time:
+            self.frame_time = frame_time
+            self.deadline = None
+
+    def reset(self):
+        """Start pacing from now, e.g. after a stall or a scene load"""
+        self.deadline = perf_counter() + self.frame_time
+
+    def wait(self):
+        """Block until the current frame's deadline, then advance it"""
+        if self.frame_time <= 0:
+            return
+
+        if self.deadline is None:
+            self.reset()
+
+        deadline = self.deadline
+        now = perf_counter()
+
+        # Sleep for the bulk of the remaining budget
+        sleep_for = deadline - now - self.sleep_margin
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+            woke = perf_counter()
+            self._overshoots.append(woke - now - sleep_for)
+            self._update_margin()
+            now = woke
+
+        # Spin on the high resolution clock for the rest
+        spin_start = now
+        while now < deadline:
+            now = perf_counter()
+
+        i = self._index
+        self._errors[i] = now - deadline
+        self._spins[i] = now - spin_start
+        self._index = (i + 1) % len(self._errors)
+        self.frames += 1
+
+        # Next deadline is relative to the old one so pacing does not drift.
+        # If we are more than a frame behind, resync instead of bursting.
+        next_deadline = deadline + self.frame_time
+        if now - next_deadline > self.frame_time:
+            next_deadline = now + self.frame_time
+            self.resyncs += 1
+        self.deadline = next_deadline
+
+    def stats(self):
+        """
+        Pacing error statistics over the recorded history.
+
+        Returns a dict of seconds: mean/max/p99 error (positive = late),
+        mean spin time, the current sleep margin, plus frame/resync counts.
+        """
+        count = min(self.frames, len(self._errors))
+        if count == 0:
+            return {
+                'frames': 0, 'mean_error': 0.0, 'max_error': 0.0,
+                'p99_error': 0.0, 'mean_spin': 0.0,
+                'sleep_margin': self.sleep_margin, 'resyncs': self.resyncs,
+            }
+        errors = sorted(self._errors[:count])
+        return {
+            'frames': self.frames,
+            'mean_error': sum(errors) / count,
+            'max_error': errors[-1],
+            'p99_error': errors[min(count - 1, int(count * 0.99))],
+            'mean_spin': sum(self._spins[:count]) / count,
+            'sleep_margin': self.sleep_margin,
+            'resyncs': self.resyncs,
+        }
+
+
+class CatchUpGuard:
+    """
+    Spiral-of-death protection for the fixed-step accumulator.
+
+    When ticks take longer than tick_time the accumulator grows faster than
+    it drains. The guard bounds the work per frame and degrades in order:
+      1. at most max_substeps FixedUpdate ticks run in one frame
+      2. while behind, up to max_render_skip frames in a row skip rendering
+         so the time goes to ticks instead
+      3. backlog beyond max_catchup seconds is dropped, i.e. game time runs
+         slower than real time; dilation reports by how much
+    """
+
+    def __init__(self, tick_time, max_substeps=5, max_catchup=0.25,
+                 max_render_skip=2, max_frame_delta=0.1, smoothing=0.05):
+        """
+        Args:
+            tick_time: Fixed step in seconds (0 = variable step, no ticks)
+            max_substeps: FixedUpdate ticks allowed per frame
+            max_catchup: Seconds of backlog kept in the accumulator
+            max_render_skip: Consecutive frames that may skip rendering
+            max_frame_delta: Largest real delta accepted from one frame
+            smoothing: Weight of the newest frame in the dilation average
+        """
+        self.tick_time = tick_time
+        self.max_substeps = max(1, max_substeps)
+        self.max_catchup = max(max_catchup, tick_time)
+        self.max_render_skip = max_render_skip
+        self.max_frame_delta = max_frame_delta
+        self._limits = (self.max_substeps, self.max_catchup, max_frame_delta)
+        self.smoothing = smoothing
+
+        # Game seconds per real second, smoothed (1.0 = keeping up)
+        self.dilation = 1.0
+        self.dropped_time = 0.0
+        self.game_time = 0.0
+        self.skipped_renders = 0
+        self.capped_frames = 0
+        self.behind = False
+        self._skip_run = 0
+
+    def set_frame_time(self, frame_time):
+        """
+        Widen the limits for deliberately long frames (background
+        throttling), so they are not mistaken for falling behind.
+        frame_time=None restores the configured limits.
+        """
+        substeps, catchup, frame_delta = self._limits
+        if frame_time:
+            frame_delta = max(frame_delta, 2.0 * frame_time)
+            catchup = max(catchup, 2.0 * frame_time)
+            if self.tick_time > 0:
+                substeps = max(substeps, math.ceil(frame_time / self.tick_time) + 1)
+        self.max_substeps = substeps
+        self.max_catchup = catchup
+        self.max_frame_delta = frame_delta
+
+    def advance(self, real_dt, accumulator):
+        """
+        Feed one frame of real time into the accumulator.
+
+        Returns (game_dt, accumulator): the time the game actually advances
+        this frame and the clamped accumulator.
+        """
+        dropped = 0.0
+        dt = real_dt
+        if dt > self.max_frame_delta:
+            dropped = dt - self.max_frame_delta
+            dt = self.max_frame_delta
+
+        if self.tick_time > 0:
+            accumulator += dt
+            if accumulator > self.max_catchup:
+                dropped += accumulator - self.max_catchup
+                accumulator = self.max_catchup
+
+        game_dt = real_dt - dropped
+        self.dropped_time += dropped
+        self.game_time += game_dt
+        if real_dt > 0:
+            ratio = game_dt / real_dt
+            self.dilation += (ratio - self.dilation) * self.smoothing
+        return game_dt, accumulator
+
+    def end_ticks(self, steps, accumulator):
+        """Record how the tick loop went; steps is the number of ticks run"""
+        self.behind = self.tick_time > 0 and accumulator >= self.tick_time
+        if steps >= self.max_substeps and self.behind:
+            self.capped_frames += 1
+
+    def should_render(self):
+        """False when this frame's render should be dropped to catch up"""
+        if self.behind and self._skip_run < self.max_render_skip:
+            self._skip_run += 1
+            self.skipped_renders += 1
+            return False
+        self._skip_run = 0
+        return True
+
+    def stats(self):
+        """Current degradation counters"""
+        return {
+            'dilation': self.dilation,
+            'dropped_time': self.dropped_time,
+            'game_time': self.game_time,
+            'skipped_renders': self.skipped_renders,
+            'capped_frames': self.capped_frames,
+            'behind': self.behind,
+        }
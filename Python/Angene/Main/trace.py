@@ -0,0 +1,229 @@
+# Angene\trace.py
+"""
+Trace recorder that exports Chrome / Perfetto "Trace Event Format" JSON.
+
+Spans are kept in a bounded in-memory buffer (oldest dropped first), so it
+can stay on in production and be dumped when something hitches. Hitch dumps
+copy the buffer and leave the JSON writing to a background thread, so the
+frame that hitched does not get slower:
+
+    from Angene.Main import engine
+
+    engine.enable_tracing()
+    ...
+    engine.tracer.dump("hitch.json", last_seconds=5)
+
+Open the file in https://ui.perfetto.dev or chrome://tracing. Spans on the
+same thread nest by time, so a frame shows its phases and each scene's
+callbacks underneath it; worker threads get their own tracks.
+
+The engine loop records through the profiler (see profiler.Profiler.tracer),
+other code can add spans directly:
+
+    with trace.recorder.span("decode level", cat="assets"):
+        ...
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+perf_counter = time.perf_counter
+get_ident = threading.get_ident
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "cat", "args", "start")
+
+    def __init__(self, recorder, name, cat, args):
+        self.recorder = recorder
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.add(self.name, self.start, perf_counter(), self.cat, self.args)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class TraceRecorder:
+    """Bounded buffer of complete ("X") trace events"""
+
+    def __init__(self, capacity=200000):
+        """
+        Args:
+            capacity: Most events kept; older ones are dropped
+        """
+        self.enabled = False
+        self.epoch = perf_counter()
+        self.pid = os.getpid()
+        # (name, cat, start, end, tid, args) in perf_counter seconds
+        self._events = deque(maxlen=capacity)
+        self._threads = {}
+        # Spans arrive from render workers and jobs too
+        self._lock = threading.Lock()
+        self._writer = None  # thread of the latest background dump
+
+        # Automatic dump when a frame takes longer than hitch_threshold
+        self.hitch_threshold = None
+        self.hitch_seconds = 5.0
+        self.hitch_directory = "."
+        self.hitch_cooldown = 10.0
+        self._last_hitch_dump = None
+        self.dumps = []
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, name, start, end, cat="engine", args=None):
+        """Record a finished span (perf_counter seconds) on the calling thread"""
+        tid = get_ident()
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            self._events.append((name, cat, start, end, tid, args))
+
+    def span(self, name, cat="engine", args=None):
+        """Context manager recording the enclosed block as a span"""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, cat, args)
+
+    def instant(self, name, cat="engine", args=None):
+        """Zero length marker, e.g. a scene switch"""
+        if self.enabled:
+            now = perf_counter()
+            self.add(name, now, now, cat, args)
+
+    # Export
+
+    def snapshot(self, last_seconds=None):
+        """
+        Copy of the buffer for export: (events, thread names, cutoff), where
+        events older than the perf_counter() cutoff get dropped on export
+        """
+        cutoff = perf_counter() - last_seconds if last_seconds is not None else None
+        with self._lock:
+            return list(self._events), dict(self._threads), cutoff
+
+    def events(self, last_seconds=None):
+        """Trace Event Format dicts, optionally only the last N seconds"""
+        return self._format(*self.snapshot(last_seconds))
+
+    def _format(self, snapshot, threads, cutoff):
+        if cutoff is not None:
+            snapshot = [e for e in snapshot if e[3] >= cutoff]
+        epoch = self.epoch
+        pid = self.pid
+        out = []
+        for tid, thread_name in threads.items():
+            out.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                        "args": {"name": thread_name}})
+        for name, cat, start, end, tid, args in snapshot:
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start - epoch) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            out.append(event)
+        return out
+
+    def to_json(self, last_seconds=None):
+        return self._json(*self.snapshot(last_seconds))
+
+    def _json(self, snapshot, threads, cutoff):
+        return json.dumps({"traceEvents": self._format(snapshot, threads, cutoff),
+                           "displayTimeUnit": "ms"})
+
+    def _write(self, path, snapshot):
+        with open(path, "w") as f:
+            f.write(self._json(*snapshot))
+        self.dumps.append(path)
+
+    def dump(self, path=None, last_seconds=None, background=False):
+        """
+        Write the buffer (or its last N seconds) to a .json trace file.
+
+        Args:
+            background: Only copy the buffer here and write the file on a
+                        thread (see wait_dumps())
+        """
+        if path is None:
+            path = time.strftime("angene_trace_%Y%m%d_%H%M%S.json")
+        snapshot = self.snapshot(last_seconds)
+        if not background:
+            self._write(path, snapshot)
+            return path
+        writer = threading.Thread(target=self._write, args=(path, snapshot),
+                                  name="AngeneTraceDump", daemon=True)
+        writer.start()
+        self._writer = writer
+        return path
+
+    def wait_dumps(self, timeout=None):
+        """Block until the latest background dump is written"""
+        writer = self._writer
+        if writer is not None:
+            writer.join(timeout)
+
+    # Hitch capture
+
+    def dump_on_hitch(self, threshold, last_seconds=5.0, directory=".", cooldown=10.0):
+        """
+        Dump the last N seconds automatically whenever a frame is slower than
+        threshold seconds, at most once per cooldown. threshold=None disables.
+        """
+        self.hitch_threshold = threshold
+        self.hitch_seconds = last_seconds
+        self.hitch_directory = directory
+        self.hitch_cooldown = cooldown
+
+    def check_hitch(self, frame_seconds, now):
+        """
+        Called by the engine once per frame; returns the path of the dump it
+        started, if any (written in the background)
+        """
+        threshold = self.hitch_threshold
+        if threshold is None or frame_seconds < threshold:
+            return None
+        if self._last_hitch_dump is not None and now - self._last_hitch_dump < self.hitch_cooldown:
+            return None
+        self._last_hitch_dump = now
+        name = time.strftime("angene_hitch_%Y%m%d_%H%M%S") + f"_{int(frame_seconds * 1000)}ms.json"
+        return self.dump(os.path.join(self.hitch_directory, name), self.hitch_seconds, background=True)
+
+
+# Shared recorder used by the engine loop, the VR loop and worker threads
+recorder = TraceRecorder()
@@ -0,0 +1,459 @@
+# Angene\win32_backend.py
+import ctypes
+from Angene.Main import painter
+from Angene.Main import images
+from Angene.Main.backends import Backend
+from Angene.Main.definitions import *
+
+# hook into user32.dll with definitions
+user32 = ctypes.WinDLL('user32', use_last_error=True)
+gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+
+# Define GetGuiResources for monitoring GDI objects
+user32.GetGuiResources.argtypes = [ctypes.c_void_p, ctypes.c_uint]
+user32.GetGuiResources.restype = ctypes.c_ulong
+
+GR_GDIOBJECTS = 0
+GR_USEROBJECTS = 1
+
+kernel32.GetCurrentProcess.argtypes = []
+kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+
+# GDI fixes for x64 compatibility
+SelectObject = gdi32.SelectObject
+SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+SelectObject.restype = ctypes.c_void_p
+
+DeleteObject = gdi32.DeleteObject
+DeleteObject.argtypes = [ctypes.c_void_p]
+DeleteObject.restype = ctypes.c_bool
+
+# Define GetDC and ReleaseDC properly
+user32.GetDC.argtypes = [ctypes.c_void_p]
+user32.GetDC.restype = ctypes.c_void_p
+
+user32.ReleaseDC.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+user32.ReleaseDC.restype = ctypes.c_int
+
+# Define CreateCompatibleDC and CreateCompatibleBitmap
+gdi32.CreateCompatibleDC.argtypes = [ctypes.c_void_p]
+gdi32.CreateCompatibleDC.restype = ctypes.c_void_p
+
+gdi32.CreateCompatibleBitmap.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+gdi32.CreateCompatibleBitmap.restype = ctypes.c_void_p
+
+gdi32.DeleteDC.argtypes = [ctypes.c_void_p]
+gdi32.DeleteDC.restype = ctypes.c_bool
+
+# Define BitBlt properly
+gdi32.BitBlt.argtypes = [
+    ctypes.c_void_p,  # hdcDest
+    ctypes.c_int,     # nXDest
+    ctypes.c_int,     # nYDest
+    ctypes.c_int,     # nWidth
+    ctypes.c_int,     # nHeight
+    ctypes.c_void_p,  # hdcSrc
+    ctypes.c_int,     # nXSrc
+    ctypes.c_int,     # nYSrc
+    ctypes.c_ulong    # dwRop
+]
+gdi32.BitBlt.restype = ctypes.c_bool
+
+# GDI batches calls per thread; flush before another thread blits the DC
+gdi32.GdiFlush.argtypes = []
+gdi32.GdiFlush.restype = ctypes.c_bool
+
+gdi32.GetDeviceCaps.argtypes = [ctypes.c_void_p, ctypes.c_int]
+gdi32.GetDeviceCaps.restype = ctypes.c_int
+
+VREFRESH = 116
+
+# SRCCOPY constant for BitBlt
+SRCCOPY = 0x00CC0020
+
+
+# Define WndProc with CORRECT signature
+WNDPROC = ctypes.WINFUNCTYPE(
+    ctypes.c_longlong,      # LRESULT (return type)
+    ctypes.c_void_p,        # HWND
+    ctypes.c_uint,          # UINT (message)
+    ctypes.c_ulonglong,     # WPARAM (64-bit)
+    ctypes.c_longlong       # LPARAM (64-bit)
+)
+
+# Classes
+class RECT(ctypes.Structure):
+    _fields_ = [("left", ctypes.c_long),
+                ("top", ctypes.c_long),
+                ("right", ctypes.c_long),
+                ("bottom", ctypes.c_long)]
+
+
+class PAINTSTRUCT(ctypes.Structure):
+    _fields_ = [
+        ("hdc", ctypes.c_void_p),
+        ("fErase", ctypes.c_int),   # BOOL
+        ("rcPaint", RECT),
+        ("fRestore", ctypes.c_int),
+        ("fIncUpdate", ctypes.c_int),
+        ("rgbReserved", ctypes.c_byte * 32),
+    ]
+
+CreateWindowExW = user32.CreateWindowExW
+GetMessage = user32.GetMessageW
+TranslateMessage = user32.TranslateMessage
+DispatchMessage = user32.DispatchMessageW
+PeekMessageW = user32.PeekMessageW
+
+# Properly define DefWindowProcW FIRST
+DefWindowProcW = user32.DefWindowProcW
+DefWindowProcW.argtypes = [
+    ctypes.c_void_p,        # HWND
+    ctypes.c_uint,          # UINT (message)
+    ctypes.c_ulonglong,     # WPARAM
+    ctypes.c_longlong       # LPARAM
+]
+DefWindowProcW.restype = ctypes.c_longlong
+
+# Painting functions
+BeginPaint = user32.BeginPaint
+BeginPaint.argtypes = [ctypes.c_void_p, ctypes.POINTER(PAINTSTRUCT)]
+BeginPaint.restype = ctypes.c_void_p
+
+EndPaint = user32.EndPaint
+EndPaint.argtypes = [ctypes.c_void_p, ctypes.POINTER(PAINTSTRUCT)]
+EndPaint.restype = ctypes.c_bool
+
+# Window map and backend instance, read by WndProc
+_window_map = {}
+_backend = None
+
+# Window message loop
+def WndProc(hwnd, msg, wParam, lParam):
+    window_instance = _window_map.get(hwnd)
+    if not window_instance:
+        return DefWindowProcW(hwnd, msg, wParam, lParam)
+
+    # Only handle window lifecycle messages
+    # NOT WM_PAINT - we'll render directly
+    if msg == WM_CLOSE:
+        if window_instance:
+            on_quit = window_instance.callbacks.OnApplicationQuit
+            if window_instance.scene_started and on_quit:
+                on_quit()
+            window_instance.cleanup()
+        user32.DestroyWindow(hwnd)
+        return 0
+
+    if msg == WM_DESTROY:
+        user32.PostQuitMessage(0)
+        return 0
+
+    if msg == WM_ERASEBKGND:
+        return 1  # Indicate background erased
+
+    # Activation and minimize are sent straight here, not through the queue
+    if msg == WM_ACTIVATE or msg == WM_SIZE:
+        _backend.track_window_state(window_instance, msg, wParam)
+
+    # Frames are presented from the main loop; WM_PAINT (window uncovered
+    # or restored) only copies the already drawn surface back, which partial
+    # presents with dirty_rects rely on
+    if msg == WM_PAINT and window_instance.mem_dc:
+        ps = PAINTSTRUCT()
+        hdc = BeginPaint(hwnd, ctypes.byref(ps))
+        if hdc:
+            rc = ps.rcPaint
+            gdi32.BitBlt(hdc, rc.left, rc.top, rc.right - rc.left, rc.bottom - rc.top,
+                         window_instance.mem_dc, rc.left, rc.top, SRCCOPY)
+        EndPaint(hwnd, ctypes.byref(ps))
+        return 0
+
+    return DefWindowProcW(hwnd, msg, wParam, lParam)
+
+wndproc_pointer = WNDPROC(WndProc)
+_g_references = [wndproc_pointer]
+
+class WndClassEx(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", ctypes.c_uint),
+        ("style", ctypes.c_uint),
+        ("lpfnWndProc", WNDPROC),
+        ("cbClsExtra", ctypes.c_int),
+        ("cbWndExtra", ctypes.c_int),
+        ("hInstance", ctypes.c_void_p),
+        ("hIcon", ctypes.c_void_p),
+        ("hCursor", ctypes.c_void_p),
+        ("hbrBackground", ctypes.c_void_p),
+        ("lpszMenuName", ctypes.c_wchar_p),
+        ("lpszClassName", ctypes.c_wchar_p),
+        ("hIconSm", ctypes.c_void_p)
+    ]
+
+# Get hInstance ONCE at module level
+hInstance = kernel32.GetModuleHandleW(None)
+
+# Types
+class tagMSG(ctypes.Structure):
+    _fields_ = [
+        ("hwnd", ctypes.c_void_p),
+        ("message", ctypes.c_uint),
+        ("wParam", ctypes.c_ulonglong),
+        ("lParam", ctypes.c_longlong),
+        ("time", ctypes.c_ulong),
+        ("pt_x", ctypes.c_long),
+        ("pt_y", ctypes.c_long)
+    ]
+
+# Set up CreateWindowExW properly
+CreateWindowExW.restype = ctypes.c_void_p
+CreateWindowExW.argtypes = [
+    ctypes.c_ulong,        # dwExStyle
+    ctypes.c_wchar_p,      # lpClassName
+    ctypes.c_wchar_p,      # lpWindowName
+    ctypes.c_ulong,        # dwStyle
+    ctypes.c_int,          # X
+    ctypes.c_int,          # Y
+    ctypes.c_int,          # nWidth
+    ctypes.c_int,          # nHeight
+    ctypes.c_void_p,       # hWndParent
+    ctypes.c_void_p,       # hMenu
+    ctypes.c_void_p,       # hInstance
+    ctypes.c_void_p        # lpParam
+]
+
+GetMessage.argtypes = [
+    ctypes.POINTER(tagMSG),
+    ctypes.c_void_p,
+    ctypes.c_uint,
+    ctypes.c_uint
+]
+GetMessage.restype = ctypes.c_int
+
+TranslateMessage.argtypes = [ctypes.POINTER(tagMSG)]
+TranslateMessage.restype = ctypes.c_bool
+
+DispatchMessage.argtypes = [ctypes.POINTER(tagMSG)]
+DispatchMessage.restype = ctypes.c_longlong
+
+PeekMessageW.argtypes = [
+    ctypes.POINTER(tagMSG),
+    ctypes.c_void_p,
+    ctypes.c_uint,
+    ctypes.c_uint,
+    ctypes.c_uint
+]
+PeekMessageW.restype = ctypes.c_bool
+
+user32.InvalidateRect.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_bool]
+user32.InvalidateRect.restype = ctypes.c_bool
+
+user32.PostQuitMessage.argtypes = [ctypes.c_int]
+user32.PostQuitMessage.restype = None
+
+user32.PostMessageW.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_ulonglong, ctypes.c_longlong]
+user32.PostMessageW.restype = ctypes.c_bool
+
+user32.PostThreadMessageW.argtypes = [ctypes.c_ulong, ctypes.c_uint, ctypes.c_ulonglong, ctypes.c_longlong]
+user32.PostThreadMessageW.restype = ctypes.c_bool
+
+MsgWaitForMultipleObjectsEx = user32.MsgWaitForMultipleObjectsEx
+MsgWaitForMultipleObjectsEx.argtypes = [
+    ctypes.c_ulong,     # nCount
+    ctypes.c_void_p,    # pHandles
+    ctypes.c_ulong,     # dwMilliseconds
+    ctypes.c_ulong,     # dwWakeMask
+    ctypes.c_ulong      # dwFlags
+]
+MsgWaitForMultipleObjectsEx.restype = ctypes.c_ulong
+
+kernel32.GetCurrentThreadId.argtypes = []
+kernel32.GetCurrentThreadId.restype = ctypes.c_ulong
+
+PM_REMOVE = 0x0001
+
+# Window constants
+WS_OVERLAPPEDWINDOW = 0x00CF0000
+CW_USEDEFAULT = ctypes.c_int(0x80000000).value
+SW_SHOW = 5
+
+ShowWindow = user32.ShowWindow
+ShowWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+ShowWindow.restype = ctypes.c_bool
+
+UpdateWindow = user32.UpdateWindow
+UpdateWindow.argtypes = [ctypes.c_void_p]
+UpdateWindow.restype = ctypes.c_bool
+
+_class_registered = False
+
+def register_window_class():
+    """Register AngeneClass once per process"""
+    global _class_registered
+    if _class_registered:
+        return
+
+    wc = WndClassEx()
+    wc.cbSize = ctypes.sizeof(WndClassEx)
+    wc.style = 0x0003  # CS_HREDRAW | CS_VREDRAW
+    wc.lpfnWndProc = wndproc_pointer
+    wc.cbClsExtra = 0
+    wc.cbWndExtra = 0
+    wc.hInstance = hInstance
+    wc.hIcon = None
+    wc.hCursor = user32.LoadCursorW(None, 32512)
+    wc.hbrBackground = None  # We handle our own background
+    wc.lpszMenuName = None
+    wc.lpszClassName = "AngeneClass"
+    wc.hIconSm = None
+
+    atom = user32.RegisterClassExW(ctypes.byref(wc))
+    if not atom:
+        raise ctypes.WinError(ctypes.get_last_error())
+
+    _g_references.append(wc)
+    _class_registered = True
+    print("Window class registered successfully")
+
+
+class Win32Backend(Backend):
+    """Native Win32 windows, PeekMessageW pump and GDI BitBlt present"""
+    name = "win32"
+
+    def __init__(self, window_map):
+        global _window_map, _backend
+        super().__init__(window_map)
+        _window_map = window_map
+        _backend = self
+        self._msg = tagMSG()
+        # Thread running the message pump, woken by wake() from other threads
+        self._thread_id = kernel32.GetCurrentThreadId()
+        register_window_class()
+
+    def create_window(self, title, width, height, style=0):
+        hwnd = CreateWindowExW(
+            style,
+            "AngeneClass",
+            title,
+            WS_OVERLAPPEDWINDOW,
+            CW_USEDEFAULT,
+            CW_USEDEFAULT,
+            width,
+            height,
+            None,
+            None,
+            ctypes.c_void_p(hInstance),
+            None
+        )
+
+        if not hwnd:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        ShowWindow(hwnd, SW_SHOW)
+        UpdateWindow(hwnd)
+        return hwnd
+
+    def create_surface(self, window):
+        hdc = user32.GetDC(window.hwnd)
+        window.mem_dc = gdi32.CreateCompatibleDC(hdc)
+        window.bmp = gdi32.CreateCompatibleBitmap(hdc, window.width, window.height)
+        window.old_bmp = gdi32.SelectObject(window.mem_dc, window.bmp)
+        user32.ReleaseDC(window.hwnd, hdc)
+        # One renderer for the life of the DC, it tracks what is selected
+        window.renderer = painter.Renderer(window.mem_dc)
+
+    def destroy_surface(self, window):
+        renderer = getattr(window, "renderer", None)
+        if renderer is not None:
+            renderer.release()
+            window.renderer = None
+        if window.old_bmp:
+            gdi32.SelectObject(window.mem_dc, window.old_bmp)
+        if window.bmp:
+            gdi32.DeleteObject(window.bmp)
+        if window.mem_dc:
+            gdi32.DeleteDC(window.mem_dc)
+        # WM_PAINT checks mem_dc, and a second call must not free them again
+        window.mem_dc = None
+        window.bmp = None
+        window.old_bmp = None
+
+    def pump_messages(self, on_message):
+        msg = self._msg
+        while PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE):
+            if msg.message == WM_QUIT:
+                return False
+            if msg.message == WM_NULL:
+                continue  # wake() only interrupts the wait, not an event
+            on_message(msg.hwnd, msg.message, msg.wParam, msg.lParam, msg.time)
+            TranslateMessage(ctypes.byref(msg))
+            DispatchMessage(ctypes.byref(msg))
+        return True
+
+    def wait_messages(self, timeout=None):
+        if timeout is None:
+            ms = INFINITE
+        else:
+            ms = max(0, int(timeout * 1000))
+        MsgWaitForMultipleObjectsEx(0, None, ms, QS_ALLINPUT, MWMO_INPUTAVAILABLE)
+
+    def wake(self, hwnd=None):
+        # WM_NULL ends MsgWaitForMultipleObjectsEx, pump_messages() drops it
+        if hwnd is not None:
+            user32.PostMessageW(hwnd, WM_NULL, 0, 0)
+        else:
+            user32.PostThreadMessageW(self._thread_id, WM_NULL, 0, 0)
+
+    def begin_draw(self, window):
+        return window.renderer
+
+    def end_draw(self, window):
+        gdi32.GdiFlush()
+
+    def present(self, window, rects=None):
+        hdc = user32.GetDC(window.hwnd)
+        if not hdc:
+            return
+        # Blit memory DC to screen, only the damaged parts when known
+        if rects is None:
+            rects = ((0, 0, window.width, window.height),)
+        for x0, y0, x1, y1 in rects:
+            gdi32.BitBlt(
+                hdc,
+                x0, y0,
+                x1 - x0, y1 - y0,
+                window.mem_dc,
+                x0, y0,
+                SRCCOPY
+            )
+        user32.ReleaseDC(window.hwnd, hdc)
+
+    def post_quit(self):
+        user32.PostQuitMessage(0)
+
+    def set_resolution(self, hwnd, width, height):
+        user32.SetWindowPos(
+            hwnd,
+            None,
+            0, 0,
+            width, height,
+            0x0002  # SWP_NOMOVE
+        )
+
+    def refresh_rate(self):
+        hdc = user32.GetDC(None)
+        if not hdc:
+            return 0
+        rate = gdi32.GetDeviceCaps(hdc, VREFRESH)
+        user32.ReleaseDC(None, hdc)
+        # 0 and 1 mean "hardware default"
+        return rate if rate > 1 else 0
+
+    def gdi_object_count(self):
+        process = kernel32.GetCurrentProcess()
+        return user32.GetGuiResources(process, GR_GDIOBJECTS)
+
+    def shutdown(self):
+        images.cache.clear()
+        painter.Renderer.cleanup()
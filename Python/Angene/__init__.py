@@ -24,24 +24,64 @@ For 2D games:
 # Version
 __version__ = "2.0.0-vr"
 
-# Main engine modules
-from Angene.Main import painter, engine, definitions
-
-# Renderer modules
-from Angene.Renderers import d3d11, d3d11_vr, opengl3d
-
-# VR/OpenXR modules
-from Angene.Custom import openxr, openxr_ctypes
-
-# Convenience imports for common usage
-try:
+# Submodules are loaded on first attribute access (PEP 562), so a 2D game
+# never loads the D3D11 / OpenXR DLLs and "import Angene" stays cheap
+_LAZY_MODULES = {
+    # Main engine modules
+    'engine': 'Angene.Main.engine',
+    'definitions': 'Angene.Main.definitions',
+    'painter': 'Angene.Main.painter',
+
+    # Renderer modules
+    'd3d11': 'Angene.Renderers.d3d11',
+    'd3d11_vr': 'Angene.Renderers.d3d11_vr',
+    'opengl3d': 'Angene.Renderers.opengl3d',
+
+    # VR/OpenXR modules
+    'openxr': 'Angene.Custom.openxr',
+    'openxr_ctypes': 'Angene.Custom.openxr_ctypes',
+}
+
+# Renderer and VR/OpenXR modules are Windows only; elsewhere they resolve to
+# None so the engine can still run headless on the null backend
+_WINDOWS_ONLY = {'d3d11', 'd3d11_vr', 'opengl3d', 'openxr', 'openxr_ctypes'}
+
+# Convenience names: (module, attribute)
+_LAZY_ATTRIBUTES = {
     # Optional: make VR super easy to access
-    VRSession = openxr.VRSession
-    quick_start_vr = openxr.quick_start
-except:
-    # VR not available or dependencies missing
-    VRSession = None
-    quick_start_vr = None
+    'VRSession': ('openxr', 'VRSession'),
+    'quick_start_vr': ('openxr', 'quick_start'),
+}
+
+
+def __getattr__(name):
+    import importlib
+
+    if name in _LAZY_MODULES:
+        try:
+            value = importlib.import_module(_LAZY_MODULES[name])
+        except (AttributeError, OSError):
+            if name not in _WINDOWS_ONLY:
+                raise
+            value = None
+    elif name in _LAZY_ATTRIBUTES:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+        try:
+            # VR not available or dependencies missing
+            value = getattr(__getattr__(module_name), attribute)
+        except:
+            value = None
+    else:
+        raise AttributeError(f"module 'Angene' has no attribute '{name}'")
+
+    # Cache it, later lookups do not come back here
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_MODULES) | set(_LAZY_ATTRIBUTES))
+
 
 # Public API
 __all__ = [
@@ -1,6 +1,5 @@
 # 2D scene test with logs
 from Angene.Main import painter
-import time
 
 from Angene.Main import engine as main
 
@@ -25,25 +24,22 @@ class GameScene:
 class LogScene:
     def Start(self):
         self.logs = []
-        self.last_log_time = time.time()
         self.tick_count = 0
+        # Add a timestamped log every second
+        self.timer = main.scheduler.every(1.0, self.Tick)
         print("[LogScene] Started")
     
-    def Update(self, dt):
-        # Add a timestamped log every second
-        now = time.time()
-        if now - self.last_log_time >= 1.0:
-            self.tick_count += 1
-            # Use simple string
-            log_text = f"Tick {self.tick_count}"
-            self.logs.append(log_text)
-            
-            # Keep only last 10 logs
-            if len(self.logs) > 10:
-                self.logs.pop(0)
-            
-            self.last_log_time = now
-            print(f"[LogScene] {log_text}")
+    def Tick(self, dt):
+        self.tick_count += 1
+        # Use simple string
+        log_text = f"Tick {self.tick_count}"
+        self.logs.append(log_text)
+        
+        # Keep only last 10 logs
+        if len(self.logs) > 10:
+            self.logs.pop(0)
+        
+        print(f"[LogScene] {log_text}")
     
     def OnDraw(self, r):
         r.clear(painter.RGB(20, 20, 20))
@@ -0,0 +1,114 @@
+# Angene\benchmarks\composite.py
+"""
+Compositing throughput of Angene.Main.composite in megapixels per second.
+
+Every blend mode at full and half opacity over a whole frame (a span, like
+a translucent layer or image), as a solid color (blend_color(), fades and
+panels) and through SoftwareRenderer.draw_sprites() for a batch of small
+translucent sprites. Needs NumPy.
+
+    python benchmarks/composite.py
+    python benchmarks/composite.py --width 1920 --height 1080 --json composite.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Angene.Main import composite  # noqa: E402
+
+
+def best_seconds(work, repeat):
+    """Seconds of the fastest of repeat runs"""
+    work()  # warm up
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def random_premultiplied(np, rng, shape):
+    """Premultiplied pixels, a third of them opaque and a sixth transparent"""
+    straight = rng.integers(0, 2 ** 32, shape, dtype=np.uint32)
+    pick = rng.random(shape)
+    straight = np.where(pick < 0.33, straight | composite.OPAQUE, straight)
+    straight = np.where(pick > 0.83, straight & 0x00FFFFFF, straight)
+    return composite.premultiply(straight)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--sprites", type=int, default=2000, help="16x16 sprites per batch")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per case")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if composite.np is None:
+        print("NumPy is not installed")
+        return
+    np = composite.np
+    from Angene.Main import atlas, images
+    from Angene.Main.raster import SoftwareRenderer
+
+    rng = np.random.default_rng(1)
+    shape = (args.height, args.width)
+    frame_mp = args.width * args.height / 1e6
+    dst = rng.integers(0, 2 ** 32, shape, dtype=np.uint32) | composite.OPAQUE
+    src = random_premultiplied(np, rng, shape)
+    straight = rng.integers(0, 2 ** 32, shape, dtype=np.uint32)
+
+    # Sprites: 16 translucent 16x16 images on one atlas page, scattered
+    sprite_images = {i: images.Image(16, 16, rng.integers(0, 256, 16 * 16 * 4, dtype=np.uint8).tobytes())
+                     for i in range(16)}
+    packed = atlas.build(sprite_images)
+    renderer = SoftwareRenderer(args.width, args.height)
+    spots = list(zip(rng.integers(0, args.width - 16, args.sprites).tolist(),
+                     rng.integers(0, args.height - 16, args.sprites).tolist()))
+    sprite_mp = args.sprites * 16 * 16 / 1e6
+
+    results = {}
+
+    def report(name, mp, seconds):
+        rate = mp / seconds
+        results[name] = {"mp_per_s": rate, "ms": seconds * 1000}
+        print(f"{name:<34} {seconds * 1000:>9.2f} {rate:>10.1f}")
+
+    print(f"{args.width}x{args.height} frame, {args.sprites} sprites of 16x16")
+    print(f"{'case':<34} {'ms':>9} {'MP/s':>10}")
+    report("premultiply", frame_mp, best_seconds(lambda: composite.premultiply(straight), args.repeat))
+    for mode in composite.MODES:
+        for opacity in (1.0, 0.5):
+            label = f"{mode} {opacity:g}"
+            target = dst.copy()
+            report(f"span {label}", frame_mp, best_seconds(
+                lambda: composite.blend(target, src, mode, opacity), args.repeat))
+            report(f"color {label}", frame_mp, best_seconds(
+                lambda: composite.blend_color(target, 0x80336699, mode, opacity), args.repeat))
+            batch = atlas.SpriteBatch(opacity, mode)
+            for k, (x, y) in enumerate(spots):
+                batch.draw(packed[k % 16], x, y)
+            report(f"sprites {label}", sprite_mp, best_seconds(
+                lambda: batch.flush(renderer, keep=True), args.repeat))
+
+    images.cache.clear()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version, "platform": sys.platform, "numpy": np.__version__,
+                       "width": args.width, "height": args.height, "sprites": args.sprites,
+                       "results": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
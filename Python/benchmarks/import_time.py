@@ -0,0 +1,110 @@
+# Angene\benchmarks\import_time.py
+"""
+Cold-start import cost of Angene and each of its submodules.
+
+Every measurement runs a fresh interpreter with -X importtime, so nothing is
+cached in sys.modules; the median of several runs is reported. Off Windows
+the renderer / OpenXR modules fail to load and show up as "unavailable".
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 15 --json import_times.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    "Angene",
+    "Angene.Main.engine",
+    "Angene.Main.painter",
+    "Angene.Main.definitions",
+    "Angene.Main.win32_backend",
+    "Angene.Main.jobs",
+    "Angene.Main.raster",
+    "Angene.Renderers.d3d11",
+    "Angene.Renderers.d3d11_vr",
+    "Angene.Renderers.opengl3d",
+    "Angene.Custom.openxr_ctypes",
+    "Angene.Custom.openxr",
+]
+
+
+def measure(target):
+    """(total microseconds for target, {Angene module: self microseconds}) or None"""
+    env = dict(os.environ, ANGENE_QUIET="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None
+
+    total = 0
+    own = {}
+    after_site = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        self_us = int(parts[0])
+        cumulative_us = int(parts[1])
+        name = parts[2].strip()
+        top_level = not parts[2][1:].startswith(" ")
+        if not after_site:
+            # Interpreter startup, finished once site is imported
+            after_site = top_level and name == "site"
+            continue
+        if name.startswith("Angene"):
+            own[name] = self_us
+        if top_level:
+            # Parent packages and the target's dependencies are separate
+            # top-level entries, together they are the cost of the import
+            total += cumulative_us
+    return total, own
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per target")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'module':<32} {'median ms':>10} {'min ms':>8}  heaviest Angene module")
+    for target in TARGETS:
+        runs = [measure(target) for _ in range(args.repeat)]
+        runs = [r for r in runs if r is not None]
+        if not runs:
+            print(f"{target:<32} {'unavailable':>10}")
+            results[target] = None
+            continue
+
+        totals = [total for total, _ in runs]
+        median = statistics.median(totals) / 1000
+        best = min(totals) / 1000
+        own = {}
+        for _, modules in runs:
+            for name, us in modules.items():
+                own.setdefault(name, []).append(us)
+        own = {name: statistics.median(values) / 1000 for name, values in own.items()}
+        heaviest = max(own.items(), key=lambda item: item[1]) if own else ("-", 0.0)
+
+        print(f"{target:<32} {median:>10.2f} {best:>8.2f}  {heaviest[0]} ({heaviest[1]:.2f} ms)")
+        results[target] = {"median_ms": median, "min_ms": best, "self_ms": own}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version, "platform": sys.platform, "results": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
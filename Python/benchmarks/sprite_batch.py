@@ -0,0 +1,149 @@
+# Angene\benchmarks\sprite_batch.py
+"""
+Sprite throughput: one draw_image() per sprite from separate images against
+an atlas drawn through a SpriteBatch, queued every frame and kept across
+frames (flush(r, keep=True), static scenery).
+
+Runs on the software renderer (needs NumPy) and, on Windows, on a GDI
+offscreen surface. Sprites are small (particles, 4-8 px) or medium (8-32 px)
+and opaque, color keyed or alpha blended (alpha sprites have translucent
+edges, so the software batch blends them).
+
+    python benchmarks/sprite_batch.py
+    python benchmarks/sprite_batch.py --sprites 5000 --json sprites.json
+"""
+
+import argparse
+import ctypes
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Angene.Main import atlas, images, painter  # noqa: E402
+
+WIDTH = 800
+HEIGHT = 600
+KEY = 0xFF00FF
+
+# name -> smallest, largest side in pixels
+SIZES = {"small": (4, 8), "medium": (8, 32)}
+
+
+def make_image(w, h, mode, rnd):
+    """w x h image with a random fill and a border of mode's transparency"""
+    r, g, b = rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)
+    rgba = bytearray(bytes((r, g, b, 255)) * (w * h))
+    for y in range(h):
+        for x in (0, w - 1):
+            i = (y * w + x) * 4
+            if mode == "alpha":
+                rgba[i + 3] = 96
+            elif mode == "key":
+                rgba[i:i + 3] = b"\xff\x00\xff"
+    return images.Image(w, h, rgba, KEY if mode == "key" else None)
+
+
+def targets():
+    """(name, renderer) for every renderer available here"""
+    found = []
+    try:
+        from Angene.Main.raster import SoftwareRenderer
+        found.append(("software", SoftwareRenderer(WIDTH, HEIGHT)))
+    except RuntimeError:
+        pass
+    if painter.gdi32 is not None:
+        screen = ctypes.windll.user32.GetDC(None)
+        found.append(("gdi", painter.OffscreenRenderer(screen, WIDTH, HEIGHT)))
+    return found
+
+
+def run(r, draw_frames, frames):
+    """
+    Seconds of the fastest frame of each draw_frame, the least disturbed by
+    other processes. The cases take turns frame by frame, so a noisy moment
+    slows all of them alike.
+    """
+    for draw_frame in draw_frames:
+        draw_frame(r)  # uploads surfaces
+    best = [None] * len(draw_frames)
+    for _ in range(frames):
+        for i, draw_frame in enumerate(draw_frames):
+            start = time.perf_counter()
+            draw_frame(r)
+            elapsed = time.perf_counter() - start
+            if best[i] is None or elapsed < best[i]:
+                best[i] = elapsed
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sprites", type=int, default=2000, help="Sprites per frame")
+    parser.add_argument("--images", type=int, default=64, help="Distinct images")
+    parser.add_argument("--frames", type=int, default=30, help="Timed frames per case")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    found = targets()
+    if not found:
+        print("No renderer available (install NumPy or run on Windows)")
+        return
+
+    rnd = random.Random(1)
+    results = {}
+    print(f"{'renderer':<10} {'sprites':<15} {'pages':>5} {'per sprite/s':>13} "
+          f"{'batched/s':>12} {'kept/s':>12} {'speedup':>8}")
+    cases = [(size, mode) for size in SIZES for mode in ("opaque", "key", "alpha")]
+    for size, mode in cases:
+        lo, hi = SIZES[size]
+        sources = {i: make_image(rnd.randint(lo, hi), rnd.randint(lo, hi), mode, rnd)
+                   for i in range(args.images)}
+        packed = atlas.build(sources)
+        placed = [(rnd.randrange(args.images), rnd.randint(-16, WIDTH), rnd.randint(-16, HEIGHT))
+                  for _ in range(args.sprites)]
+        batch = atlas.SpriteBatch()
+        kept = atlas.SpriteBatch()
+        for i, x, y in placed:
+            kept.draw(packed[i], x, y)
+
+        def per_sprite(r):
+            for i, x, y in placed:
+                r.draw_image(sources[i], x, y)
+
+        def batched(r):
+            for i, x, y in placed:
+                batch.draw(packed[i], x, y)
+            batch.flush(r)
+
+        def static(r):
+            kept.flush(r, keep=True)
+
+        for name, r in found:
+            single, grouped, flushed = run(r, (per_sprite, batched, static), args.frames)
+            print(f"{name:<10} {size + ' ' + mode:<15} {len(packed.pages):>5} {args.sprites / single:>13,.0f} "
+                  f"{args.sprites / grouped:>12,.0f} {args.sprites / flushed:>12,.0f} {single / grouped:>7.1f}x")
+            results[f"{name}/{size}/{mode}"] = {
+                "per_sprite_per_s": args.sprites / single,
+                "batched_per_s": args.sprites / grouped,
+                "kept_per_s": args.sprites / flushed,
+                "pages": len(packed.pages),
+            }
+
+    for _, r in found:
+        r.destroy()
+    images.cache.clear()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version, "platform": sys.platform, "sprites": args.sprites,
+                       "results": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Angene\tests\conftest.py
+"""
+Shared fixtures. Everything here runs headless on the null and software
+backends; tests that need NumPy skip without it.
+
+    cd Python && python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Angene.Main import engine as _engine  # noqa: E402
+from Angene.Main import replay  # noqa: E402
+from Angene.Main.dispatch import DispatchTable  # noqa: E402
+from Angene.Main.jobs import JobSystem  # noqa: E402
+from Angene.Main.scheduler import Scheduler  # noqa: E402
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """engine with a fresh null backend, scheduler and job pool"""
+    _engine.window_map.clear()
+    monkeypatch.setattr(_engine, "backend", None)
+    monkeypatch.setattr(_engine, "dispatch_table", DispatchTable())
+    monkeypatch.setattr(_engine, "scheduler", Scheduler())
+    monkeypatch.setattr(_engine, "jobs", JobSystem(2))
+    _engine.set_backend("null")
+    yield _engine
+    _engine.jobs.shutdown()
+    _engine.window_map.clear()
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """
+    recording(dts, tick_time, idle=None) writes a replay log of frames with
+    those real deltas and no input, for runs with a deterministic clock
+    """
+    count = [0]
+
+    def write(dts, tick_time=0.0, idle=None):
+        count[0] += 1
+        path = str(tmp_path / f"clock_{count[0]}.angrec")
+        recorder = replay.Recorder(path, {}, tick_time)
+        for i, dt in enumerate(dts):
+            recorder.end_frame(dt, idle[i] if idle else 0.0)
+        recorder.close()
+        return path
+
+    return write
+
@@ -0,0 +1,116 @@
+# Angene\tests\test_aio.py
+import asyncio
+
+from Angene.Main.definitions import WM_KEYDOWN
+
+
+class AsyncInput:
+    def __init__(self, engine, window):
+        self.engine = engine
+        self.window = window
+        self.frames = 0
+        self.updates = 0
+        self.batches = []
+        self.messages = []
+
+    async def Start(self):
+        await asyncio.sleep(0)
+
+    def Update(self, dt):
+        self.frames += 1
+        if self.frames <= 6:
+            post = self.engine.get_backend().post_message
+            post(self.window.hwnd, WM_KEYDOWN, self.frames * 2)
+            post(self.window.hwnd, WM_KEYDOWN, self.frames * 2 + 1)
+        # Ticks that catch up in one frame share a batch, quit once all arrived
+        if sum(map(len, self.batches)) == 12 or self.frames >= 1000:
+            self.engine.quit()
+
+    async def OnEvents(self, events):
+        await asyncio.sleep(0.02)  # slower than a frame, calls queue up
+        self.batches.append([wParam for _, wParam, _, _ in events])
+
+
+def test_async_on_events_gets_every_batch(engine):
+    window = engine.Window("aio", 10, 10)
+    scene = AsyncInput(engine, window)
+    window.set_scene(scene)
+    asyncio.run(engine.run_asyncio(target_fps=120))
+
+    assert [wParam for batch in scene.batches for wParam in batch] == list(range(2, 14))
+    assert all(batch for batch in scene.batches)
+
+
+def test_async_update_skips_while_busy(engine):
+    class Slow:
+        calls = 0
+        frames = 0
+
+        async def Update(self, dt):
+            self.calls += 1
+            await asyncio.sleep(0.05)
+
+        def LateUpdate(self, dt):
+            self.frames += 1
+            if self.frames >= 20:
+                engine.quit()
+
+    scene = Slow()
+    window = engine.Window("aio", 10, 10)
+    window.set_scene(scene)
+    asyncio.run(engine.run_asyncio(target_fps=120))
+
+    assert 1 <= scene.calls < 10
+    assert window.callbacks.Update.skipped == scene.frames - scene.calls
+
+
+def test_other_phases_wait_for_async_start(engine):
+    class Lobby:
+        ready = False
+
+        def __init__(self):
+            self.log = []
+
+        async def Start(self):
+            await asyncio.sleep(0.05)
+            self.ready = True
+
+        def OnEvents(self, events):
+            self.log.append(("events", self.ready, [wParam for _, wParam, _, _ in events]))
+
+        def Update(self, dt):
+            self.log.append(("update", self.ready))
+            if len(self.log) >= 5:
+                engine.quit()
+
+        def OnDraw(self, r):
+            self.log.append(("draw", self.ready))
+
+    scene = Lobby()
+    window = engine.Window("aio", 10, 10)
+    window.set_scene(scene)
+    engine.get_backend().post_message(window.hwnd, WM_KEYDOWN, 7)
+    asyncio.run(engine.run_asyncio(target_fps=120))
+
+    assert all(entry[1] for entry in scene.log)
+    # Input that came in while Start ran is delivered afterwards
+    assert scene.log[0] == ("events", True, [7])
+
+
+def test_async_quit_runs_to_the_end(engine):
+    from Angene.Main.definitions import WM_CLOSE
+
+    log = []
+
+    class Saver:
+        async def OnApplicationQuit(self):
+            log.append("quit begin")
+            await asyncio.sleep(0.02)
+            log.append("quit end")
+
+    window = engine.Window("aio", 10, 10)
+    window.set_scene(Saver())
+    engine.get_backend().post_message(window.hwnd, WM_CLOSE)
+    asyncio.run(engine.run_asyncio(target_fps=120))
+
+    assert log == ["quit begin", "quit end"]
@@ -0,0 +1,132 @@
+# Angene\tests\test_atlas.py
+import random
+
+import pytest
+
+from Angene.Main import atlas
+from Angene.Main.images import Image, Sprite
+
+
+def solid(width, height, rgba):
+    return Image(width, height, bytes(rgba) * (width * height))
+
+
+def test_packed_rectangles_do_not_overlap():
+    rng = random.Random(5)
+    sizes = [(rng.randint(1, 60), rng.randint(1, 60)) for _ in range(300)]
+    placements, pages = atlas.pack(sizes, 256, 256, padding=1)
+
+    assert len(pages) > 1
+    taken = {}
+    for (w, h), (page, x, y) in zip(sizes, placements):
+        assert x + w <= pages[page][0] <= 256 and y + h <= pages[page][1] <= 256
+        # Padding included, every pixel belongs to one entry
+        for px in range(x, x + w + 1):
+            for py in range(y, y + h + 1):
+                assert (page, px, py) not in taken
+                taken[(page, px, py)] = True
+
+    with pytest.raises(RuntimeError):
+        atlas.pack([(300, 10)], 256, 256)
+
+
+def test_build_copies_every_entry(tmp_path):
+    sheet = Image(4, 2, bytes(range(32)))
+    sources = {
+        "red": solid(3, 5, (255, 0, 0, 255)),
+        "blue": solid(7, 2, (0, 0, 255, 255)),
+        "frame": Sprite(sheet, (2, 0, 2, 2)),
+    }
+    packed = atlas.build(sources, page_size=16)
+
+    def pixels(sprite):
+        page = sprite.image
+        x, y, w, h = sprite.src
+        return b"".join(bytes(page.rgba[((y + row) * page.width + x) * 4:
+                                        ((y + row) * page.width + x + w) * 4])
+                        for row in range(h))
+
+    assert len(packed) == 3 and len(packed.pages) == 1
+    assert pixels(packed["red"]) == bytes((255, 0, 0, 255)) * 15
+    assert pixels(packed["frame"]) == bytes(range(8, 16)) + bytes(range(24, 32))
+
+    path = str(tmp_path / "sprites.json")
+    packed.save(path)
+    loaded = atlas.load(path)
+    assert loaded.entries == packed.entries
+    assert pixels(loaded["blue"]) == pixels(packed["blue"])
+
+
+def test_build_keeps_mixed_keys_transparent():
+    # The last pixel is the key, the key's bytes also straddle the first two
+    green = Image(3, 1, bytes((9, 9, 0, 255, 0, 255, 9, 0, 0, 255, 0, 255)), key=0x00FF00)
+    magenta = Image(2, 1, bytes((255, 0, 255, 255, 0, 0, 0, 255)), key=0xFF00FF)
+    shared = atlas.build({"g": green, "g2": green}, page_size=8)
+    assert shared.pages[0].key == 0x00FF00
+
+    packed = atlas.build({"g": green, "m": magenta}, page_size=8)
+    page = packed.pages[0]
+    assert page.key is None and page.has_alpha
+
+    def pixels(name):
+        _, x, y, w, h = packed.entries[name]
+        start = (y * page.width + x) * 4
+        return page.rgba[start:start + w * 4]
+
+    assert pixels("g") == bytes((9, 9, 0, 255, 0, 255, 9, 0)) + bytes(4)
+    assert pixels("m") == bytes(4) + bytes((0, 0, 0, 255))
+    assert green.rgba[11] == 255  # the sources are left alone
+
+
+class Sprites:
+    def __init__(self):
+        self.calls = []
+
+    def draw_sprites(self, image, items, opacity=1.0, mode="normal"):
+        self.calls.append((image, list(items)))
+
+
+def test_batch_draws_one_call_per_page():
+    a = solid(8, 8, (1, 2, 3, 255))
+    b = solid(8, 8, (4, 5, 6, 255))
+    batch = atlas.SpriteBatch()
+    batch.draw(Sprite(a, (0, 0, 4, 4)), 10, 10)
+    batch.draw(b, 0, 0)
+    batch.draw(Sprite(a, (4, 4, 4, 4)), 20, 20, 8, 8)
+    assert len(batch) == 3
+
+    r = Sprites()
+    batch.flush(r, keep=True)
+    batch.flush(r)
+    assert len(batch) == 0
+    assert r.calls[:2] == [
+        (a, [10, 10, 4, 4, 0, 0, 4, 4, 20, 20, 8, 8, 4, 4, 4, 4]),
+        (b, [0, 0, 8, 8, 0, 0, 8, 8]),
+    ]
+    assert len(r.calls) == 4
+
+
+def test_software_batch_matches_single_draws():
+    pytest.importorskip("numpy")
+    from Angene.Main.raster import SoftwareRenderer
+
+    rng = random.Random(9)
+    sources = {f"s{i}": solid(rng.randint(2, 12), rng.randint(2, 12),
+                              (rng.randrange(256), rng.randrange(256), 0, 255))
+               for i in range(20)}
+    packed = atlas.build(sources, page_size=32)
+    assert len(packed.pages) > 1
+    draws = [(packed[f"s{rng.randrange(20)}"], rng.randint(-10, 90), rng.randint(-10, 90))
+             for _ in range(200)]
+
+    single = SoftwareRenderer(96, 96)
+    batched = SoftwareRenderer(96, 96)
+    batch = atlas.SpriteBatch()
+    for page in packed.pages:
+        # A batch keeps sprite order within a page only, flush per page
+        for sprite, x, y in draws:
+            if sprite.image is page:
+                sprite.draw(single, x, y)
+                batch.draw(sprite, x, y)
+        batch.flush(batched)
+    assert (single.pixels == batched.pixels).all()
@@ -0,0 +1,67 @@
+# Angene\tests\test_backends.py
+from Angene.Main.definitions import (
+    WM_ACTIVATE, WM_CLOSE, WA_INACTIVE, WM_SIZE, SIZE_MINIMIZED,
+)
+
+
+class Logged:
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def Start(self):
+        self.log.append((self.name, "Start"))
+
+    def OnDraw(self, r):
+        r.clear(0)
+        r.draw_rect(1, 2, 3, 4, 0xFF)
+
+    def OnApplicationQuit(self):
+        self.log.append((self.name, "quit"))
+
+
+def test_null_backend_runs_scenes_until_the_last_window_closes(engine):
+    log = []
+    a = engine.Window("a", 50, 50)
+    b = engine.Window("b", 50, 50)
+    a.set_scene(Logged(log, "a"))
+    b.set_scene(Logged(log, "b"))
+    backend = engine.get_backend()
+    backend.post_message(a.hwnd, WM_CLOSE)
+    backend.post_message(b.hwnd, WM_CLOSE)
+    engine.run(target_fps=0)
+
+    assert ("a", "Start") in log and ("b", "Start") in log
+    assert ("a", "quit") in log and ("b", "quit") in log
+    assert not engine.window_map
+
+
+def test_window_state_tracking_skips_minimized_draws(engine):
+    drawn = []
+
+    class Scene:
+        def OnDraw(self, r):
+            drawn.append(1)
+
+    w = engine.Window("w", 50, 50)
+    w.set_scene(Scene())
+    backend = engine.get_backend()
+    backend.post_message(w.hwnd, WM_ACTIVATE, WA_INACTIVE)
+    backend.post_message(w.hwnd, WM_SIZE, SIZE_MINIMIZED)
+    backend.post_quit()
+    engine.run(target_fps=0)
+
+    assert not w.active and w.minimized
+    assert drawn == []
+    assert backend.frames_presented == 0
+
+
+def test_window_cleanup_releases_the_surface_once(engine, monkeypatch):
+    backend = engine.get_backend()
+    released = []
+    monkeypatch.setattr(backend, "destroy_surface", released.append)
+    w = engine.Window("w", 50, 50)
+    # WM_CLOSE, then engine shutdown
+    w.cleanup()
+    w.cleanup()
+    assert released == [w] and w.closed
@@ -0,0 +1,71 @@
+# Angene\tests\test_batch_draw.py
+import random
+from array import array
+
+import pytest
+
+from Angene.Main.display_list import DisplayList, color_column, rect_coords
+
+
+def test_rect_coords_from_columns():
+    expected = array('i', [1, 2, 4, 6, 10, 20, 13, 24])
+    assert rect_coords([1, 10], [2, 20], [3, 3], [4, 4]) == expected
+    assert rect_coords(array('i', [1, 10]), (2, 20), 3, 4) == expected
+    assert rect_coords([1.9, 10.2], [2, 20], 3, 4) == array('i', [1, 2, 4, 6, 10, 20, 13, 24])
+    assert color_column(7, 3) == array('L', [7, 7, 7])
+    assert color_column([1, 2], 2) == array('L', [1, 2])
+
+
+def test_batched_calls_record_like_single_ones():
+    batched = DisplayList()
+    batched.draw_rects([0, 10], [0, 10], 5, [5, 6], [1, 2])
+    batched.draw_texts([1, 2], [3, 4], ["a", "b"], 9)
+    single = DisplayList()
+    single.draw_rect(0, 0, 5, 5, 1)
+    single.draw_rect(10, 10, 5, 6, 2)
+    single.draw_text(1, 3, "a", 9)
+    single.draw_text(2, 4, "b", 9)
+    assert batched == single
+
+
+def test_numpy_columns():
+    np = pytest.importorskip("numpy")
+    x = np.array([1, 10], dtype=np.int16)
+    y = np.array([2, 20], dtype=np.int64)
+    assert rect_coords(x, y, 3, 4) == array('i', [1, 2, 4, 6, 10, 20, 13, 24])
+    assert color_column(np.array([5, 6], dtype=np.uint32), 2) == array('L', [5, 6])
+
+
+def test_software_batches_match_a_draw_rect_loop():
+    np = pytest.importorskip("numpy")
+    from Angene.Main.raster import SoftwareRenderer
+
+    rng = random.Random(3)
+    n = 400
+    # Small, big, flipped and off-screen rectangles that overlap
+    x = [rng.randint(-40, 200) for _ in range(n)]
+    y = [rng.randint(-40, 150) for _ in range(n)]
+    w = [rng.choice((rng.randint(-8, 8), rng.randint(60, 120))) for _ in range(n)]
+    h = [rng.choice((rng.randint(-8, 8), rng.randint(60, 120))) for _ in range(n)]
+    colors = [rng.randrange(1 << 24) for _ in range(n)]
+
+    looped = SoftwareRenderer(200, 150)
+    for args in zip(x, y, w, h, colors):
+        looped.draw_rect(*args)
+    batched = SoftwareRenderer(200, 150)
+    batched.draw_rects(np.array(x), np.array(y), np.array(w), np.array(h), np.array(colors))
+    assert (batched.pixels == looped.pixels).all()
+
+    one_color = SoftwareRenderer(200, 150)
+    one_color.draw_rects(x, y, w, h, 0x123456)
+    loop_one = SoftwareRenderer(200, 150)
+    for args in zip(x, y, w, h):
+        loop_one.draw_rect(*args, 0x123456)
+    assert (one_color.pixels == loop_one.pixels).all()
+
+    texts = SoftwareRenderer(200, 150)
+    texts.draw_texts([0, 50], [0, 50], ["ab", "cd"], [1, 2])
+    loop_texts = SoftwareRenderer(200, 150)
+    loop_texts.draw_text(0, 0, "ab", 1)
+    loop_texts.draw_text(50, 50, "cd", 2)
+    assert (texts.pixels == loop_texts.pixels).all()
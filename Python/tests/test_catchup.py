@@ -0,0 +1,58 @@
+# Angene\tests\test_catchup.py
+from Angene.Main.timing import CatchUpGuard
+
+TICK = 1 / 64
+
+
+def test_guard_keeps_up_with_real_time():
+    guard = CatchUpGuard(TICK)
+    accumulator = 0.0
+    for _ in range(100):
+        dt, accumulator = guard.advance(TICK, accumulator)
+        assert dt == TICK
+        accumulator -= TICK
+        guard.end_ticks(1, accumulator)
+        assert guard.should_render()
+    assert guard.dilation == 1.0
+    assert guard.dropped_time == 0.0
+
+
+def test_guard_drops_backlog_and_reports_dilation():
+    guard = CatchUpGuard(TICK, max_substeps=2, max_catchup=0.125, max_render_skip=2)
+    accumulator = 0.0
+    renders = []
+    for _ in range(50):
+        # Every frame is four ticks long, only two ticks fit
+        dt, accumulator = guard.advance(4 * TICK, accumulator)
+        steps = 0
+        while accumulator >= TICK and steps < guard.max_substeps:
+            accumulator -= TICK
+            steps += 1
+        guard.end_ticks(steps, accumulator)
+        renders.append(guard.should_render())
+        assert accumulator <= guard.max_catchup
+
+    assert guard.behind
+    assert guard.dropped_time > 0
+    assert guard.dilation < 0.6
+    # Never more than two frames in a row skip rendering
+    pattern = "".join("R" if r else "-" for r in renders)
+    assert "---" not in pattern and "--R--R" in pattern
+    assert guard.skipped_renders == renders.count(False)
+
+
+def test_engine_bounds_fixed_updates_per_frame(engine, recording):
+    ticks = []
+
+    class Heavy:
+        def FixedUpdate(self, dt):
+            ticks.append(dt)
+
+    engine.Window("w", 10, 10).set_scene(Heavy())
+    # 0.1 s frames at a 64 Hz tick: 6.4 ticks of work, 3 allowed
+    engine.run(target_fps=60, tick_rate=64, max_substeps=3,
+               replay=recording([0.1] * 20, TICK))
+
+    assert len(ticks) == 60
+    assert engine.catchup.dilation < 1.0
+    assert engine.catchup.stats()["capped_frames"] > 0
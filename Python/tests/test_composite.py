@@ -0,0 +1,86 @@
+# Angene\tests\test_composite.py
+import pytest
+
+from Angene.Main import composite
+
+
+def test_blending_without_numpy_is_a_logic_error(monkeypatch):
+    monkeypatch.setattr(composite, "np", None)
+    with pytest.raises(RuntimeError, match="needs NumPy"):
+        composite.blend(None, None)
+    with pytest.raises(RuntimeError, match="Unknown blend mode"):
+        composite.check_mode("overlay")
+    assert composite.opacity_byte(0.5) == 128
+
+
+def reference(d, s, mode):
+    """Float version of the mode formulas, premultiplied 0..1 channels"""
+    sa, da = s[3], d[3]
+    out = []
+    for i in range(4):
+        S, D = s[i], d[i]
+        if mode == "normal" or (mode == "multiply" and i == 3):
+            v = S + D * (1 - sa)
+        elif mode == "add":
+            v = min(S + D, 1.0)
+        elif mode == "screen":
+            v = S + D - S * D
+        else:
+            v = S * D + S * (1 - da) + D * (1 - sa)
+        out.append(min(v, 1.0))
+    return out
+
+
+@pytest.mark.parametrize("mode", composite.MODES)
+def test_modes_match_the_formulas(mode):
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(7)
+    alpha = rng.integers(0, 256, 500)
+    color = rng.integers(0, 256, (500, 3))
+    straight = (color[:, 0] | color[:, 1] << 8 | color[:, 2] << 16 | alpha << 24).astype(np.uint32)
+    src = composite.premultiply(straight)
+    dst = composite.premultiply(rng.permutation(straight))
+    out = dst.copy()
+    composite.blend(out, src, mode)
+
+    def channels(pixels):
+        return pixels.view(np.uint8).reshape(-1, 4) / 255.0
+
+    expected = np.array([reference(d, s, mode) for d, s in zip(channels(dst), channels(src))])
+    assert np.abs(channels(out) - expected).max() <= 1.5 / 255
+
+
+def test_opacity_premultiply_and_strided_slices():
+    np = pytest.importorskip("numpy")
+    frame = np.full((8, 8), 0xFFFFFFFF, dtype=np.uint32)
+    # Half transparent black over white, through a strided column slice
+    composite.blend_color(frame[:, 2:4], 0xFF000000, opacity=0.5)
+    assert (frame[:, 2:4] == 0xFF7F7F7F).all()
+    assert (frame[:, :2] == 0xFFFFFFFF).all()
+
+    before = frame.copy()
+    composite.blend(frame, np.full_like(frame, 0xFF0000FF), opacity=0.0)
+    assert (frame == before).all()
+
+    straight = np.array([0x80FF8040, 0x00123456, 0xFF010203], dtype=np.uint32)
+    back = composite.unpremultiply(composite.premultiply(straight))
+    assert back[2] == straight[2] and back[1] == 0
+    diff = back.view(np.uint8).astype(int) - straight.view(np.uint8).astype(int)
+    assert np.abs(diff[:4]).max() <= 1
+
+
+def test_software_renderer_blends_rects_and_images():
+    pytest.importorskip("numpy")
+    from Angene.Main.images import Image
+    from Angene.Main.raster import SoftwareRenderer
+
+    r = SoftwareRenderer(4, 4)
+    r.clear(0xFFFFFF)
+    r.blend_rect(0, 0, 2, 4, 0x000000, opacity=0.5)
+    assert r.pixels[0, 0] == 0xFF7F7F7F and r.pixels[0, 3] == 0xFFFFFFFF
+
+    glow = Image(1, 1, bytes((255, 0, 0, 128)))  # straight alpha
+    r.draw_image(glow, 3, 3, mode="add")
+    assert r.pixels[3, 3] == 0xFFFFFFFF  # already white, add saturates
+    r.draw_image(glow, 3, 0, mode="multiply")
+    assert r.pixels[0, 3] == 0xFF7F7FFF
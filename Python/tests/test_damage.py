@@ -0,0 +1,71 @@
+# Angene\tests\test_damage.py
+import pytest
+
+from Angene.Main.damage import DamageTracker
+
+
+def fresh(width=100, height=100, **kwargs):
+    damage = DamageTracker(width, height, **kwargs)
+    damage.take()  # the first frame is always presented in full
+    return damage
+
+
+def test_first_frame_and_add_all_present_everything():
+    damage = DamageTracker(40, 30)
+    assert damage.take() == [(0, 0, 40, 30)]
+    assert damage.take() == []
+    damage.add_all()
+    damage.add(1, 1, 2, 2)
+    assert damage.take() == [(0, 0, 40, 30)]
+
+
+def test_rects_are_clipped_normalized_and_merged():
+    damage = fresh()
+    damage.add(20, 20, 10, 10)   # flipped
+    damage.add(-5, -5, 3, 3)     # clipped
+    damage.add(200, 0, 300, 10)  # off the surface
+    damage.add(12, 12, 18, 18)   # inside the first one
+    assert damage.take() == [(10, 10, 20, 20), (0, 0, 3, 3)]
+    assert damage.empty()
+
+
+def test_rect_count_is_bounded():
+    damage = fresh(max_rects=3)
+    for i in range(10):
+        damage.add(i * 10, 0, i * 10 + 2, 2)
+    rects = damage.take()
+    assert len(rects) == 3
+    for i in range(10):
+        assert any(x0 <= i * 10 and i * 10 + 2 <= x1 for x0, _, x1, _ in rects)
+
+
+def test_mostly_damaged_surfaces_present_in_full():
+    damage = fresh()
+    damage.add(0, 0, 100, 40)
+    damage.add(0, 60, 100, 100)
+    assert damage.take() == [(0, 0, 100, 100)]
+
+
+def test_engine_presents_only_what_changed(engine, recording):
+    pytest.importorskip("numpy")
+    engine.backend = None
+    backend = engine.set_backend("software")
+    frames = []
+
+    class Clock:
+        def OnDraw(self, r):
+            frames.append(1)
+            if len(frames) == 1:
+                r.clear(0)
+            elif len(frames) < 4:
+                r.draw_rect(10, 10, 20, 10, 0xFFFFFF)
+            # later frames draw nothing
+
+    w = engine.Window("w", 100, 100)
+    w.set_scene(Clock())
+    engine.run(target_fps=60, dirty_rects=True, replay=recording([1 / 60] * 6, 1 / 60))
+
+    assert len(frames) == 6
+    assert backend.frames_presented == 3
+    # GDI edges: the rectangle covers 19 x 9 pixels
+    assert backend.pixels_presented == 100 * 100 + 2 * 19 * 9
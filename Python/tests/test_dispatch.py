@@ -0,0 +1,65 @@
+# Angene\tests\test_dispatch.py
+from Angene.Main.dispatch import SceneCallbacks
+
+TICK = 1 / 32
+FRAME = 2 * TICK  # two fixed ticks per frame, exact in binary
+
+
+class Counter:
+    def __init__(self):
+        self.calls = []
+
+    def Start(self):
+        self.calls.append(("Start", None))
+
+    def FixedUpdate(self, dt):
+        self.calls.append(("FixedUpdate", dt))
+
+    def Update(self, dt):
+        self.calls.append(("Update", dt))
+
+    def LateUpdate(self, dt):
+        self.calls.append(("LateUpdate", dt))
+
+    def count(self, phase):
+        return sum(1 for name, _ in self.calls if name == phase)
+
+
+def test_scene_callbacks_resolve_aliases_and_missing_methods():
+    class Old:
+        def OnWindowMessage(self, hwnd, msg, wParam, lParam):
+            pass
+
+        def OnDraw(self, r, alpha):
+            pass
+
+    cb = SceneCallbacks(Old())
+    assert cb.OnMessage is not None
+    assert cb.Update is None
+    assert cb.draw_alpha
+
+
+def test_update_once_per_frame_is_opt_in(engine, recording):
+    scene = Counter()
+    engine.Window("t", 10, 10).set_scene(scene)
+    engine.run(target_fps=60, tick_rate=32, replay=recording([FRAME] * 10, TICK),
+               update_per_tick=False)
+
+    assert scene.calls[0] == ("Start", None)
+    assert scene.count("FixedUpdate") == 20
+    assert scene.count("Update") == 10
+    assert scene.count("LateUpdate") == 10
+    assert all(dt == FRAME for name, dt in scene.calls if name == "Update")
+
+
+def test_update_runs_every_tick_by_default(engine, recording):
+    scene = Counter()
+    engine.Window("t", 10, 10).set_scene(scene)
+    engine.run(target_fps=60, tick_rate=32, replay=recording([FRAME] * 10, TICK))
+
+    assert scene.count("FixedUpdate") == 20
+    assert scene.count("Update") == 20
+    assert all(dt == TICK for name, dt in scene.calls if name in ("Update", "LateUpdate"))
+    # Update follows the FixedUpdate of the same tick
+    phases = [name for name, _ in scene.calls[1:7]]
+    assert phases == ["FixedUpdate", "Update", "LateUpdate"] * 2
@@ -0,0 +1,96 @@
+# Angene\tests\test_display_list.py
+from Angene.Main.display_list import OP_CLEAR, OP_RECT, OP_TEXT, DisplayList
+
+RED = 0x0000FF
+BLUE = 0xFF0000
+
+
+class Calls:
+    """Renderer without draw_list() that logs what it is asked to draw"""
+
+    def __init__(self):
+        self.calls = []
+
+    def clear(self, color):
+        self.calls.append(("clear", color))
+
+    def draw_rect(self, x, y, w, h, color):
+        self.calls.append(("rect", x, y, w, h, color))
+
+    def draw_text(self, x, y, text, color):
+        self.calls.append(("text", x, y, text, color))
+
+
+def test_disjoint_rects_group_by_color():
+    dl = DisplayList()
+    for i in range(4):
+        dl.draw_rect(i * 20, 0, 10, 10, RED)
+        dl.draw_rect(i * 20, 20, 10, 10, BLUE)
+    batches = dl.batches()
+    assert [(op, color, len(items) // 4) for op, color, items in batches] == [
+        (OP_RECT, RED, 4), (OP_RECT, BLUE, 4)]
+
+
+def test_overlapping_rects_keep_their_order():
+    dl = DisplayList()
+    dl.draw_rect(0, 0, 10, 10, RED)
+    dl.draw_rect(5, 5, 10, 10, BLUE)
+    dl.draw_rect(8, 8, 10, 10, RED)  # covers the blue one
+    assert [color for _, color, _ in dl.batches()] == [RED, BLUE, RED]
+
+
+def test_text_is_never_reordered_and_clear_drops_earlier_commands():
+    dl = DisplayList()
+    dl.draw_rect(0, 0, 5, 5, BLUE)
+    dl.clear(0)
+    dl.draw_rect(0, 0, 5, 5, RED)
+    dl.draw_text(1, 1, "hi", 0xFFFFFF)
+    dl.draw_rect(50, 50, 5, 5, RED)
+    assert [(op, color) for op, color, _ in dl.batches()] == [
+        (OP_CLEAR, 0), (OP_RECT, RED), (OP_TEXT, 0xFFFFFF), (OP_RECT, RED)]
+
+    r = Calls()
+    dl.replay(r)
+    assert r.calls == [("clear", 0), ("rect", 0, 0, 5, 5, RED),
+                       ("text", 1, 1, "hi", 0xFFFFFF), ("rect", 50, 50, 5, 5, RED)]
+
+
+def test_nested_lists_and_equality():
+    label = DisplayList()
+    label.draw_text(0, 0, "b", RED)
+    a = DisplayList()
+    a.draw_text(0, 0, "a", RED)
+    a.draw_list(label)
+    b = DisplayList()
+    b.draw_texts([0, 0], [0, 0], ["a", "b"], RED)
+    assert a == b
+
+    c = DisplayList()
+    c.copy_from(a)
+    assert c == a
+    c.draw_rect(0, 0, 1, 1, RED)
+    assert c != a
+    c.reset()
+    assert len(c) == 0
+
+
+def test_unchanged_frames_are_not_replayed(engine, recording, monkeypatch):
+    target = Calls()
+    monkeypatch.setattr(engine.get_backend(), "renderer", target)
+    frames = []
+
+    class Hud:
+        def OnDraw(self, r):
+            frames.append(1)
+            r.clear(0)
+            r.draw_rect(0, 0, 10, 10, RED)
+            if len(frames) == 3:
+                r.draw_text(0, 0, "changed", BLUE)
+
+    engine.Window("w", 32, 32).set_scene(Hud())
+    engine.run(target_fps=60, display_lists=True, replay=recording([1 / 60] * 5, 1 / 60))
+
+    assert len(frames) == 5
+    # Replayed on frames 1, 3 (changed) and 4 (changed back)
+    assert target.calls.count(("clear", 0)) == 3
+    assert target.calls.count(("text", 0, 0, "changed", BLUE)) == 1
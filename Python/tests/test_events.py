@@ -0,0 +1,55 @@
+# Angene\tests\test_events.py
+from Angene.Main.definitions import WM_KEYDOWN, WM_KEYUP, WM_MOUSEMOVE
+from Angene.Main.events import EventBatch
+
+
+class Keys:
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def OnMessage(self, hwnd, msg, wParam, lParam):
+        self.log.append((self.name, msg, wParam))
+
+
+def test_batch_coalesces_consecutive_mouse_moves():
+    batch = EventBatch()
+    batch.push(WM_MOUSEMOVE, 0, 1, 10)
+    batch.push(WM_MOUSEMOVE, 0, 2, 11)
+    batch.push(WM_KEYDOWN, 65, 0, 12)
+    batch.push(WM_MOUSEMOVE, 0, 3, 13)
+    batch.push(WM_KEYUP, 65, 0, 14)
+    assert list(batch) == [(WM_MOUSEMOVE, 0, 2, 11), (WM_KEYDOWN, 65, 0, 12),
+                           (WM_MOUSEMOVE, 0, 3, 13), (WM_KEYUP, 65, 0, 14)]
+    assert batch.coalesced == 1
+    assert batch[1] == (WM_KEYDOWN, 65, 0, 12)
+
+    copy = batch.copy()
+    batch.clear()
+    assert not batch and len(copy) == 4 and copy.coalesced == 1
+
+
+def test_messages_reach_only_their_window(engine):
+    log = []
+    a = engine.Window("a", 50, 50)
+    b = engine.Window("b", 50, 50)
+    a.set_scene(Keys(log, "a"))
+    b.set_scene(Keys(log, "b"))
+    backend = engine.get_backend()
+    backend.post_message(a.hwnd, WM_KEYDOWN, 1)
+    backend.post_message(b.hwnd, WM_KEYDOWN, 2)
+    backend.post_message(None, WM_KEYDOWN, 3)  # thread message, everyone
+    backend.post_message(12345, WM_KEYDOWN, 4)  # not an Angene window
+    frames = []
+
+    class Quitter:
+        def Update(self, dt):
+            frames.append(dt)
+            if len(frames) == 3:
+                engine.quit()
+
+    engine.Window("c", 10, 10).set_scene(Quitter())
+    engine.run(target_fps=0)
+
+    keys = sorted((name, wParam) for name, msg, wParam in log if msg == WM_KEYDOWN)
+    assert keys == [("a", 1), ("a", 3), ("b", 2), ("b", 3)]
@@ -0,0 +1,47 @@
+# Angene\tests\test_idle.py
+import threading
+
+from Angene.Main.definitions import WM_KEYDOWN
+
+
+class StaticScene:
+    is_static = True
+
+    def __init__(self, window):
+        self.window = window
+        self.draws = 0
+        self.events = []
+
+    def OnEvents(self, events):
+        self.events.extend(msg for msg, _, _, _ in events)
+        # Redrawing on input must not wake the loop into more input
+        self.window.invalidate()
+
+    def OnDraw(self, r):
+        self.draws += 1
+
+
+def test_static_scene_only_redraws_on_input(engine):
+    window = engine.Window("idle", 20, 20)
+    scene = StaticScene(window)
+    window.set_scene(scene)
+    backend = engine.get_backend()
+    threading.Timer(0.1, backend.post_message, (window.hwnd, WM_KEYDOWN, 65)).start()
+    threading.Timer(0.3, engine.quit).start()
+    engine.run(target_fps=60)
+
+    assert scene.events == [WM_KEYDOWN]
+    assert scene.draws == 2  # first frame and the key press
+
+
+def test_idle_wait_wakes_for_timers(engine):
+    window = engine.Window("idle", 20, 20)
+    scene = StaticScene(window)
+    window.set_scene(scene)
+    fired = []
+    engine.scheduler.every(0.05, lambda dt: fired.append(dt))
+    threading.Timer(0.3, engine.quit).start()
+    engine.run(target_fps=60)
+
+    assert 4 <= len(fired) <= 7
+    assert scene.draws == 1
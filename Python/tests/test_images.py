@@ -0,0 +1,105 @@
+# Angene\tests\test_images.py
+import pytest
+
+from Angene.Main import images
+from Angene.Main.images import Image, ImageCache
+
+
+class NativeSurface:
+    """Stands in for a DIB section: an OS handle that needs destroy()"""
+    live = 0
+
+    def __init__(self, image):
+        NativeSurface.live += 1
+        self.destroyed = False
+
+    def destroy(self):
+        NativeSurface.live -= 1
+        self.destroyed = True
+
+
+def solid(width, height, rgba=b"\x10\x20\x30\xff"):
+    return Image(width, height, rgba * (width * height))
+
+
+def test_budget_evicts_least_recently_drawn():
+    cache = ImageCache(budget=3 * 64 * 64 * 4)
+    pictures = [solid(64, 64) for _ in range(5)]
+    for image in pictures[:3]:
+        cache.upload(image, "array", lambda image: bytearray(image.nbytes))
+    cache.touch(pictures[0])
+    cache.upload(pictures[3], "array", lambda image: bytearray(image.nbytes))
+
+    assert cache.used <= cache.budget
+    assert pictures[1] not in cache.images  # oldest draw
+    assert pictures[0] in cache.images and pictures[3] in cache.images
+    assert cache.evictions == 1
+
+
+def test_evicted_arrays_are_released_immediately():
+    # Plain array surfaces have nothing to destroy, keeping them for
+    # collect() made the budget meaningless on the software backend
+    cache = ImageCache(budget=640 * 1024)
+    for _ in range(56):
+        image = solid(200, 200)
+        cache.upload(image, "array", lambda image: bytearray(image.nbytes))
+    assert cache.used <= cache.budget
+    assert not cache._retired
+
+
+def test_native_surfaces_wait_for_collect():
+    cache = ImageCache(budget=2 * 32 * 32 * 4)
+    surfaces = [cache.upload(solid(32, 32), "dib", NativeSurface) for _ in range(6)]
+    assert NativeSurface.live == 6
+    assert len(cache._retired) == 4
+    cache.collect()
+    assert NativeSurface.live == 2
+    assert [s.destroyed for s in surfaces] == [True] * 4 + [False] * 2
+    cache.clear()
+    assert NativeSurface.live == 0
+
+
+def test_engine_loop_collects_on_every_backend(engine, recording, monkeypatch):
+    cache = ImageCache(budget=32 * 32 * 4)
+    monkeypatch.setattr(images, "cache", cache)
+    NativeSurface.live = 0
+
+    class Loader:
+        def OnDraw(self, r):
+            # Each frame draws a new image, the previous one is evicted
+            cache.upload(solid(32, 32), "dib", NativeSurface)
+
+    engine.Window("img", 16, 16).set_scene(Loader())
+    engine.run(target_fps=60, replay=recording([1 / 60] * 10, 1 / 60))
+
+    assert cache.evictions == 9
+    assert NativeSurface.live == 1
+    cache.clear()
+
+
+def test_software_renderer_stays_within_budget(monkeypatch):
+    pytest.importorskip("numpy")
+    from Angene.Main.raster import SoftwareRenderer
+
+    cache = ImageCache(budget=640 * 1024)
+    monkeypatch.setattr(images, "cache", cache)
+    r = SoftwareRenderer(64, 64)
+    for i in range(56):
+        image = solid(200, 200, bytes((i, 0, 0, 255)))
+        r.draw_image(image, 0, 0)
+    assert cache.used <= cache.budget
+    assert not cache._retired
+    assert (r.pixels[0, 0] & 0xFF) == 55
+
+
+def test_png_round_trip(tmp_path):
+    from Angene.Main.raster import write_png
+
+    rgba = bytes(range(256)) * 3
+    rgba = rgba[:8 * 6 * 4]
+    path = str(tmp_path / "round.png")
+    write_png(path, 8, 6, rgba)
+    image = images.decode_file(path)
+    assert (image.width, image.height) == (8, 6)
+    assert bytes(image.rgba) == rgba
+    assert image.has_alpha
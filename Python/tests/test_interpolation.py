@@ -0,0 +1,38 @@
+# Angene\tests\test_interpolation.py
+TICK = 1 / 64
+
+
+class Interpolated:
+    def __init__(self):
+        self.alphas = []
+        self.ticks = 0
+
+    def FixedUpdate(self, dt):
+        self.ticks += 1
+
+    def OnDraw(self, r, alpha):
+        self.alphas.append(alpha)
+
+
+def test_on_draw_gets_the_fraction_of_a_tick_left(engine, recording):
+    scene = Interpolated()
+    engine.Window("w", 10, 10).set_scene(scene)
+    # Frames of one and a half ticks
+    engine.run(target_fps=96, tick_rate=64, interpolate=True,
+               replay=recording([1.5 * TICK] * 8, TICK))
+
+    assert scene.ticks == 12
+    assert scene.alphas == [0.5, 0.0] * 4
+
+
+def test_without_interpolation_on_draw_gets_no_alpha(engine, recording):
+    drawn = []
+
+    class Plain:
+        def OnDraw(self, r):
+            drawn.append(r)
+
+    engine.Window("w", 10, 10).set_scene(Plain())
+    engine.run(target_fps=96, tick_rate=64, interpolate=True,
+               replay=recording([1.5 * TICK] * 4, TICK))
+    assert len(drawn) == 4
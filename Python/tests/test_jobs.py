@@ -0,0 +1,87 @@
+# Angene\tests\test_jobs.py
+import gc
+import threading
+
+import pytest
+
+from Angene.Main.jobs import JobSystem
+
+
+@pytest.fixture
+def system():
+    js = JobSystem(workers=2)
+    yield js
+    js.shutdown()
+
+
+def boom():
+    raise ValueError("boom")
+
+
+def test_results_chains_and_dependencies(system):
+    a = system.submit(lambda: 1)
+    b = system.submit(lambda: 2)
+    assert system.when_all([a, b]).result(1) == [1, 2]
+    assert system.submit(lambda x: x * 10, 3).then(lambda v: v + 1).result(1) == 31
+
+    failed = system.submit(boom)
+    after = system.submit(lambda: 5, after=[failed])
+    with pytest.raises(ValueError):
+        after.result(1)
+
+
+def test_main_thread_continuations_and_nested_waits(system):
+    assert system.submit(lambda: 7).then(lambda v: v * 2, main_thread=True).result(1) == 14
+
+    def parent():
+        kids = [system.submit(lambda i=i: i * i) for i in range(50)]
+        return sum(k.result() for k in kids)
+
+    # Waiting on a worker runs other jobs instead of deadlocking the pool
+    assert system.submit(parent).result(5) == sum(i * i for i in range(50))
+
+
+def test_unobserved_failures_are_reported_when_collected(system, capsys):
+    job = system.submit(boom)
+    with pytest.raises(ValueError):
+        job.result(1)
+    del job
+    gc.collect()
+    assert not system.errors  # result() saw it
+
+    late = system.submit(boom)
+    late._event.wait(1)
+    chained = late.then(lambda v: v)  # observed by the continuation
+    with pytest.raises(ValueError):
+        chained.result(1)
+    del late, chained
+    gc.collect()
+    assert not system.errors
+
+    system.submit(boom)._event.wait(1)
+    gc.collect()
+    assert len(system.errors) == 1
+    assert "Angene job boom failed" in capsys.readouterr().out
+
+
+def test_spawned_blocking_work_does_not_starve_the_pool(system):
+    release = threading.Event()
+    blockers = [system.spawn(release.wait) for _ in range(4)]
+    assert system.submit(lambda: "ran").result(1) == "ran"
+    release.set()
+    assert all(job.result(1) for job in blockers)
+
+
+def test_idle_workers_wake_on_submit(system):
+    system.submit(lambda: None).result(1)
+    for i in range(200):
+        # Workers are asleep in between; each submit must wake one
+        assert system.submit(lambda i=i: i).result(0.5) == i
+
+
+def test_run_async_blocking_gets_its_own_thread(engine):
+    release = threading.Event()
+    blockers = [engine.run_async(release.wait, blocking=True) for _ in range(4)]
+    assert engine.run_async(lambda x: x + 1, 1).result(1) == 2
+    release.set()
+    assert all(job.result(1) for job in blockers)
@@ -0,0 +1,60 @@
+# Angene\tests\test_layers.py
+import pytest
+
+from Angene.Main.backends import NullRenderer
+from Angene.Main.display_list import DisplayList
+from Angene.Main.layers import Layer
+
+
+def test_layer_redraws_only_when_invalidated():
+    calls = []
+    layer = Layer(32, 32, calls.append)
+    target = NullRenderer()
+    for _ in range(5):
+        target.draw_layer(layer)
+    assert layer.redraws == 1
+    layer.invalidate()
+    target.draw_layer(layer)
+    target.draw_layer(layer)
+    assert layer.redraws == 2
+    layer.resize(64, 64)
+    target.draw_layer(layer)
+    assert layer.redraws == 3 and len(calls) == 3
+    layer.cleanup()
+    assert layer.surface is None
+
+
+def test_display_lists_see_invalidated_layers_as_changes():
+    layer = Layer(8, 8)
+
+    def record():
+        dl = DisplayList()
+        dl.draw_layer(layer, 2, 3)
+        return dl
+
+    first = record()
+    assert record() == first
+    layer.invalidate()
+    assert record() != first
+
+
+def test_keyed_layer_composites_with_transparency():
+    pytest.importorskip("numpy")
+    from Angene.Main.raster import SoftwareRenderer
+
+    KEY = 0xFF00FF
+
+    def draw(r):
+        r.draw_rect(0, 0, 5, 5, 0x0000FF)
+
+    layer = Layer(10, 10, draw, key=KEY)
+    screen = SoftwareRenderer(20, 20)
+    screen.clear(0x00FF00)
+    screen.draw_layer(layer, 5, 5)
+
+    opaque = 0xFF000000
+    assert screen.pixels[5, 5] == 0x0000FF | opaque       # drawn part
+    assert screen.pixels[12, 12] == 0x00FF00 | opaque     # key shows through
+    assert screen.pixels[0, 0] == 0x00FF00 | opaque       # outside the layer
+    screen.draw_layer(layer, 0, 0)
+    assert layer.redraws == 1
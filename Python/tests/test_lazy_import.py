@@ -0,0 +1,40 @@
+# Angene\tests\test_lazy_import.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(code):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_import_loads_no_submodules():
+    loaded = run(
+        "import sys, Angene\n"
+        "print(sorted(m for m in sys.modules if m.startswith('Angene.')))"
+    )
+    assert loaded == "[]"
+
+
+def test_submodules_load_on_first_access():
+    out = run(
+        "import sys, Angene\n"
+        "engine = Angene.engine\n"
+        "print(engine is sys.modules['Angene.Main.engine'], 'engine' in vars(Angene),\n"
+        "      'Angene.Custom.openxr' in sys.modules, 'd3d11' in dir(Angene))"
+    )
+    assert out == "True True False True"
+
+
+def test_unknown_names_raise_attribute_error():
+    import Angene
+
+    with pytest.raises(AttributeError, match="not_a_module"):
+        Angene.not_a_module
@@ -0,0 +1,64 @@
+# Angene\tests\test_profiler.py
+import threading
+
+from Angene.Main.profiler import Profiler, SpanRing
+
+
+def test_ring_keeps_the_latest_window():
+    ring = SpanRing(4)
+    for value in (1.0, 2.0, 3.0, 4.0, 5.0, 6.0):
+        ring.add(value)
+    assert list(ring.window()) == [3.0, 4.0, 5.0, 6.0]
+    stats = ring.stats()
+    assert stats["count"] == 6
+    assert stats["mean"] == 4.5
+    assert stats["p50"] == 4.0 and stats["max"] == 6.0
+    assert SpanRing(4).stats()["p99"] == 0.0
+
+
+def test_percentiles_find_the_spike():
+    ring = SpanRing(100)
+    for i in range(100):
+        ring.add(0.050 if i == 42 else 0.001)
+    stats = ring.stats()
+    assert stats["p50"] == stats["p95"] == 0.001
+    assert stats["max"] == 0.050
+
+
+def test_spans_from_many_threads_are_all_counted():
+    prof = Profiler(size=64)
+
+    def worker():
+        for _ in range(5000):
+            prof.record_span("draw", 0.0, 0.001)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert prof.stats("draw")["count"] == 20000
+    assert prof.stats("missing")["count"] == 0
+
+
+def test_engine_records_frame_phases(engine, recording):
+    class Scene:
+        def Update(self, dt):
+            pass
+
+        def OnDraw(self, r):
+            pass
+
+    engine.profiler.reset()
+    engine.profiler.enable()
+    try:
+        engine.Window("w", 16, 16).set_scene(Scene())
+        engine.run(target_fps=60, replay=recording([1 / 60] * 10, 1 / 60))
+    finally:
+        engine.profiler.disable()
+
+    stats = engine.profiler.stats()
+    for phase in ("frame", "pump", "fixed_update", "render", "w/Scene.Update", "w/Scene.OnDraw"):
+        assert stats[phase]["count"] == 10, phase
+    assert "frame" in engine.profiler.report()
+    engine.profiler.reset()
@@ -0,0 +1,115 @@
+# Angene\tests\test_raster.py
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Angene.Main.raster import SoftwareRenderer  # noqa: E402
+
+RED = 0x0000FF
+OPAQUE = 0xFF000000
+
+
+def test_rects_match_gdi_edges_and_clip():
+    r = SoftwareRenderer(20, 10)
+    r.clear(0)
+    # GDI Rectangle() with a NULL pen leaves out the right and bottom edge
+    r.draw_rect(2, 2, 4, 3, RED)
+    filled = np.argwhere(r.pixels == RED | OPAQUE)
+    assert filled[:, 0].min() == 2 and filled[:, 0].max() == 3
+    assert filled[:, 1].min() == 2 and filled[:, 1].max() == 4
+
+    flipped = SoftwareRenderer(20, 10)
+    flipped.clear(0)
+    flipped.draw_rect(6, 5, -4, -3, RED)
+    assert (flipped.pixels == r.pixels).all()
+
+    r.draw_rect(-50, -50, 500, 500, 0x00FF00)  # clipped, not an error
+    assert (r.pixels == 0x00FF00 | OPAQUE).all()
+
+
+def test_text_draws_with_a_transparent_background():
+    r = SoftwareRenderer(64, 32)
+    r.clear(0)
+    r.draw_text(2, 2, "Hi", RED)
+    lit = r.pixels == RED | OPAQUE
+    assert lit.any() and not lit.all()
+    assert (r.pixels[~lit] == OPAQUE).all()
+    r.draw_text(1000, 1000, "off screen", RED)
+
+
+def test_software_backend_renders_and_saves_frames(engine, recording, tmp_path):
+    from Angene.Main import images
+
+    engine.backend = None
+    engine.set_backend("software")
+
+    class Scene:
+        def OnDraw(self, r):
+            r.clear(0x202020)
+            r.draw_rect(0, 0, 9, 9, RED)
+
+    w = engine.Window("w", 16, 12)
+    w.set_scene(Scene())
+    engine.get_backend().capture(str(tmp_path / "frames"))
+    engine.run(target_fps=60, replay=recording([1 / 60] * 2, 1 / 60))
+
+    assert engine.get_backend().frames_presented == 2
+    saved = sorted((tmp_path / "frames").iterdir())
+    assert len(saved) == 2
+    image = images.decode_file(str(saved[-1]))
+    assert (image.width, image.height) == (16, 12)
+    assert bytes(image.rgba[:4]) == b"\xff\x00\x00\xff"
+
+
+def test_repeated_pixels_keep_the_last_write():
+    from Angene.Main.raster import _last_writes
+
+    index = np.array([5, 1, 5, 2, 1, 5])
+    last = [False, False, False, True, True, True]
+    assert _last_writes(index, 100).tolist() == last  # sorted
+    assert _last_writes(index, 8).tolist() == last    # through the framebuffer
+    assert _last_writes(np.array([3, 1, 2]), 100) is None
+    assert _last_writes(np.array([3, 1, 2]), 4) is None
+
+    # Overlapping small rectangles of different colors, drawn in order
+    r = SoftwareRenderer(8, 8)
+    r.draw_rects([0, 1, 2], [0, 1, 2], 5, 5, [1, 2, 3])
+    looped = SoftwareRenderer(8, 8)
+    for i in range(3):
+        looped.draw_rect(i, i, 5, 5, i + 1)
+    assert (r.pixels == looped.pixels).all()
+
+
+@pytest.mark.parametrize("kind, opacity, mode", [
+    ("opaque", 1.0, "normal"), ("key", 1.0, "normal"), ("alpha", 1.0, "normal"),
+    ("opaque", 0.5, "normal"), ("key", 1.0, "add"), ("scaled", 1.0, "normal"),
+])
+def test_sprite_batches_match_single_draws(kind, opacity, mode):
+    import random
+    from Angene.Main.images import Image
+
+    rng = random.Random(kind + mode)
+    rgba = bytearray(rng.randrange(256) for _ in range(16 * 16 * 4))
+    if kind != "alpha":
+        rgba[3::4] = b"\xff" * 256
+    key = None
+    if kind == "key":
+        key = 0x000000FF
+        for i in range(0, 256, 3):
+            rgba[i * 4:i * 4 + 4] = b"\xff\x00\x00\xff"
+    image = Image(16, 16, bytes(rgba), key)
+
+    items = []
+    for _ in range(300):
+        sw, sh = rng.randint(1, 6), rng.randint(1, 6)
+        w, h = (rng.randint(1, 12), rng.randint(1, 12)) if kind == "scaled" else (sw, sh)
+        items += (rng.randint(-4, 40), rng.randint(-4, 40), w, h,
+                  rng.randint(0, 16 - sw), rng.randint(0, 16 - sh), sw, sh)
+
+    batched = SoftwareRenderer(40, 40)
+    batched.draw_sprites(image, items, opacity, mode)
+    single = SoftwareRenderer(40, 40)
+    for i in range(0, len(items), 8):
+        x, y, w, h, sx, sy, sw, sh = items[i:i + 8]
+        single.draw_image(image, x, y, w, h, (sx, sy, sw, sh), opacity, mode)
+    assert (batched.pixels == single.pixels).all()
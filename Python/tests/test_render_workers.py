@@ -0,0 +1,31 @@
+# Angene\tests\test_render_workers.py
+import threading
+
+
+class Drawn:
+    def __init__(self):
+        self.threads = []
+
+    def OnDraw(self, r):
+        self.threads.append(threading.current_thread().name)
+
+
+def test_windows_draw_on_the_render_pool(engine, recording):
+    scenes = [Drawn() for _ in range(3)]
+    for i, scene in enumerate(scenes):
+        engine.Window(f"w{i}", 16, 16).set_scene(scene)
+    engine.run(target_fps=60, render_workers=2, replay=recording([1 / 60] * 5, 1 / 60))
+
+    for scene in scenes:
+        assert len(scene.threads) == 5
+        assert all(name.startswith("AngeneRender") for name in scene.threads)
+    assert engine.get_backend().frames_presented == 15
+    assert engine.render_pool is None  # shut down with the loop
+
+
+def test_single_window_draws_on_the_main_thread(engine, recording):
+    scene = Drawn()
+    engine.Window("w", 16, 16).set_scene(scene)
+    engine.run(target_fps=60, render_workers=2, replay=recording([1 / 60] * 3, 1 / 60))
+
+    assert scene.threads == [threading.main_thread().name] * 3
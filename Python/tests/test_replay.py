@@ -0,0 +1,97 @@
+# Angene\tests\test_replay.py
+from Angene.Main.definitions import WM_KEYDOWN, WM_KEYUP, WM_MOUSEMOVE
+from Angene.Main.dispatch import DispatchTable
+from Angene.Main.scheduler import Scheduler
+
+WM_USER = 0x0400
+
+
+class Session:
+    """Posts input by frame number and logs everything the engine hands it"""
+
+    def __init__(self, engine, window, other):
+        self.engine = engine
+        self.window = window
+        self.other = other
+        self.frames = 0
+        self.log = []
+
+    def Start(self):
+        self.engine.scheduler.every(0.05, lambda dt: self.log.append(("timer", self.frames)))
+
+    def FixedUpdate(self, dt):
+        self.log.append(("fixed", dt))
+
+    def Update(self, dt):
+        self.frames += 1
+        self.log.append(("update", dt))
+        post = self.engine.get_backend().post_message
+        if self.frames % 3 == 0:
+            post(self.window.hwnd, WM_KEYDOWN, self.frames, 0, self.frames)
+            post(self.window.hwnd, WM_MOUSEMOVE, 0, self.frames, self.frames)
+            post(self.window.hwnd, WM_MOUSEMOVE, 0, self.frames + 1, self.frames)
+        if self.frames % 5 == 0:
+            post(self.other.hwnd, WM_KEYUP, self.frames, 0, self.frames)
+            post(None, WM_USER, self.frames, 0, self.frames)  # thread message
+            post(999, WM_USER + 1, self.frames, 0, self.frames)  # not our window
+        if self.frames == 30:
+            self.engine.quit()
+
+    def OnEvents(self, events):
+        self.log.append(("events", self.frames, list(events)))
+
+
+class Other:
+    def __init__(self):
+        self.log = []
+
+    def OnMessage(self, hwnd, msg, wParam, lParam):
+        self.log.append((msg, wParam))
+
+
+def play(engine, **run_args):
+    window = engine.Window("main", 32, 32)
+    other_window = engine.Window("other", 32, 32)
+    scene = Session(engine, window, other_window)
+    other = Other()
+    window.set_scene(scene)
+    other_window.set_scene(other)
+    engine.run(target_fps=120, tick_rate=60, **run_args)
+    return scene.log, other.log
+
+
+def reset(engine):
+    engine.window_map.clear()
+    engine.backend = None
+    engine.dispatch_table = DispatchTable()
+    engine.scheduler = Scheduler()
+    engine.set_backend("null")
+
+
+def test_replay_matches_the_recorded_run(engine, tmp_path):
+    path = str(tmp_path / "session.angrec")
+    live, live_other = play(engine, record=path)
+    reset(engine)
+    replayed, replayed_other = play(engine, replay=path)
+
+    assert replayed == live
+    assert replayed_other == live_other
+    # Sanity: the session saw input, timers and both kinds of routing
+    assert any(entry[0] == "timer" for entry in live)
+    assert (WM_USER, 5) in live_other and (WM_KEYUP, 5) in live_other
+    events = [e for entry in live if entry[0] == "events" for e in entry[2]]
+    assert (WM_USER, 5, 0, 5) in events
+    # Consecutive mouse moves coalesce into the latest one
+    assert (WM_MOUSEMOVE, 0, 4, 3) in events and (WM_MOUSEMOVE, 0, 3, 3) not in events
+
+
+def test_messages_for_unknown_windows_are_not_recorded(engine, tmp_path):
+    path = str(tmp_path / "session.angrec")
+    live, live_other = play(engine, record=path)
+    reset(engine)
+    replayed, replayed_other = play(engine, replay=path)
+
+    for log in (live, replayed):
+        events = [e for entry in log if entry[0] == "events" for e in entry[2]]
+        assert not any(msg == WM_USER + 1 for msg, _, _, _ in events)
+    assert not any(msg == WM_USER + 1 for msg, _ in live_other + replayed_other)
@@ -0,0 +1,77 @@
+# Angene\tests\test_scheduler.py
+import time
+
+from Angene.Main.scheduler import Scheduler
+
+
+def test_every_fires_at_its_rate():
+    s = Scheduler()
+    fired = []
+    s.every(0.125, lambda dt: fired.append((s.time, dt)))
+    for _ in range(64):
+        s.advance(1 / 64)
+    assert fired == [(0.125 * i, 0.125) for i in range(1, 9)]
+
+
+def test_fixed_rate_catches_up_after_a_long_frame():
+    s = Scheduler()
+    fired = []
+    s.at_rate(100, lambda dt: fired.append(dt))
+    s.advance(0.5)
+    assert len(fired) == 50
+
+
+def test_after_fires_once_and_cancel_stops_timers():
+    s = Scheduler()
+    once = []
+    ticks = []
+    s.after(2.0, lambda: once.append(s.time))
+    timer = s.every(0.5, lambda dt: ticks.append(dt))
+    s.advance(1.0)
+    timer.cancel()
+    s.advance(5.0)
+    assert len(once) == 1 and once[0] >= 2.0
+    assert len(ticks) == 2
+    assert s.pending() == 0
+
+
+def test_timers_across_wheel_levels():
+    s = Scheduler()
+    fired = {}
+    for delay in (0.003, 0.3, 20.0, 900.0, 20000.0):
+        s.after(delay, lambda delay=delay: fired.setdefault(delay, s.time))
+    assert s.next_due() == 0.003
+    step = 0.25
+    while s.time < 20001:
+        s.advance(step)
+    assert sorted(fired) == [0.003, 0.3, 20.0, 900.0, 20000.0]
+    for delay, when in fired.items():
+        assert delay <= when < delay + step + 1e-6
+
+
+def test_callbacks_can_schedule_more_timers():
+    s = Scheduler()
+    seen = []
+
+    def chain():
+        seen.append(round(s.time, 3))
+        if len(seen) < 3:
+            s.after(0.01, chain)
+
+    s.after(0.01, chain)
+    for _ in range(10):
+        s.advance(0.005)
+    assert seen == [0.01, 0.02, 0.03]
+
+
+def test_long_idle_advance_skips_empty_ticks():
+    # An hour of idle time in one call used to walk 3.6 million 1ms ticks
+    s = Scheduler()
+    fired = []
+    s.every(600, lambda dt: fired.append(s.time))
+    start = time.process_time()
+    s.advance(3600)
+    assert time.process_time() - start < 0.5
+    assert len(fired) == 6
+    s.advance(600)
+    assert len(fired) == 7
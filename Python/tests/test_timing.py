@@ -0,0 +1,66 @@
+# Angene\tests\test_timing.py
+import pytest
+
+from Angene.Main import timing
+from Angene.Main.timing import FramePacer
+
+
+class FakeClock:
+    """perf_counter and sleep for timing, sleep wakes up overshoot late"""
+
+    def __init__(self, overshoot=0.0005, tick=0.00001):
+        self.now = 100.0
+        self.overshoot = overshoot
+        self.tick = tick  # every reading takes a little time, spins end
+        self.sleeps = 0
+
+    def perf_counter(self):
+        self.now += self.tick
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps += 1
+        self.now += seconds + self.overshoot
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(timing, "perf_counter", clock.perf_counter)
+    monkeypatch.setattr(timing, "time", clock)
+    return clock
+
+
+def test_pacer_holds_the_target_rate(clock):
+    pacer = FramePacer(100)
+    pacer.calibrate(samples=3)
+    assert pacer.sleep_margin == pytest.approx(clock.overshoot, abs=0.0001)
+    start = clock.now
+    for _ in range(30):
+        pacer.wait()
+    elapsed = clock.now - start
+
+    assert elapsed == pytest.approx(0.3, abs=0.001)
+    stats = pacer.stats()
+    assert stats["frames"] == 30
+    assert 0 <= stats["mean_error"] < 0.0001
+
+
+def test_pacer_resyncs_instead_of_bursting_after_a_stall(clock):
+    pacer = FramePacer(100)
+    pacer.wait()
+    clock.sleep(0.05)  # five frames late
+    pacer.wait()
+    assert pacer.resyncs == 1
+    start = clock.now
+    pacer.wait()
+    assert clock.now - start > 0.005  # waits a frame again
+
+
+def test_uncapped_pacer_does_not_wait(clock):
+    pacer = FramePacer(0)
+    start = clock.now
+    for _ in range(1000):
+        pacer.wait()
+    assert clock.now == start and clock.sleeps == 0
+    assert pacer.stats()["frames"] == 0
@@ -0,0 +1,52 @@
+# Angene\tests\test_trace.py
+import json
+import threading
+
+from Angene.Main.profiler import Profiler
+from Angene.Main.trace import TraceRecorder
+
+
+def test_hitch_dump_is_written_in_the_background(tmp_path):
+    tracer = TraceRecorder(capacity=1000)
+    tracer.enable()
+    for i in range(100):
+        tracer.add(f"span{i}", i * 0.001, i * 0.001 + 0.0005)
+    tracer.dump_on_hitch(0.05, last_seconds=None, directory=str(tmp_path), cooldown=10.0)
+
+    assert tracer.check_hitch(0.01, 1.0) is None
+    path = tracer.check_hitch(0.08, 1.0)
+    assert path is not None
+    # Spans added after the hitch are not part of its dump
+    tracer.add("later", 2.0, 2.1)
+    assert tracer.check_hitch(0.08, 2.0) is None  # cooldown
+    tracer.wait_dumps()
+
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    names = [e["name"] for e in events if e["ph"] == "X"]
+    assert names == [f"span{i}" for i in range(100)]
+    assert tracer.dumps == [path]
+
+
+def test_spans_from_many_threads_while_exporting():
+    tracer = TraceRecorder(capacity=100000)
+    profiler = Profiler(size=64)
+    profiler.tracer = tracer
+
+    def worker(n):
+        for i in range(2000):
+            profiler.record_span(f"worker{n}", i, i + 1.0)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        tracer.events()
+        profiler.stats()
+    for t in threads:
+        t.join()
+
+    stats = profiler.stats()
+    assert sorted(stats) == ["worker0", "worker1", "worker2", "worker3"]
+    assert all(st["count"] == 2000 and st["max"] == 1.0 for st in stats.values())
+    assert len(tracer) == 8000